@@ -0,0 +1,222 @@
+"""Storage size and read latency of the attendance history layouts.
+
+Writes the same synthetic history through ``LessonAttendanceRepository``
+(one row per lesson per change) and ``AttendanceSnapshotRepository`` (one
+encoded snapshot per user per sync) into separate SQLite files, then
+compares file sizes and the latency of the reader APIs.
+
+Run from the ``src`` directory::
+
+    python -m benchmarks.attendance_storage --users 200 --syncs 100
+"""
+import argparse
+import asyncio
+import pathlib
+import random
+import statistics
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from db.models.attendance_snapshot import AttendanceSnapshot
+from db.models.base import Base
+from db.models.lesson import Lesson
+from db.models.lesson_attendance import (
+    LessonAttendance as DatabaseLessonAttendance,
+)
+from db.models.user import User as DatabaseUser
+from models.obis import LessonAttendance
+from repositories.attendance_history import AttendanceHistoryRepository
+from repositories.attendance_snapshot import AttendanceSnapshotRepository
+from repositories.lesson_attendance import LessonAttendanceRepository
+from setup.settings.storage import StorageSettings
+
+
+SKIP_PERCENTAGE_STEP = 6.25
+
+type RepositoryFactory = Callable[[AsyncSession], AttendanceHistoryRepository]
+
+
+def generate_history(
+    arguments: argparse.Namespace,
+) -> list[list[tuple[int, list[LessonAttendance]]]]:
+    """Per sync, the list of (user id, changed lessons) pairs."""
+    rng = random.Random(arguments.seed)
+    states = {
+        user_id: {
+            f"MNS-{101 + lesson_index}": [0.0, 0.0]
+            for lesson_index in range(arguments.lessons)
+        }
+        for user_id in range(1, arguments.users + 1)
+    }
+    syncs: list[list[tuple[int, list[LessonAttendance]]]] = []
+    for sync_number in range(arguments.syncs):
+        sync: list[tuple[int, list[LessonAttendance]]] = []
+        for user_id, lessons in states.items():
+            changed: list[LessonAttendance] = []
+            for lesson_code, percentages in lessons.items():
+                is_first_sync = sync_number == 0
+                if not is_first_sync and rng.random() >= arguments.change_rate:
+                    continue
+                if not is_first_sync:
+                    percentages[rng.randrange(2)] += SKIP_PERCENTAGE_STEP
+                changed.append(
+                    LessonAttendance(
+                        user_id=user_id,
+                        lesson_name=lesson_code,
+                        lesson_code=lesson_code,
+                        theory_skips_percentage=percentages[0],
+                        practice_skips_percentage=percentages[1],
+                    ),
+                )
+            if changed:
+                sync.append((user_id, changed))
+        syncs.append(sync)
+    return syncs
+
+
+async def measure(
+    operation: Callable[[], Awaitable[object]],
+    repeat: int,
+) -> float:
+    timings: list[float] = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        await operation()
+        timings.append(time.perf_counter() - started_at)
+    return statistics.median(timings)
+
+
+async def benchmark_layout(
+    name: str,
+    database_path: pathlib.Path,
+    repository_factory: RepositoryFactory,
+    history_tables: list,
+    syncs: list[list[tuple[int, list[LessonAttendance]]]],
+    arguments: argparse.Namespace,
+) -> None:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{database_path}")
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with engine.begin() as connection:
+        await connection.execute(text("PRAGMA synchronous=OFF"))
+        await connection.run_sync(
+            Base.metadata.create_all,
+            tables=[
+                DatabaseUser.__table__,
+                Lesson.__table__,
+                *history_tables,
+            ],
+        )
+        await connection.execute(
+            insert(DatabaseUser),
+            [
+                {
+                    "id": user_id,
+                    "has_accepted_terms": True,
+                    "student_number": str(user_id),
+                    "encrypted_password": "",
+                }
+                for user_id in range(1, arguments.users + 1)
+            ],
+        )
+        await connection.execute(
+            insert(Lesson),
+            [
+                {"code": f"MNS-{101 + index}", "name": f"MNS-{101 + index}"}
+                for index in range(arguments.lessons)
+            ],
+        )
+
+    started_at = time.perf_counter()
+    async with session_factory() as session:
+        repository = repository_factory(session)
+        for sync in syncs:
+            for user_id, changed in sync:
+                await repository.create_attendances(user_id, changed)
+    write_time = time.perf_counter() - started_at
+
+    async with engine.begin() as connection:
+        await connection.execute(text("VACUUM"))
+
+    rng = random.Random(arguments.seed)
+    sample = [
+        (rng.randint(1, arguments.users), f"MNS-{101 + rng.randrange(arguments.lessons)}")
+        for _ in range(arguments.reads)
+    ]
+    async with session_factory() as session:
+        repository = repository_factory(session)
+
+        async def read_current_state() -> None:
+            for user_id, _ in sample:
+                await repository.get_last_attendances(user_id)
+
+        async def read_lesson_history() -> None:
+            for user_id, lesson_code in sample:
+                await repository.get_lesson_history(user_id, lesson_code)
+
+        current_state_time = await measure(read_current_state, repeat=3)
+        history_time = await measure(read_lesson_history, repeat=3)
+    await engine.dispose()
+
+    size = database_path.stat().st_size
+    print(
+        f"{name:>9}: {size / 1024:10.1f} KiB, "
+        f"write {write_time:6.2f}s, "
+        f"current state {current_state_time / len(sample) * 1e6:8.1f}us/user, "
+        f"lesson history {history_time / len(sample) * 1e6:8.1f}us/lesson",
+    )
+
+
+async def run(arguments: argparse.Namespace) -> None:
+    syncs = generate_history(arguments)
+    changes_count = sum(
+        len(changed) for sync in syncs for _, changed in sync
+    )
+    print(
+        f"{arguments.users} users x {arguments.lessons} lessons, "
+        f"{arguments.syncs} syncs, {changes_count} lesson changes",
+    )
+    settings = StorageSettings(
+        attendance_mode="snapshots",
+        snapshot_keyframe_interval=arguments.keyframe_interval,
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        await benchmark_layout(
+            "rows",
+            pathlib.Path(directory) / "rows.sqlite3",
+            LessonAttendanceRepository,
+            [DatabaseLessonAttendance.__table__],
+            syncs,
+            arguments,
+        )
+        await benchmark_layout(
+            "snapshots",
+            pathlib.Path(directory) / "snapshots.sqlite3",
+            lambda session: AttendanceSnapshotRepository(session, settings),
+            [AttendanceSnapshot.__table__],
+            syncs,
+            arguments,
+        )
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--lessons", type=int, default=8)
+    parser.add_argument("--syncs", type=int, default=100)
+    parser.add_argument("--change-rate", type=float, default=0.02)
+    parser.add_argument("--keyframe-interval", type=int, default=16)
+    parser.add_argument("--reads", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_arguments()))
@@ -0,0 +1,196 @@
+"""Latency of the cache backends and size of the serialized values.
+
+Starts the in-process fake Redis server and checks that every backend
+and serializer round trips what the bot caches (OBIS session cookies,
+sync fingerprints), expires entries and, in memory, evicts the least
+recently used one. Then times ``get`` and ``set`` from ``--clients``
+concurrent tasks.
+
+Run from the ``src`` directory::
+
+    python -m benchmarks.cache --operations 5000 --clients 8
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections.abc import AsyncGenerator, Callable
+from contextlib import (
+    AbstractAsyncContextManager,
+    asynccontextmanager,
+    nullcontext,
+)
+from functools import partial
+
+from services.cache import SERIALIZERS, Cache, InMemoryCache, RedisCache
+from services.sync_fingerprint import get_fingerprint
+from simulator.redis import FakeRedisServer
+
+
+SAMPLE_VALUES = {
+    "obis-session": [
+        ["PHPSESSID", "4f1c0d2a9be3" * 3, "obistest.manas.edu.kg", "/"],
+        ["_csrf", "a1b2c3" * 8, "obistest.manas.edu.kg", "/"],
+    ],
+    "sync-fingerprint": get_fingerprint(("attendance", 1, 2.5)),
+    "exam-id": 1234,
+}
+
+
+def is_serializer_available(name: str) -> bool:
+    try:
+        SERIALIZERS[name]()
+    except ImportError:
+        return False
+    return True
+
+
+@asynccontextmanager
+async def open_redis_cache(
+    server: FakeRedisServer,
+    serializer_name: str,
+) -> AsyncGenerator[Cache, None]:
+    from redis.asyncio import Redis
+
+    client = Redis.from_url(server.url)
+    try:
+        yield RedisCache(
+            client,
+            SERIALIZERS[serializer_name](),
+            key_prefix="benchmark:",
+            default_ttl=60,
+        )
+    finally:
+        await client.aclose()
+
+
+async def check_cache(name: str, cache: Cache) -> None:
+    for key, value in SAMPLE_VALUES.items():
+        await cache.set(key, value)
+        cached_value = await cache.get(key)
+        assert cached_value == value, (name, key, cached_value)
+    await cache.delete("exam-id")
+    assert await cache.get("exam-id") is None, name
+    await cache.set("short-lived", 1, ttl=0.05)
+    await asyncio.sleep(0.1)
+    assert await cache.get("short-lived") is None, name
+
+
+async def check_eviction() -> None:
+    cache = InMemoryCache(max_entries=2, default_ttl=60)
+    await cache.set("a", 1)
+    await cache.set("b", 2)
+    # "a" becomes the most recently used, so "b" goes
+    await cache.get("a")
+    await cache.set("c", 3)
+    assert await cache.get("b") is None
+    assert await cache.get("a") == 1 and await cache.get("c") == 3
+
+
+async def measure(
+    cache: Cache,
+    arguments: argparse.Namespace,
+) -> dict[str, list[float]]:
+    latencies: dict[str, list[float]] = {"set": [], "get": []}
+    value = SAMPLE_VALUES["obis-session"]
+
+    async def run_client(client_index: int) -> None:
+        for index in range(arguments.operations // arguments.clients):
+            key = f"user:{client_index}:{index % arguments.keys}"
+            for operation, call in (
+                ("set", lambda: cache.set(key, value)),
+                ("get", lambda: cache.get(key)),
+            ):
+                started_at = time.perf_counter()
+                await call()
+                latencies[operation].append(time.perf_counter() - started_at)
+
+    await asyncio.gather(*(run_client(index) for index in range(arguments.clients)))
+    return latencies
+
+
+def print_latencies(name: str, latencies: dict[str, list[float]]) -> None:
+    parts = []
+    for operation, operation_latencies in latencies.items():
+        percentiles = statistics.quantiles(operation_latencies, n=100)
+        parts.append(
+            f"{operation} p50 {percentiles[49] * 1e6:7.1f}us "
+            f"p99 {percentiles[98] * 1e6:7.1f}us",
+        )
+    print(f"{name:<16} {', '.join(parts)}")
+
+
+def print_sizes(serializer_names: list[str]) -> None:
+    for serializer_name in serializer_names:
+        serializer = SERIALIZERS[serializer_name]()
+        sizes = ", ".join(
+            f"{key} {len(serializer.dumps(value))}B"
+            for key, value in SAMPLE_VALUES.items()
+        )
+        print(f"{serializer_name:<8} {sizes}")
+
+
+async def run(arguments: argparse.Namespace) -> None:
+    serializer_names = [
+        name for name in arguments.serializers if is_serializer_available(name)
+    ]
+    for name in set(arguments.serializers) - set(serializer_names):
+        print(f"{name}: skipped, not installed")
+    print_sizes(serializer_names)
+
+    await check_eviction()
+    backends: dict[str, Callable[[], AbstractAsyncContextManager[Cache]]] = {
+        "memory": lambda: nullcontext(
+            InMemoryCache(max_entries=arguments.keys, default_ttl=60),
+        ),
+    }
+    async with FakeRedisServer(latency=arguments.redis_latency) as server:
+        try:
+            import redis  # noqa: F401
+        except ImportError:
+            print("redis: skipped, redis-py is not installed")
+        else:
+            for serializer_name in serializer_names:
+                backends[f"redis, {serializer_name}"] = partial(
+                    open_redis_cache,
+                    server,
+                    serializer_name,
+                )
+
+        for name, open_cache in backends.items():
+            async with open_cache() as cache:
+                await check_cache(name, cache)
+                print_latencies(name, await measure(cache, arguments))
+        print(
+            f"fake Redis: {server.stats.connections_count} connections, "
+            f"{server.stats.commands_by_name}",
+        )
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--operations", type=int, default=5000)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument(
+        "--keys",
+        type=int,
+        default=1000,
+        help="Distinct keys per client, and the in-memory capacity",
+    )
+    parser.add_argument(
+        "--redis-latency",
+        type=float,
+        default=0.0,
+        help="Seconds the fake server waits before every reply",
+    )
+    parser.add_argument(
+        "--serializers",
+        nargs="+",
+        choices=tuple(SERIALIZERS),
+        default=list(SERIALIZERS),
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_arguments()))
@@ -0,0 +1,284 @@
+"""Per-query latency of the hot sync queries under concurrent workers.
+
+Seeds a scratch database with attendance and grade history, then runs
+``--workers`` sessions at once, each repeating what a sync pass does per
+user: ``get_last_attendances``, ``get_last_grade`` and a grade insert.
+Every driver configuration gets its own engine built by
+``db.engine.create_engine``, so pool and prepared statement settings are
+the ones the bot uses.
+
+Run from the ``src`` directory::
+
+    python -m benchmarks.db_queries --workers 8 --queries 500
+"""
+import argparse
+import asyncio
+import datetime
+import random
+import statistics
+import time
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.dialects.postgresql import insert as postgres_insert
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+from db.engine import create_engine, warm_up_engine
+from db.models.base import Base
+from db.models.exam import Exam
+from db.models.lesson import Lesson
+from db.models.lesson_attendance import LessonAttendance
+from db.models.lesson_grade import LessonGrade
+from db.models.user import User
+from models.score import ScoreStatus
+from repositories.lesson_attendance import LessonAttendanceRepository
+from repositories.lesson_grade import LessonGradeRepository
+from setup.settings.database import DatabaseSettings
+
+
+USER_ID_OFFSET = 20_000_000
+LESSON_CODES = [f"MNS-{101 + index}" for index in range(8)]
+EXAM_NAMES = ("Ara Sınav", "Final", "Bütünleme")
+
+CONFIGURATIONS: dict[str, dict] = {
+    "psycopg, unprepared": {
+        "driver": "psycopg",
+        "use_prepared_statements": False,
+    },
+    "psycopg, prepared": {
+        "driver": "psycopg",
+        "use_prepared_statements": True,
+        "prepare_threshold": 1,
+    },
+    "asyncpg": {
+        "driver": "asyncpg",
+        "use_prepared_statements": True,
+    },
+}
+
+
+def build_settings(
+    arguments: argparse.Namespace,
+    configuration: dict,
+) -> DatabaseSettings:
+    return DatabaseSettings(
+        host=arguments.database_host,
+        port=arguments.database_port,
+        user=arguments.database_user,
+        password=arguments.database_password,
+        name=arguments.database_name,
+        pool_size=arguments.workers,
+        max_overflow=0,
+        **configuration,
+    )
+
+
+async def seed(engine: AsyncEngine, arguments: argparse.Namespace) -> list[int]:
+    """Returns the exam ids."""
+    user_ids = range(USER_ID_OFFSET, USER_ID_OFFSET + arguments.users)
+    created_at = datetime.datetime(2026, 9, 1)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        await connection.execute(
+            delete(User).where(User.id >= USER_ID_OFFSET),
+        )
+        await connection.execute(
+            insert(User),
+            [
+                {
+                    "id": user_id,
+                    "has_accepted_terms": True,
+                    "student_number": str(user_id),
+                    "encrypted_password": "",
+                }
+                for user_id in user_ids
+            ],
+        )
+        await connection.execute(
+            postgres_insert(Lesson)
+            .values([{"code": code, "name": code} for code in LESSON_CODES])
+            .on_conflict_do_nothing(),
+        )
+        await connection.execute(
+            postgres_insert(Exam)
+            .values(
+                [
+                    {"lesson_code": code, "name": name}
+                    for code in LESSON_CODES
+                    for name in EXAM_NAMES
+                ],
+            )
+            .on_conflict_do_nothing(),
+        )
+        exam_ids = list(
+            await connection.scalars(
+                select(Exam.id).where(Exam.lesson_code.in_(LESSON_CODES)),
+            ),
+        )
+        await connection.execute(
+            insert(LessonAttendance),
+            [
+                {
+                    "user_id": user_id,
+                    "lesson_code": code,
+                    "theory_skips_percentage": change * 6.25,
+                    "practice_skips_percentage": 0.0,
+                    "created_at": created_at + datetime.timedelta(days=change),
+                }
+                for user_id in user_ids
+                for code in LESSON_CODES
+                for change in range(arguments.history)
+            ],
+        )
+        await connection.execute(
+            insert(LessonGrade),
+            [
+                {
+                    "user_id": user_id,
+                    "exam_id": exam_id,
+                    "score": str(change),
+                    "score_status": ScoreStatus.NUMERIC,
+                    "score_value": float(change),
+                    "created_at": created_at + datetime.timedelta(days=change),
+                }
+                for user_id in user_ids
+                for exam_id in exam_ids
+                for change in range(min(arguments.history, 2))
+            ],
+        )
+    return exam_ids
+
+
+async def run_worker(
+    session_factory: async_sessionmaker,
+    arguments: argparse.Namespace,
+    exam_ids: list[int],
+    latencies: dict[str, list[float]],
+    seed: int,
+) -> None:
+    rng = random.Random(seed)
+
+    async def timed(name: str, query: Callable[[], Awaitable[object]]) -> None:
+        started_at = time.perf_counter()
+        await query()
+        latencies[name].append(time.perf_counter() - started_at)
+
+    async with session_factory() as session:
+        attendance_repository = LessonAttendanceRepository(session)
+        grade_repository = LessonGradeRepository(session)
+        for _ in range(arguments.queries):
+            user_id = USER_ID_OFFSET + rng.randrange(arguments.users)
+            exam_id = rng.choice(exam_ids)
+            await timed(
+                "get_last_attendances",
+                lambda: attendance_repository.get_last_attendances(user_id),
+            )
+            await timed(
+                "get_last_grade",
+                lambda: grade_repository.get_last_grade(
+                    user_id=user_id,
+                    exam_id=exam_id,
+                ),
+            )
+            await timed(
+                "create_grade",
+                lambda: grade_repository.create_grade(
+                    user_id=user_id,
+                    exam_id=exam_id,
+                    score=str(rng.randint(0, 100)),
+                ),
+            )
+
+
+async def benchmark_configuration(
+    name: str,
+    settings: DatabaseSettings,
+    arguments: argparse.Namespace,
+) -> None:
+    engine = create_engine(settings)
+    try:
+        exam_ids = await seed(engine, arguments)
+        await warm_up_engine(engine)
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        latencies: dict[str, list[float]] = defaultdict(list)
+        await asyncio.gather(
+            *(
+                run_worker(
+                    session_factory,
+                    arguments,
+                    exam_ids,
+                    latencies,
+                    seed=worker_index,
+                )
+                for worker_index in range(arguments.workers)
+            ),
+        )
+    finally:
+        await engine.dispose()
+
+    print(f"{name}:")
+    for query_name, query_latencies in latencies.items():
+        percentiles = statistics.quantiles(query_latencies, n=100)
+        print(
+            f"  {query_name:<22} p50 {percentiles[49] * 1000:6.2f}ms, "
+            f"p99 {percentiles[98] * 1000:6.2f}ms",
+        )
+
+
+async def run(arguments: argparse.Namespace) -> None:
+    print(
+        f"{arguments.workers} workers x {arguments.queries} users, "
+        f"{arguments.users} users with {arguments.history} changes each",
+    )
+    for name in arguments.configurations:
+        configuration = CONFIGURATIONS[name]
+        if configuration["driver"] == "asyncpg":
+            try:
+                import asyncpg  # noqa: F401
+            except ImportError:
+                print(f"{name}: skipped, asyncpg is not installed")
+                continue
+        await benchmark_configuration(
+            name,
+            build_settings(arguments, configuration),
+            arguments,
+        )
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument(
+        "--queries",
+        type=int,
+        default=500,
+        help="Users each worker runs the hot queries for",
+    )
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument(
+        "--history",
+        type=int,
+        default=10,
+        help="Attendance changes seeded per user and lesson",
+    )
+    parser.add_argument(
+        "--configurations",
+        nargs="+",
+        choices=tuple(CONFIGURATIONS),
+        default=list(CONFIGURATIONS),
+    )
+    parser.add_argument("--database-host", default="localhost")
+    parser.add_argument("--database-port", type=int, default=5432)
+    parser.add_argument("--database-user", default="postgres")
+    parser.add_argument("--database-password", default="postgres")
+    parser.add_argument(
+        "--database-name",
+        default="yoklama_load_test",
+        help="Scratch database, synthetic users are written into it",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_arguments()))
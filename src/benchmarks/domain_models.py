@@ -0,0 +1,245 @@
+"""Construction cost and per-pass memory of the hot-path domain models.
+
+Compares the slotted dataclasses in ``models`` with the Pydantic models
+they replaced, reproduced below. The Pydantic attendance path also
+includes the copy from the parse result into ``LessonAttendance`` that
+``UserService.get_attendance`` used to make.
+
+Run from the ``src`` directory::
+
+    python -m benchmarks.domain_models --users 1000 --lessons 10
+"""
+import argparse
+import datetime
+import gc
+import timeit
+import tracemalloc
+from collections.abc import Callable
+
+from pydantic import BaseModel
+
+from models.obis import (
+    Exam,
+    LessonAttendance,
+    LessonExams,
+    LessonSkipOpportunity,
+)
+from models.user import User
+
+
+class PydanticLessonAttendanceParseResult(BaseModel):
+    lesson_name: str
+    lesson_code: str
+    theory_skips_percentage: float | None
+    practice_skips_percentage: float | None
+
+
+class PydanticLessonSkipOpportunity(BaseModel):
+    theory: int | None
+    practice: int | None
+    at_risk_date: datetime.date | None = None
+
+
+class PydanticExam(BaseModel):
+    name: str
+    score: str | None
+
+
+class PydanticLessonExams(BaseModel):
+    lesson_name: str
+    lesson_code: str
+    exams: list[PydanticExam]
+
+
+class PydanticUser(BaseModel):
+    id: int
+    student_number: str
+    encrypted_password: str
+    has_accepted_terms: bool
+    auth_failures_count: int = 0
+    quarantined_until: datetime.datetime | None = None
+    is_quarantine_notified: bool = False
+    language_code: str | None = None
+    is_dashboard_enabled: bool = False
+    dashboard_message_id: int | None = None
+    dashboard_content_hash: str | None = None
+    dashboard_updated_at: datetime.datetime | None = None
+
+
+EXAM_NAMES = ("Ara Sınav", "Final", "Bütünleme")
+USER_FIELDS = {
+    "id": 1,
+    "student_number": "2104.01001",
+    "encrypted_password": "gAAAAA" + "x" * 94,
+    "has_accepted_terms": True,
+}
+
+
+def build_pydantic_attendance(user_id: int, lesson_index: int) -> LessonAttendance:
+    parse_result = PydanticLessonAttendanceParseResult(
+        lesson_name="Algoritmalar ve Programlama",
+        lesson_code=f"MNS-{lesson_index:03}",
+        theory_skips_percentage=12.5,
+        practice_skips_percentage=None,
+    )
+    return LessonAttendance(
+        user_id=user_id,
+        lesson_name=parse_result.lesson_name,
+        lesson_code=parse_result.lesson_code,
+        theory_skips_percentage=parse_result.theory_skips_percentage,
+        practice_skips_percentage=parse_result.practice_skips_percentage,
+    )
+
+
+def build_attendance(user_id: int, lesson_index: int) -> LessonAttendance:
+    return LessonAttendance(
+        user_id=user_id,
+        lesson_name="Algoritmalar ve Programlama",
+        lesson_code=f"MNS-{lesson_index:03}",
+        theory_skips_percentage=12.5,
+        practice_skips_percentage=None,
+    )
+
+
+def build_pydantic_exams(lesson_index: int) -> PydanticLessonExams:
+    return PydanticLessonExams(
+        lesson_name="Algoritmalar ve Programlama",
+        lesson_code=f"MNS-{lesson_index:03}",
+        exams=[PydanticExam(name=name, score="75") for name in EXAM_NAMES],
+    )
+
+
+def build_exams(lesson_index: int) -> LessonExams:
+    return LessonExams(
+        lesson_name="Algoritmalar ve Programlama",
+        lesson_code=f"MNS-{lesson_index:03}",
+        exams=[Exam(name=name, score="75") for name in EXAM_NAMES],
+    )
+
+
+IMPLEMENTATIONS = {
+    "pydantic": {
+        "attendance": build_pydantic_attendance,
+        "skip_opportunity": lambda: PydanticLessonSkipOpportunity(
+            theory=2,
+            practice=None,
+            at_risk_date=datetime.date(2026, 11, 2),
+        ),
+        "exams": build_pydantic_exams,
+        "user": lambda: PydanticUser(**USER_FIELDS),
+    },
+    "dataclass": {
+        "attendance": build_attendance,
+        "skip_opportunity": lambda: LessonSkipOpportunity(
+            theory=2,
+            practice=None,
+            at_risk_date=datetime.date(2026, 11, 2),
+        ),
+        "exams": build_exams,
+        "user": lambda: User(**USER_FIELDS),
+    },
+}
+
+
+def measure_construction(
+    factory: Callable[[], object],
+    number: int,
+) -> float:
+    """Best of five runs, in microseconds per object."""
+    timings = timeit.repeat(factory, number=number, repeat=5)
+    return min(timings) / number * 1_000_000
+
+
+def build_pass(
+    implementation: dict[str, Callable],
+    users_count: int,
+    lessons_count: int,
+) -> list:
+    """Everything one attendance plus grades pass keeps alive per user."""
+    return [
+        (
+            implementation["user"](),
+            [
+                implementation["attendance"](user_id, lesson_index)
+                for lesson_index in range(lessons_count)
+            ],
+            [
+                implementation["skip_opportunity"]()
+                for _ in range(lessons_count)
+            ],
+            [
+                implementation["exams"](lesson_index)
+                for lesson_index in range(lessons_count)
+            ],
+        )
+        for user_id in range(users_count)
+    ]
+
+
+def measure_pass_memory(
+    implementation: dict[str, Callable],
+    users_count: int,
+    lessons_count: int,
+) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        objects = build_pass(implementation, users_count, lessons_count)
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del objects
+    return current
+
+
+def run(arguments: argparse.Namespace) -> None:
+    for name, implementation in IMPLEMENTATIONS.items():
+        timings = {
+            "attendance": measure_construction(
+                lambda: implementation["attendance"](1, 1),
+                arguments.number,
+            ),
+            "skip_opportunity": measure_construction(
+                implementation["skip_opportunity"],
+                arguments.number,
+            ),
+            "exams": measure_construction(
+                lambda: implementation["exams"](1),
+                arguments.number,
+            ),
+            "user": measure_construction(
+                implementation["user"],
+                arguments.number,
+            ),
+        }
+        memory = measure_pass_memory(
+            implementation,
+            arguments.users,
+            arguments.lessons,
+        )
+        print(
+            f"{name}: "
+            + ", ".join(
+                f"{type_name} {timing:.2f}us"
+                for type_name, timing in timings.items()
+            )
+            + f"; pass of {arguments.users} users x {arguments.lessons} "
+            f"lessons holds {memory / 1024 / 1024:.1f} MiB",
+        )
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--lessons", type=int, default=10)
+    parser.add_argument(
+        "--number",
+        type=int,
+        default=20_000,
+        help="Objects built per timing run",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    run(parse_arguments())
@@ -0,0 +1,243 @@
+"""Footprint of the exam catalog.
+
+Writes the same synthetic grade history into two SQLite files, once in
+the old layout with the lesson code and exam name in every
+``lesson_grades`` row and once through the ``exams`` catalog, and
+compares table and index sizes. Then parses every synthetic student's
+grades page and compares the memory the results hold with and without
+interning the names.
+
+Run from the ``src`` directory::
+
+    python -m benchmarks.exam_catalog --users 2000 --changes 20
+"""
+import argparse
+import datetime
+import gc
+import pathlib
+import random
+import tempfile
+import tracemalloc
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    create_engine,
+    insert,
+    text,
+)
+
+import services.obis
+from db.models.base import Base
+from db.models.exam import Exam
+from db.models.lesson import Lesson
+from db.models.lesson_grade import LessonGrade
+from db.models.user import User
+from services.obis import parse_taken_grades_page
+from simulator.obis import (
+    EXAM_NAMES,
+    LESSON_NAMES,
+    FakeObis,
+    FakeObisConfig,
+    render_taken_grades_page,
+)
+
+
+legacy_metadata = MetaData()
+legacy_lesson_grades = Table(
+    "lesson_grades",
+    legacy_metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("lesson_code", String, nullable=False),
+    Column("user_id", Integer, nullable=False),
+    Column("exam_name", String, nullable=False),
+    Column("score", String),
+    Column("created_at", DateTime, nullable=False),
+    Index(
+        "ix_lesson_grades_user_id_lesson_code_exam_name_created_at",
+        "user_id",
+        "lesson_code",
+        "exam_name",
+        "created_at",
+    ),
+)
+
+LESSON_CODES = [f"MNS-{101 + index}" for index in range(len(LESSON_NAMES))]
+
+
+def generate_grades(arguments: argparse.Namespace) -> list[dict]:
+    rng = random.Random(arguments.seed)
+    created_at = datetime.datetime(2026, 9, 1)
+    grades: list[dict] = []
+    for user_id in range(1, arguments.users + 1):
+        for _ in range(arguments.changes):
+            created_at += datetime.timedelta(seconds=1)
+            grades.append(
+                {
+                    "user_id": user_id,
+                    "lesson_code": rng.choice(LESSON_CODES),
+                    "exam_name": rng.choice(EXAM_NAMES),
+                    "score": str(rng.randint(0, 100)),
+                    "created_at": created_at,
+                },
+            )
+    return grades
+
+
+def get_object_sizes(engine) -> dict[str, int]:
+    """Bytes per table and index, from SQLite's ``dbstat``."""
+    with engine.connect() as connection:
+        rows = connection.execute(
+            text("SELECT name, sum(pgsize) FROM dbstat GROUP BY name"),
+        )
+        return dict(rows.all())
+
+
+def write_legacy_layout(database_path: pathlib.Path, grades: list[dict]):
+    engine = create_engine(f"sqlite:///{database_path}")
+    with engine.begin() as connection:
+        legacy_metadata.create_all(connection)
+        connection.execute(insert(legacy_lesson_grades), grades)
+    return engine
+
+
+def write_catalog_layout(database_path: pathlib.Path, grades: list[dict]):
+    engine = create_engine(f"sqlite:///{database_path}")
+    with engine.begin() as connection:
+        Base.metadata.create_all(
+            connection,
+            tables=[
+                User.__table__,
+                Lesson.__table__,
+                Exam.__table__,
+                LessonGrade.__table__,
+            ],
+        )
+        connection.execute(
+            insert(Lesson),
+            [
+                {"code": code, "name": name}
+                for code, name in zip(LESSON_CODES, LESSON_NAMES)
+            ],
+        )
+        exam_ids: dict[tuple[str, str], int] = {}
+        for lesson_code in LESSON_CODES:
+            for exam_name in EXAM_NAMES:
+                exam_ids[(lesson_code, exam_name)] = connection.execute(
+                    insert(Exam)
+                    .values(lesson_code=lesson_code, name=exam_name)
+                    .returning(Exam.id),
+                ).scalar_one()
+        connection.execute(
+            insert(LessonGrade),
+            [
+                {
+                    "user_id": grade["user_id"],
+                    "exam_id": exam_ids[
+                        (grade["lesson_code"], grade["exam_name"])
+                    ],
+                    "score": grade["score"],
+                    "created_at": grade["created_at"],
+                }
+                for grade in grades
+            ],
+        )
+    return engine
+
+
+def print_sizes(name: str, sizes: dict[str, int]) -> None:
+    tables = {
+        object_name: size
+        for object_name, size in sizes.items()
+        if object_name in ("lesson_grades", "exams")
+    }
+    indexes = {
+        object_name: size
+        for object_name, size in sizes.items()
+        if object_name.startswith("ix_lesson_grades")
+    }
+    print(
+        f"{name:>7}: tables {sum(tables.values()) / 1024:9.1f} KiB, "
+        f"index {sum(indexes.values()) / 1024:9.1f} KiB",
+    )
+
+
+def benchmark_storage(arguments: argparse.Namespace) -> None:
+    grades = generate_grades(arguments)
+    print(f"{len(grades)} grade changes of {arguments.users} users")
+    with tempfile.TemporaryDirectory() as directory:
+        for name, write_layout in (
+            ("strings", write_legacy_layout),
+            ("catalog", write_catalog_layout),
+        ):
+            engine = write_layout(
+                pathlib.Path(directory) / f"{name}.sqlite3",
+                grades,
+            )
+            with engine.connect() as connection:
+                connection.execute(text("VACUUM"))
+            print_sizes(name, get_object_sizes(engine))
+            engine.dispose()
+
+
+def measure_parsed_memory(pages: list[str]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        results = [parse_taken_grades_page(page) for page in pages]
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del results
+    return current
+
+
+def benchmark_interning(arguments: argparse.Namespace) -> None:
+    fake_obis = FakeObis(
+        FakeObisConfig(students_count=arguments.users, seed=arguments.seed),
+    )
+    pages = [
+        render_taken_grades_page(student) for student in fake_obis.students
+    ]
+    interned_memory = measure_parsed_memory(pages)
+
+    get_cell_name = services.obis.get_cell_name
+    services.obis.get_cell_name = lambda cell: cell.get_text(strip=True)
+    try:
+        copied_memory = measure_parsed_memory(pages)
+    finally:
+        services.obis.get_cell_name = get_cell_name
+
+    for name, memory in (
+        ("copied", copied_memory),
+        ("interned", interned_memory),
+    ):
+        print(
+            f"{name:>8}: grades pages of {arguments.users} users hold "
+            f"{memory / 1024 / 1024:.2f} MiB",
+        )
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument(
+        "--changes",
+        type=int,
+        default=20,
+        help="Grade changes recorded per user",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments = parse_arguments()
+    benchmark_storage(arguments)
+    benchmark_interning(arguments)
@@ -0,0 +1,226 @@
+"""Cold start profile: import-time breakdown and time to the first update.
+
+The import report runs ``python -X importtime -c "import main"`` and sums
+the time spent per top-level package. The time-to-first-update runs
+spawn a fresh interpreter that imports the bot, starts serving updates
+through ``main.serve_updates`` against the fake Telegram Bot API and
+answers a queued ``/start``. ``/start`` reads the user from the scratch
+database, so engine creation and the first connection are part of the
+measurement.
+
+Run from the ``src`` directory::
+
+    python -m benchmarks.startup --runs 5
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+
+CHAT_ID = 10_000_000
+
+
+def get_import_times() -> dict[str, float]:
+    """Self time of every imported module in seconds, by top-level
+    package."""
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    package_times: dict[str, float] = defaultdict(float)
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, _, module_name = line.removeprefix("import time:").split("|")
+        package = module_name.strip().split(".", 1)[0]
+        package_times[package] += int(self_time) / 1_000_000
+    return dict(package_times)
+
+
+def format_import_report(package_times: dict[str, float], top: int) -> str:
+    total = sum(package_times.values())
+    lines = [f"imports: {total * 1000:.0f}ms in total"]
+    by_time = sorted(package_times.items(), key=lambda item: -item[1])
+    for package, package_time in by_time[:top]:
+        lines.append(
+            f"  {package:<24} {package_time * 1000:7.1f}ms "
+            f"{package_time / total:6.1%}",
+        )
+    return "\n".join(lines)
+
+
+def build_settings_data(arguments: argparse.Namespace) -> dict:
+    from cryptography.fernet import Fernet
+
+    from simulator.telegram import FAKE_TELEGRAM_BOT_TOKEN
+
+    return {
+        "telegram_bot": {"token": FAKE_TELEGRAM_BOT_TOKEN},
+        "cryptography": {"secret_key": Fernet.generate_key().decode()},
+        "database": {
+            "host": arguments.database_host,
+            "port": arguments.database_port,
+            "user": arguments.database_user,
+            "password": arguments.database_password,
+            "name": arguments.database_name,
+        },
+    }
+
+
+async def create_tables(arguments: argparse.Namespace) -> None:
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from db.models.base import Base
+    from setup.settings.app import AppSettings
+
+    settings = AppSettings.model_validate(build_settings_data(arguments))
+    engine = create_async_engine(settings.database.url)
+    try:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+    finally:
+        await engine.dispose()
+
+
+async def measure_first_update(arguments: argparse.Namespace) -> dict:
+    """Runs in the spawned interpreter, imports are part of the
+    measurement."""
+    import main
+    from aiogram import Bot
+    from aiogram.client.default import DefaultBotProperties
+    from aiogram.enums import ParseMode
+    from dishka import Provider, Scope, make_async_container
+
+    from benchmarks.update_latency import ReplyTrackingSession, build_update
+    from runtime import BackgroundTasks
+    from setup.ioc.registry import get_providers
+    from setup.settings.app import AppSettings
+    from simulator.telegram import FAKE_TELEGRAM_BOT_TOKEN, FakeTelegramConfig
+
+    imported_at = time.time()
+    settings = AppSettings.model_validate(build_settings_data(arguments))
+    session = ReplyTrackingSession(
+        FakeTelegramConfig(latency=arguments.telegram_latency),
+    )
+    bot = Bot(
+        token=FAKE_TELEGRAM_BOT_TOKEN,
+        session=session,
+        default=DefaultBotProperties(parse_mode=ParseMode.HTML),
+    )
+    provider = Provider()
+    provider.provide(
+        source=lambda: bot,
+        provides=Bot,
+        scope=Scope.APP,
+        override=True,
+    )
+    container = make_async_container(
+        *get_providers(),
+        provider,
+        context={AppSettings: settings},
+    )
+    reply = asyncio.get_running_loop().create_future()
+    session.replies[CHAT_ID] = reply
+    session.push_update(build_update(CHAT_ID, "/start"))
+
+    background_tasks = BackgroundTasks()
+    if arguments.warm_up:
+        background_tasks.start(
+            main.warm_up_database(container),
+            "warm_up_database",
+        )
+    serving = asyncio.create_task(
+        main.serve_updates(container, bot, settings, background_tasks),
+    )
+    try:
+        await asyncio.wait_for(reply, timeout=30)
+        replied_at = time.time()
+    finally:
+        serving.cancel()
+        await asyncio.gather(serving, return_exceptions=True)
+        await background_tasks.cancel()
+        await container.close()
+    return {
+        "imports": imported_at - arguments.spawned_at,
+        "first_update": replied_at - arguments.spawned_at,
+    }
+
+
+def spawn_child(arguments: argparse.Namespace) -> dict[str, float]:
+    command = [
+        sys.executable, "-m", "benchmarks.startup", "--child",
+        "--spawned-at", repr(time.time()),
+        "--telegram-latency", str(arguments.telegram_latency),
+        "--database-host", arguments.database_host,
+        "--database-port", str(arguments.database_port),
+        "--database-user", arguments.database_user,
+        "--database-password", arguments.database_password,
+        "--database-name", arguments.database_name,
+    ]
+    if not arguments.warm_up:
+        command.append("--no-warm-up")
+    process = subprocess.run(command, capture_output=True, text=True)
+    if process.returncode != 0:
+        raise RuntimeError(process.stderr)
+    return json.loads(process.stdout.splitlines()[-1])
+
+
+def run(arguments: argparse.Namespace) -> None:
+    print(format_import_report(get_import_times(), arguments.top))
+
+    if arguments.runs == 0:
+        return
+    asyncio.run(create_tables(arguments))
+    results = [spawn_child(arguments) for _ in range(arguments.runs)]
+    for phase in ("imports", "first_update"):
+        timings = [result[phase] for result in results]
+        print(
+            f"{phase}: median {statistics.median(timings) * 1000:.0f}ms, "
+            f"min {min(timings) * 1000:.0f}ms, "
+            f"max {max(timings) * 1000:.0f}ms",
+        )
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=5,
+        help="Time-to-first-update runs, 0 only prints the import report",
+    )
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--telegram-latency", type=float, default=0.01)
+    parser.add_argument(
+        "--no-warm-up",
+        dest="warm_up",
+        action="store_false",
+        help="Don't open the database pool in the background",
+    )
+    parser.add_argument("--database-host", default="localhost")
+    parser.add_argument("--database-port", type=int, default=5432)
+    parser.add_argument("--database-user", default="postgres")
+    parser.add_argument("--database-password", default="postgres")
+    parser.add_argument(
+        "--database-name",
+        default="yoklama_load_test",
+        help="Scratch database, only the tables are created in it",
+    )
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--spawned-at", type=float, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments = parse_arguments()
+    if arguments.child:
+        print(json.dumps(asyncio.run(measure_first_update(arguments))))
+    else:
+        run(arguments)
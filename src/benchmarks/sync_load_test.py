@@ -0,0 +1,396 @@
+"""End-to-end load test of the periodic sync tasks against simulators.
+
+Drives ``LessonAttendanceCheckTask`` and ``LessonGradeSyncTask`` with the real
+dishka providers, a scratch database, the fake OBIS and the fake Telegram Bot
+API, then reports throughput, per-user latency percentiles and the
+throughput and busy, idle and blocked time of every pipeline stage.
+With several ``--backends`` the same passes run against each database
+and their throughput is compared at the end. ``--cache redis`` keeps
+OBIS sessions and sync fingerprints in the fake Redis server instead of
+process memory.
+
+Run from the ``src`` directory::
+
+    python -m benchmarks.sync_load_test --users 1000 --obis-latency 0.05
+    python -m benchmarks.sync_load_test --backends postgres sqlite
+    python -m benchmarks.sync_load_test --backends sqlite --cache redis
+"""
+import argparse
+import asyncio
+import pathlib
+import statistics
+import time
+from collections.abc import AsyncGenerator
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+
+import httpx
+from aiogram import Bot
+from aiogram.client.default import DefaultBotProperties
+from aiogram.enums import ParseMode
+from cryptography.fernet import Fernet
+from dishka import AsyncContainer, Provider, Scope, make_async_container
+from sqlalchemy import delete, insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from db.models.base import Base
+from db.models.user import User as DatabaseUser
+from periodic_tasks import (
+    AttendanceSync,
+    GradeSync,
+    LessonAttendanceCheckTask,
+    LessonGradeSyncTask,
+    UserSync,
+)
+from pipeline import format_stage_metrics
+from services.circuit_breaker import CircuitBreaker
+from services.concurrency_limit import AdaptiveConcurrencyLimiter
+from services.crypto import PasswordCryptor
+from services.obis import ObisHttpClient, ObisTransport
+from setup.ioc.registry import get_providers
+from setup.settings.app import AppSettings
+from simulator.obis import OBIS_BASE_URL, FakeObis, FakeObisConfig
+from simulator.redis import FakeRedisServer
+from simulator.telegram import (
+    FAKE_TELEGRAM_BOT_TOKEN,
+    FakeTelegramConfig,
+    FakeTelegramSession,
+)
+
+
+USER_ID_OFFSET = 10_000_000
+
+
+@dataclass(slots=True)
+class LatencyRecorder:
+    latencies: list[float] = field(default_factory=list)
+    failures_count: int = 0
+
+    def record(self, sync: UserSync) -> None:
+        # users dropped before fetching, when a pass stops early
+        if sync.started_at is None:
+            return
+        self.latencies.append(time.perf_counter() - sync.started_at)
+        if sync.is_failed:
+            self.failures_count += 1
+
+
+class TimedLessonAttendanceCheckTask(LessonAttendanceCheckTask):
+
+    def __init__(self, container: AsyncContainer, recorder: LatencyRecorder):
+        super().__init__(container)
+        self.recorder = recorder
+
+    def _finish_user(self, sync: AttendanceSync) -> None:
+        super()._finish_user(sync)
+        self.recorder.record(sync)
+
+
+class TimedLessonGradeSyncTask(LessonGradeSyncTask):
+
+    def __init__(self, container: AsyncContainer, recorder: LatencyRecorder):
+        super().__init__(container)
+        self.recorder = recorder
+
+    def _finish_user(self, sync: GradeSync) -> None:
+        super()._finish_user(sync)
+        self.recorder.record(sync)
+
+
+def simulator_provider(fake_obis: FakeObis, bot: Bot) -> Provider:
+
+    async def get_fake_obis_http_client(
+        circuit_breaker: CircuitBreaker,
+        concurrency_limiter: AdaptiveConcurrencyLimiter,
+    ) -> AsyncGenerator[ObisHttpClient, None]:
+        transport = ObisTransport(
+            transport=fake_obis.transport(),
+            circuit_breaker=circuit_breaker,
+            concurrency_limiter=concurrency_limiter,
+        )
+        async with httpx.AsyncClient(
+            base_url=OBIS_BASE_URL,
+            transport=transport,
+            follow_redirects=True,
+        ) as http_client:
+            yield ObisHttpClient(http_client)
+
+    provider = Provider()
+    provider.provide(
+        source=lambda: bot,
+        provides=Bot,
+        scope=Scope.APP,
+        override=True,
+    )
+    provider.provide(
+        source=get_fake_obis_http_client,
+        provides=ObisHttpClient,
+        scope=Scope.REQUEST,
+        override=True,
+    )
+    return provider
+
+
+def build_settings(
+    arguments: argparse.Namespace,
+    backend: str,
+    redis_url: str | None,
+) -> AppSettings:
+    cache = {
+        "backend": arguments.cache,
+        "serializer": arguments.cache_serializer,
+    }
+    if redis_url is not None:
+        cache["redis_url"] = redis_url
+    return AppSettings.model_validate(
+        {
+            "telegram_bot": {"token": FAKE_TELEGRAM_BOT_TOKEN},
+            "cryptography": {"secret_key": Fernet.generate_key().decode()},
+            "database": {
+                "backend": backend,
+                "sqlite": {"path": arguments.sqlite_path},
+                "host": arguments.database_host,
+                "port": arguments.database_port,
+                "user": arguments.database_user,
+                "password": arguments.database_password,
+                "name": arguments.database_name,
+            },
+            "sync_pipeline": {
+                "fetch_concurrency": arguments.fetch_concurrency,
+                "notify_concurrency": arguments.notify_concurrency,
+                "queue_size": arguments.queue_size,
+            },
+            "dashboard": {
+                "coalesce_window_seconds": (
+                    arguments.dashboard_coalesce_window
+                ),
+            },
+            "cache": cache,
+        },
+    )
+
+
+async def seed_users(
+    container: AsyncContainer,
+    fake_obis: FakeObis,
+    is_dashboard_enabled: bool,
+) -> None:
+    engine = await container.get(AsyncEngine)
+    password_cryptor = await container.get(PasswordCryptor)
+    rows = [
+        {
+            "id": USER_ID_OFFSET + index,
+            "has_accepted_terms": True,
+            "student_number": student.student_number,
+            "encrypted_password": password_cryptor.encrypt(student.password),
+            "is_dashboard_enabled": is_dashboard_enabled,
+        }
+        for index, student in enumerate(fake_obis.students)
+    ]
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        await connection.execute(
+            delete(DatabaseUser).where(DatabaseUser.id >= USER_ID_OFFSET),
+        )
+        for offset in range(0, len(rows), 1000):
+            await connection.execute(
+                insert(DatabaseUser),
+                rows[offset:offset + 1000],
+            )
+
+
+def get_throughput(recorder: LatencyRecorder, elapsed: float) -> float:
+    return len(recorder.latencies) / elapsed if elapsed else 0.0
+
+
+def format_report(
+    title: str,
+    recorder: LatencyRecorder,
+    elapsed: float,
+) -> str:
+    latencies = sorted(recorder.latencies)
+    if len(latencies) >= 2:
+        percentiles = statistics.quantiles(latencies, n=100)
+        p50, p99 = percentiles[49], percentiles[98]
+    else:
+        p50 = p99 = latencies[0] if latencies else 0.0
+    throughput = get_throughput(recorder, elapsed)
+    return (
+        f"{title}: {len(latencies)} users in {elapsed:.2f}s, "
+        f"{throughput:.1f} users/s, "
+        f"p50 {p50 * 1000:.1f}ms, p99 {p99 * 1000:.1f}ms, "
+        f"{recorder.failures_count} failed"
+    )
+
+
+async def run_backend(
+    arguments: argparse.Namespace,
+    backend: str,
+) -> dict[str, float]:
+    """Returns the users per second of each task, over all its passes."""
+    if backend == "sqlite":
+        # a fresh file, so both backends start from the same state
+        for suffix in ("", "-wal", "-shm"):
+            pathlib.Path(arguments.sqlite_path + suffix).unlink(missing_ok=True)
+    fake_obis = FakeObis(
+        FakeObisConfig(
+            students_count=arguments.users,
+            latency=arguments.obis_latency,
+            latency_jitter=arguments.obis_latency_jitter,
+            error_rate=arguments.obis_error_rate,
+            change_rate=arguments.change_rate,
+        ),
+    )
+    telegram_session = FakeTelegramSession(
+        FakeTelegramConfig(
+            latency=arguments.telegram_latency,
+            error_rate=arguments.telegram_error_rate,
+        ),
+    )
+    bot = Bot(
+        token=FAKE_TELEGRAM_BOT_TOKEN,
+        session=telegram_session,
+        default=DefaultBotProperties(parse_mode=ParseMode.HTML),
+    )
+    exit_stack = AsyncExitStack()
+    redis_url = None
+    if arguments.cache == "redis":
+        fake_redis = await exit_stack.enter_async_context(FakeRedisServer())
+        redis_url = fake_redis.url
+    container = make_async_container(
+        *get_providers(),
+        simulator_provider(fake_obis, bot),
+        context={AppSettings: build_settings(arguments, backend, redis_url)},
+    )
+    throughputs: dict[str, float] = {}
+    try:
+        await seed_users(container, fake_obis, arguments.dashboard)
+
+        tasks = {
+            "attendance": TimedLessonAttendanceCheckTask,
+            "grades": TimedLessonGradeSyncTask,
+        }
+        for task_name in arguments.tasks:
+            synced_count = 0
+            total_elapsed = 0.0
+            for pass_number in range(1, arguments.passes + 1):
+                recorder = LatencyRecorder()
+                task = tasks[task_name](container, recorder)
+                started_at = time.perf_counter()
+                stage_metrics = await task.execute()
+                elapsed = time.perf_counter() - started_at
+                synced_count += len(recorder.latencies)
+                total_elapsed += elapsed
+                print(
+                    format_report(
+                        f"{backend} {task_name} pass {pass_number}",
+                        recorder,
+                        elapsed,
+                    ),
+                )
+                print(f"  {format_stage_metrics(stage_metrics, elapsed)}")
+            throughputs[task_name] = (
+                synced_count / total_elapsed if total_elapsed else 0.0
+            )
+    finally:
+        await container.close()
+        await exit_stack.aclose()
+
+    print(
+        f"OBIS: {fake_obis.stats.requests_count} requests, "
+        f"{fake_obis.stats.failed_requests_count} failed, "
+        f"{fake_obis.stats.logins_count} logins, "
+        f"{fake_obis.stats.changes_count} changes",
+    )
+    print(
+        f"Telegram: {telegram_session.stats.requests_count} requests, "
+        f"{telegram_session.stats.failed_requests_count} failed, "
+        f"{telegram_session.stats.requests_by_method}",
+    )
+    return throughputs
+
+
+async def run(arguments: argparse.Namespace) -> None:
+    throughputs = {
+        backend: await run_backend(arguments, backend)
+        for backend in arguments.backends
+    }
+    if len(throughputs) < 2:
+        return
+    print("Throughput over all passes, users/s:")
+    for task_name in arguments.tasks:
+        print(
+            f"  {task_name}: "
+            + ", ".join(
+                f"{backend} {backend_throughputs[task_name]:.1f}"
+                for backend, backend_throughputs in throughputs.items()
+            ),
+        )
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--passes", type=int, default=2)
+    parser.add_argument(
+        "--tasks",
+        nargs="+",
+        choices=("attendance", "grades"),
+        default=["attendance", "grades"],
+    )
+    parser.add_argument("--obis-latency", type=float, default=0.05)
+    parser.add_argument("--obis-latency-jitter", type=float, default=0.02)
+    parser.add_argument("--obis-error-rate", type=float, default=0.0)
+    parser.add_argument("--change-rate", type=float, default=0.05)
+    parser.add_argument(
+        "--fetch-concurrency",
+        type=int,
+        default=4,
+        help="1 along with --notify-concurrency 1 syncs one user at a time",
+    )
+    parser.add_argument("--notify-concurrency", type=int, default=2)
+    parser.add_argument("--queue-size", type=int, default=8)
+    parser.add_argument("--telegram-latency", type=float, default=0.01)
+    parser.add_argument("--telegram-error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--dashboard",
+        action="store_true",
+        help="Seed users with the live dashboard instead of change messages",
+    )
+    parser.add_argument("--dashboard-coalesce-window", type=int, default=0)
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=("postgres", "sqlite"),
+        default=["postgres"],
+    )
+    parser.add_argument(
+        "--cache",
+        choices=("memory", "redis"),
+        default="memory",
+        help="redis starts a fake server in this process",
+    )
+    parser.add_argument(
+        "--cache-serializer",
+        choices=("json", "orjson", "msgpack"),
+        default="json",
+    )
+    parser.add_argument(
+        "--sqlite-path",
+        default="yoklama_load_test.sqlite3",
+        help="Scratch SQLite file, deleted before the run",
+    )
+    parser.add_argument("--database-host", default="localhost")
+    parser.add_argument("--database-port", type=int, default=5432)
+    parser.add_argument("--database-user", default="postgres")
+    parser.add_argument("--database-password", default="postgres")
+    parser.add_argument(
+        "--database-name",
+        default="yoklama_load_test",
+        help="Scratch database, synthetic users are written into it",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_arguments()))
@@ -0,0 +1,222 @@
+"""Update handling latency of long polling versus the webhook runtime.
+
+Feeds the same stream of messages to a dispatcher through the fake
+Telegram Bot API, once via ``getUpdates`` and once via HTTP requests to the
+local webhook server, and reports the time from an update being sent to
+the bot's reply. The handler only sleeps for ``--handler-latency``, so the
+numbers show the cost of the transport and of the concurrency limit rather
+than of OBIS or the database.
+
+Run from the ``src`` directory::
+
+    python -m benchmarks.update_latency --updates 2000 --rate 200
+"""
+import argparse
+import asyncio
+import secrets
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import aiohttp
+from aiogram import Bot, Dispatcher, Router
+from aiogram.types import Message
+
+from setup.settings.telegram_bot import TelegramBotSettings
+from simulator.telegram import (
+    FAKE_TELEGRAM_BOT_TOKEN,
+    FakeTelegramConfig,
+    FakeTelegramSession,
+)
+from webhook import start_webhook
+
+
+CHAT_ID_OFFSET = 10_000_000
+
+type Update = dict[str, Any]
+
+
+class ReplyTrackingSession(FakeTelegramSession):
+    """Resolves the future registered for a chat when the bot replies
+    to it."""
+
+    def __init__(self, config: FakeTelegramConfig):
+        super().__init__(config)
+        self.replies: dict[int, asyncio.Future[float]] = {}
+
+    async def get_result(
+        self,
+        bot: Bot,
+        api_method: str,
+        method: Any,
+    ) -> Any:
+        result = await super().get_result(bot, api_method, method)
+        if api_method == "sendMessage":
+            reply = self.replies.pop(method.chat_id, None)
+            if reply is not None and not reply.done():
+                reply.set_result(time.perf_counter())
+        return result
+
+
+def build_dispatcher(handler_latency: float) -> Dispatcher:
+    router = Router()
+
+    @router.message()
+    async def on_message(message: Message) -> None:
+        await asyncio.sleep(handler_latency)
+        await message.answer("pong")
+
+    dispatcher = Dispatcher()
+    dispatcher.include_router(router)
+    return dispatcher
+
+
+def build_update(chat_id: int, text: str = "ping") -> Update:
+    return {
+        "message": {
+            "message_id": 1,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "Student"},
+            "text": text,
+        },
+    }
+
+
+async def measure(
+    session: ReplyTrackingSession,
+    send_update: Callable[[int, Update], Awaitable[None]],
+    arguments: argparse.Namespace,
+) -> tuple[list[float], float]:
+    loop = asyncio.get_running_loop()
+    latencies: list[float] = []
+
+    async def send(index: int) -> None:
+        chat_id = CHAT_ID_OFFSET + index
+        reply = loop.create_future()
+        session.replies[chat_id] = reply
+        started_at = time.perf_counter()
+        await send_update(index, build_update(chat_id))
+        latencies.append(await reply - started_at)
+
+    started_at = time.perf_counter()
+    senders = []
+    for index in range(arguments.updates):
+        senders.append(asyncio.create_task(send(index)))
+        await asyncio.sleep(1 / arguments.rate)
+    await asyncio.gather(*senders)
+    return latencies, time.perf_counter() - started_at
+
+
+async def run_polling(arguments: argparse.Namespace) -> tuple[list[float], float]:
+    session = ReplyTrackingSession(
+        FakeTelegramConfig(latency=arguments.telegram_latency),
+    )
+    bot = Bot(token=FAKE_TELEGRAM_BOT_TOKEN, session=session)
+    dispatcher = build_dispatcher(arguments.handler_latency)
+    polling = asyncio.create_task(
+        dispatcher.start_polling(
+            bot,
+            handle_signals=False,
+            close_bot_session=False,
+            tasks_concurrency_limit=arguments.max_concurrent_updates,
+        ),
+    )
+
+    async def send_update(index: int, update: Update) -> None:
+        session.push_update(update)
+
+    try:
+        return await measure(session, send_update, arguments)
+    finally:
+        await dispatcher.stop_polling()
+        await polling
+
+
+async def run_webhook(arguments: argparse.Namespace) -> tuple[list[float], float]:
+    session = ReplyTrackingSession(
+        FakeTelegramConfig(latency=arguments.telegram_latency),
+    )
+    bot = Bot(token=FAKE_TELEGRAM_BOT_TOKEN, session=session)
+    secret_token = secrets.token_urlsafe(32)
+    settings = TelegramBotSettings.model_validate(
+        {
+            "token": FAKE_TELEGRAM_BOT_TOKEN,
+            "max_concurrent_updates": arguments.max_concurrent_updates,
+            "webhook": {
+                "url": "https://example.com/telegram/webhook",
+                "port": arguments.port,
+                "secret_token": secret_token,
+            },
+        },
+    )
+    webhook_url = (
+        f"http://{settings.webhook.host}:{settings.webhook.port}"
+        f"{settings.webhook.path}"
+    )
+    runner = await start_webhook(
+        build_dispatcher(arguments.handler_latency),
+        bot,
+        settings,
+    )
+    # Telegram opens at most max_connections connections to the webhook
+    connector = aiohttp.TCPConnector(limit=settings.webhook.max_connections)
+    try:
+        async with aiohttp.ClientSession(connector=connector) as client:
+
+            async def send_update(index: int, update: Update) -> None:
+                async with client.post(
+                    webhook_url,
+                    json={"update_id": index + 1, **update},
+                    headers={"X-Telegram-Bot-Api-Secret-Token": secret_token},
+                ) as response:
+                    response.raise_for_status()
+
+            return await measure(session, send_update, arguments)
+    finally:
+        await runner.cleanup()
+
+
+def format_report(title: str, latencies: list[float], elapsed: float) -> str:
+    latencies = sorted(latencies)
+    percentiles = statistics.quantiles(latencies, n=100)
+    return (
+        f"{title}: {len(latencies)} updates in {elapsed:.2f}s, "
+        f"p50 {percentiles[49] * 1000:.1f}ms, "
+        f"p99 {percentiles[98] * 1000:.1f}ms, "
+        f"max {latencies[-1] * 1000:.1f}ms"
+    )
+
+
+async def run(arguments: argparse.Namespace) -> None:
+    runtimes = {"polling": run_polling, "webhook": run_webhook}
+    for name in arguments.runtimes:
+        latencies, elapsed = await runtimes[name](arguments)
+        print(format_report(name, latencies, elapsed))
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--updates", type=int, default=1000)
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=100,
+        help="Updates sent per second",
+    )
+    parser.add_argument(
+        "--runtimes",
+        nargs="+",
+        choices=("polling", "webhook"),
+        default=["polling", "webhook"],
+    )
+    parser.add_argument("--handler-latency", type=float, default=0.05)
+    parser.add_argument("--telegram-latency", type=float, default=0.01)
+    parser.add_argument("--max-concurrent-updates", type=int, default=100)
+    parser.add_argument("--port", type=int, default=8089)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_arguments()))
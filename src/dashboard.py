@@ -0,0 +1,61 @@
+import hashlib
+import logging
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError, TelegramBadRequest
+from aiogram.types import InlineKeyboardMarkup
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_content_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+async def publish_dashboard(
+    bot: Bot,
+    *,
+    chat_id: int,
+    text: str,
+    message_id: int | None,
+    reply_markup: InlineKeyboardMarkup | None = None,
+) -> int:
+    """Edit the user's pinned dashboard in place, or send and pin a new one
+    if there is none or it can't be edited anymore (e.g. it was deleted).
+
+    Returns the id of the dashboard message.
+    """
+    if message_id is not None:
+        try:
+            await bot.edit_message_text(
+                chat_id=chat_id,
+                message_id=message_id,
+                text=text,
+                reply_markup=reply_markup,
+            )
+        except TelegramBadRequest as error:
+            if "message is not modified" in error.message:
+                return message_id
+            logger.info(
+                "Could not edit dashboard of user %s, sending a new one: %s",
+                chat_id,
+                error.message,
+            )
+        else:
+            return message_id
+
+    message = await bot.send_message(
+        chat_id=chat_id,
+        text=text,
+        reply_markup=reply_markup,
+    )
+    try:
+        await bot.pin_chat_message(
+            chat_id=chat_id,
+            message_id=message.message_id,
+            disable_notification=True,
+        )
+    except TelegramAPIError:
+        logger.warning("Could not pin dashboard of user %s", chat_id)
+    return message.message_id
@@ -0,0 +1,105 @@
+"""add exam catalog
+
+Revision ID: 0b7e4d19c3a6
+Revises: f2a7d5c8e913
+Create Date: 2026-10-19 18:12:40.518273
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b7e4d19c3a6'
+down_revision: Union[str, Sequence[str], None] = 'f2a7d5c8e913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Dropped columns keep their space until the rows are rewritten, run
+# VACUUM FULL on the grade partitions to get it back right away.
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('exams',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('lesson_code', sa.String(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['lesson_code'], ['lessons.code'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('lesson_code', 'name')
+    )
+    op.execute(
+        'INSERT INTO exams (lesson_code, name) '
+        'SELECT lesson_code, exam_name FROM lesson_grades '
+        'UNION '
+        'SELECT lesson_code, exam_name FROM grade_semester_summaries'
+    )
+
+    op.execute(
+        'ALTER TABLE lesson_grades ADD COLUMN exam_id integer '
+        'REFERENCES exams (id) ON UPDATE CASCADE ON DELETE CASCADE'
+    )
+    op.execute(
+        'UPDATE lesson_grades SET exam_id = exams.id FROM exams '
+        'WHERE exams.lesson_code = lesson_grades.lesson_code '
+        'AND exams.name = lesson_grades.exam_name'
+    )
+    op.execute('ALTER TABLE lesson_grades ALTER COLUMN exam_id SET NOT NULL')
+    op.drop_index('ix_lesson_grades_user_id_lesson_code_exam_name_created_at', table_name='lesson_grades')
+    op.execute('ALTER TABLE lesson_grades DROP COLUMN lesson_code, DROP COLUMN exam_name')
+    op.create_index('ix_lesson_grades_user_id_exam_id_created_at', 'lesson_grades', ['user_id', 'exam_id', 'created_at'], unique=False)
+
+    op.add_column('grade_semester_summaries', sa.Column('exam_id', sa.Integer(), nullable=True))
+    op.execute(
+        'UPDATE grade_semester_summaries SET exam_id = exams.id FROM exams '
+        'WHERE exams.lesson_code = grade_semester_summaries.lesson_code '
+        'AND exams.name = grade_semester_summaries.exam_name'
+    )
+    op.alter_column('grade_semester_summaries', 'exam_id', nullable=False)
+    op.drop_constraint('grade_semester_summaries_pkey', 'grade_semester_summaries', type_='primary')
+    op.drop_column('grade_semester_summaries', 'exam_name')
+    op.drop_column('grade_semester_summaries', 'lesson_code')
+    op.create_primary_key('grade_semester_summaries_pkey', 'grade_semester_summaries', ['user_id', 'exam_id', 'semester'])
+    op.create_foreign_key(None, 'grade_semester_summaries', 'exams', ['exam_id'], ['id'], onupdate='CASCADE', ondelete='CASCADE')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('grade_semester_summaries', sa.Column('lesson_code', sa.String(), nullable=True))
+    op.add_column('grade_semester_summaries', sa.Column('exam_name', sa.String(), nullable=True))
+    op.execute(
+        'UPDATE grade_semester_summaries '
+        'SET lesson_code = exams.lesson_code, exam_name = exams.name '
+        'FROM exams WHERE exams.id = grade_semester_summaries.exam_id'
+    )
+    op.alter_column('grade_semester_summaries', 'lesson_code', nullable=False)
+    op.alter_column('grade_semester_summaries', 'exam_name', nullable=False)
+    op.drop_constraint('grade_semester_summaries_pkey', 'grade_semester_summaries', type_='primary')
+    op.drop_column('grade_semester_summaries', 'exam_id')
+    op.create_primary_key('grade_semester_summaries_pkey', 'grade_semester_summaries', ['user_id', 'lesson_code', 'exam_name', 'semester'])
+    op.create_foreign_key(None, 'grade_semester_summaries', 'lessons', ['lesson_code'], ['code'], onupdate='CASCADE', ondelete='CASCADE')
+
+    op.execute(
+        'ALTER TABLE lesson_grades ADD COLUMN lesson_code varchar '
+        'REFERENCES lessons (code) ON UPDATE CASCADE ON DELETE CASCADE, '
+        'ADD COLUMN exam_name varchar'
+    )
+    op.execute(
+        'UPDATE lesson_grades '
+        'SET lesson_code = exams.lesson_code, exam_name = exams.name '
+        'FROM exams WHERE exams.id = lesson_grades.exam_id'
+    )
+    op.execute(
+        'ALTER TABLE lesson_grades '
+        'ALTER COLUMN lesson_code SET NOT NULL, '
+        'ALTER COLUMN exam_name SET NOT NULL'
+    )
+    op.drop_index('ix_lesson_grades_user_id_exam_id_created_at', table_name='lesson_grades')
+    op.execute('ALTER TABLE lesson_grades DROP COLUMN exam_id')
+    op.create_index('ix_lesson_grades_user_id_lesson_code_exam_name_created_at', 'lesson_grades', ['user_id', 'lesson_code', 'exam_name', 'created_at'], unique=False)
+
+    op.drop_table('exams')
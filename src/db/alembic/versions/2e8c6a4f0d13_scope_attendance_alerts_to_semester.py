@@ -0,0 +1,58 @@
+"""scope attendance alerts to semester
+
+Revision ID: 2e8c6a4f0d13
+Revises: 7b3d5f9a1c24
+Create Date: 2026-10-20 11:03:27.615094
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2e8c6a4f0d13'
+down_revision: Union[str, Sequence[str], None] = '7b3d5f9a1c24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# services.history_retention.get_semester of the month an alert was
+# enqueued in
+SEMESTER_OF_CREATED_AT = (
+    "CASE "
+    "WHEN extract(month FROM created_at) = 1 "
+    "THEN (extract(year FROM created_at)::integer - 1) || '-fall' "
+    "WHEN extract(month FROM created_at) >= 8 "
+    "THEN extract(year FROM created_at)::integer || '-fall' "
+    "ELSE extract(year FROM created_at)::integer || '-spring' "
+    "END"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('attendance_alerts', sa.Column('semester', sa.String(), nullable=True))
+    op.execute(f'UPDATE attendance_alerts SET semester = {SEMESTER_OF_CREATED_AT}')
+    op.alter_column('attendance_alerts', 'semester', nullable=False)
+    op.drop_constraint('uq_attendance_alerts_dedupe', 'attendance_alerts', type_='unique')
+    op.create_unique_constraint('uq_attendance_alerts_dedupe', 'attendance_alerts', ['user_id', 'lesson_code', 'kind', 'semester', 'remaining_skips'])
+    op.create_index('ix_latest_lessons_attendance_created_at', 'latest_lessons_attendance', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_latest_lessons_attendance_created_at', table_name='latest_lessons_attendance')
+    # only the latest alert of every older key survives
+    op.execute(
+        'DELETE FROM attendance_alerts AS alert '
+        'USING attendance_alerts AS newer '
+        'WHERE newer.user_id = alert.user_id '
+        'AND newer.lesson_code = alert.lesson_code '
+        'AND newer.kind = alert.kind '
+        'AND newer.remaining_skips = alert.remaining_skips '
+        'AND newer.id > alert.id'
+    )
+    op.drop_constraint('uq_attendance_alerts_dedupe', 'attendance_alerts', type_='unique')
+    op.create_unique_constraint('uq_attendance_alerts_dedupe', 'attendance_alerts', ['user_id', 'lesson_code', 'kind', 'remaining_skips'])
+    op.drop_column('attendance_alerts', 'semester')
@@ -0,0 +1,34 @@
+"""add user auth quarantine
+
+Revision ID: 3f6d2b8c9e41
+Revises: b981a1fb5b81
+Create Date: 2026-10-19 10:12:41.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f6d2b8c9e41'
+down_revision: Union[str, Sequence[str], None] = 'b981a1fb5b81'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('auth_failures_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('users', sa.Column('quarantined_until', sa.DateTime(), nullable=True))
+    op.add_column('users', sa.Column('is_quarantine_notified', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.create_index('ix_users_quarantined_until', 'users', ['quarantined_until'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_quarantined_until', table_name='users')
+    op.drop_column('users', 'is_quarantine_notified')
+    op.drop_column('users', 'quarantined_until')
+    op.drop_column('users', 'auth_failures_count')
@@ -0,0 +1,112 @@
+"""add normalized scores
+
+Revision ID: 4d2b9e6f1a87
+Revises: 9c4e1f7a2b58
+Create Date: 2026-10-19 22:31:08.914562
+
+"""
+import math
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d2b9e6f1a87'
+down_revision: Union[str, Sequence[str], None] = '9c4e1f7a2b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# models.score.parse_score as of this revision, the application can't be
+# imported from here.
+MISSING_MARKS = {'', '-', '–', '—'}
+ABSENT_MARKS = {
+    'g', 'gr', 'girmedi', 'gelmedi', 'katılmadı', 'келген жок',
+    'катышкан жок', 'н/я', 'неявка', 'absent',
+}
+
+SCORED_TABLES = {
+    'lesson_grades': ('score', 'score_status', 'score_value'),
+    'grade_semester_summaries': (
+        'last_score',
+        'last_score_status',
+        'last_score_value',
+    ),
+}
+
+
+def parse_score(score: str) -> tuple[str, float | None]:
+    text = ' '.join(score.split())
+    mark = text.casefold()
+    if mark in MISSING_MARKS:
+        return 'missing', None
+    if mark in ABSENT_MARKS:
+        return 'absent', None
+    try:
+        value = float(text.replace(',', '.'))
+    except ValueError:
+        return 'other', None
+    if not math.isfinite(value):
+        return 'other', None
+    return 'numeric', value + 0.0
+
+
+def backfill(table_name: str, columns: tuple[str, str, str]) -> None:
+    score_column, status_column, value_column = columns
+    connection = op.get_bind()
+    # there are few distinct scores, each is parsed once and all rows
+    # are updated in one pass
+    scores = connection.execute(
+        sa.text(
+            f'SELECT DISTINCT {score_column} FROM {table_name} '
+            f'WHERE {score_column} IS NOT NULL'
+        ),
+    ).scalars().all()
+    parsed_scores = []
+    for score in scores:
+        status, value = parse_score(score)
+        # missing is already the default
+        if status != 'missing':
+            parsed_scores.append((score, status, value))
+    if not parsed_scores:
+        return
+    table = sa.table(
+        table_name,
+        sa.column(score_column, sa.String),
+        sa.column(status_column, sa.String),
+        sa.column(value_column, sa.Float),
+    )
+    parsed = sa.values(
+        sa.column('score', sa.String),
+        sa.column('status', sa.String),
+        sa.column('value', sa.Float),
+        name='parsed',
+    ).data(parsed_scores)
+    connection.execute(
+        table.update()
+        .where(table.c[score_column] == parsed.c.score)
+        .values({
+            status_column: parsed.c.status,
+            # a column of only NULLs has no type of its own
+            value_column: sa.cast(parsed.c.value, sa.Float),
+        }),
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table_name, columns in SCORED_TABLES.items():
+        _, status_column, value_column = columns
+        # a constant default doesn't rewrite the table
+        op.add_column(table_name, sa.Column(status_column, sa.String(), server_default='missing', nullable=False))
+        op.add_column(table_name, sa.Column(value_column, sa.Float(), nullable=True))
+        backfill(table_name, columns)
+        op.alter_column(table_name, status_column, server_default=None)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table_name, (_, status_column, value_column) in SCORED_TABLES.items():
+        op.drop_column(table_name, value_column)
+        op.drop_column(table_name, status_column)
@@ -0,0 +1,86 @@
+"""add latest history rows
+
+Revision ID: 7b3d5f9a1c24
+Revises: 4d2b9e6f1a87
+Create Date: 2026-10-20 10:12:45.208317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b3d5f9a1c24'
+down_revision: Union[str, Sequence[str], None] = '4d2b9e6f1a87'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('latest_lessons_attendance',
+    sa.Column('user_id', sa.BIGINT(), nullable=False),
+    sa.Column('lesson_code', sa.String(), nullable=False),
+    sa.Column('theory_skips_percentage', sa.Float(), nullable=True),
+    sa.Column('practice_skips_percentage', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['lesson_code'], ['lessons.code'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'lesson_code')
+    )
+    op.create_table('latest_lesson_grades',
+    sa.Column('user_id', sa.BIGINT(), nullable=False),
+    sa.Column('exam_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.String(), nullable=True),
+    sa.Column('score_status', sa.String(), nullable=False),
+    sa.Column('score_value', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['exam_id'], ['exams.id'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'exam_id')
+    )
+
+    # the history that is still there first, then the last values of the
+    # partitions that were already rolled up and dropped
+    op.execute(
+        'INSERT INTO latest_lessons_attendance '
+        '(user_id, lesson_code, theory_skips_percentage, practice_skips_percentage, created_at) '
+        'SELECT DISTINCT ON (user_id, lesson_code) '
+        'user_id, lesson_code, theory_skips_percentage, practice_skips_percentage, created_at '
+        'FROM lessons_attendance '
+        'ORDER BY user_id, lesson_code, created_at DESC, id DESC'
+    )
+    op.execute(
+        'INSERT INTO latest_lessons_attendance '
+        '(user_id, lesson_code, theory_skips_percentage, practice_skips_percentage, created_at) '
+        'SELECT DISTINCT ON (user_id, lesson_code) '
+        'user_id, lesson_code, last_theory_skips_percentage, last_practice_skips_percentage, last_created_at '
+        'FROM attendance_semester_summaries '
+        'ORDER BY user_id, lesson_code, last_created_at DESC '
+        'ON CONFLICT (user_id, lesson_code) DO NOTHING'
+    )
+    op.execute(
+        'INSERT INTO latest_lesson_grades '
+        '(user_id, exam_id, score, score_status, score_value, created_at) '
+        'SELECT DISTINCT ON (user_id, exam_id) '
+        'user_id, exam_id, score, score_status, score_value, created_at '
+        'FROM lesson_grades '
+        'ORDER BY user_id, exam_id, created_at DESC, id DESC'
+    )
+    op.execute(
+        'INSERT INTO latest_lesson_grades '
+        '(user_id, exam_id, score, score_status, score_value, created_at) '
+        'SELECT DISTINCT ON (user_id, exam_id) '
+        'user_id, exam_id, last_score, last_score_status, last_score_value, last_created_at '
+        'FROM grade_semester_summaries '
+        'ORDER BY user_id, exam_id, last_created_at DESC '
+        'ON CONFLICT (user_id, exam_id) DO NOTHING'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('latest_lesson_grades')
+    op.drop_table('latest_lessons_attendance')
@@ -0,0 +1,38 @@
+"""add attendance snapshots
+
+Revision ID: 8a1e4c7d2f90
+Revises: 3f6d2b8c9e41
+Create Date: 2026-10-19 12:40:03.118207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a1e4c7d2f90'
+down_revision: Union[str, Sequence[str], None] = '3f6d2b8c9e41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('attendance_snapshots',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('user_id', sa.BIGINT(), nullable=False),
+    sa.Column('is_keyframe', sa.Boolean(), nullable=False),
+    sa.Column('payload', sa.LargeBinary(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_attendance_snapshots_user_id_id', 'attendance_snapshots', ['user_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_attendance_snapshots_user_id_id', table_name='attendance_snapshots')
+    op.drop_table('attendance_snapshots')
@@ -0,0 +1,48 @@
+"""add lesson statistics
+
+Revision ID: 9c4e1f7a2b58
+Revises: 0b7e4d19c3a6
+Create Date: 2026-10-19 21:04:17.336920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4e1f7a2b58'
+down_revision: Union[str, Sequence[str], None] = '0b7e4d19c3a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The histograms start empty, fill them from the existing history with
+# `python src/rebuild_lesson_statistics.py`.
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('attendance_histogram_buckets',
+    sa.Column('lesson_code', sa.String(), nullable=False),
+    sa.Column('kind', sa.String(), nullable=False),
+    sa.Column('bucket', sa.SmallInteger(), nullable=False),
+    sa.Column('students_count', sa.Integer(), nullable=False),
+    sa.Column('values_sum', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['lesson_code'], ['lessons.code'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('lesson_code', 'kind', 'bucket')
+    )
+    op.create_table('exam_histogram_buckets',
+    sa.Column('exam_id', sa.Integer(), nullable=False),
+    sa.Column('bucket', sa.SmallInteger(), nullable=False),
+    sa.Column('students_count', sa.Integer(), nullable=False),
+    sa.Column('values_sum', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['exam_id'], ['exams.id'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('exam_id', 'bucket')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('exam_histogram_buckets')
+    op.drop_table('attendance_histogram_buckets')
@@ -0,0 +1,167 @@
+"""partition history tables
+
+Revision ID: c27b91e0a5d3
+Revises: 8a1e4c7d2f90
+Create Date: 2026-10-19 14:05:37.772940
+
+"""
+import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c27b91e0a5d3'
+down_revision: Union[str, Sequence[str], None] = '8a1e4c7d2f90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PARTITIONS_AHEAD = 3
+
+HISTORY_TABLES = {
+    'lessons_attendance': (
+        'theory_skips_percentage double precision',
+        'practice_skips_percentage double precision',
+    ),
+    'lesson_grades': (
+        'exam_name varchar NOT NULL',
+        'score varchar',
+    ),
+}
+HISTORY_INDEXES = {
+    'lessons_attendance': ('user_id', 'lesson_code', 'created_at'),
+    'lesson_grades': ('user_id', 'lesson_code', 'exam_name', 'created_at'),
+}
+
+
+def add_months(month_start: datetime.date, months: int) -> datetime.date:
+    month_index = month_start.year * 12 + month_start.month - 1 + months
+    return datetime.date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def create_monthly_partitions(table_name: str) -> None:
+    connection = op.get_bind()
+    oldest = connection.execute(
+        # lesson_grades.created_at is still a varchar here, cast it like the
+        # copy of the rows does
+        sa.text(
+            f'SELECT min(created_at::timestamp) '
+            f'FROM {table_name}_unpartitioned'
+        ),
+    ).scalar()
+    today = datetime.date.today()
+    month_start = (oldest.date() if oldest else today).replace(day=1)
+    last_month_start = add_months(today.replace(day=1), PARTITIONS_AHEAD)
+    while month_start <= last_month_start:
+        next_month_start = add_months(month_start, 1)
+        op.execute(
+            f'CREATE TABLE {table_name}_p{month_start:%Y%m} '
+            f'PARTITION OF {table_name} '
+            f"FOR VALUES FROM ('{month_start}') TO ('{next_month_start}')"
+        )
+        month_start = next_month_start
+    op.execute(
+        f'CREATE TABLE {table_name}_default '
+        f'PARTITION OF {table_name} DEFAULT'
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table_name, columns in HISTORY_TABLES.items():
+        op.execute(f'ALTER TABLE {table_name} RENAME TO {table_name}_unpartitioned')
+        op.execute(f'ALTER INDEX {table_name}_pkey RENAME TO {table_name}_unpartitioned_pkey')
+        op.execute(
+            f'CREATE TABLE {table_name} ('
+            f"id integer NOT NULL DEFAULT nextval('{table_name}_id_seq'), "
+            'lesson_code varchar NOT NULL '
+            'REFERENCES lessons (code) ON UPDATE CASCADE ON DELETE CASCADE, '
+            'user_id bigint NOT NULL '
+            'REFERENCES users (id) ON UPDATE CASCADE ON DELETE CASCADE, '
+            f'{", ".join(columns)}, '
+            'created_at timestamp NOT NULL DEFAULT now(), '
+            'PRIMARY KEY (id, created_at)'
+            ') PARTITION BY RANGE (created_at)'
+        )
+        op.execute(f'ALTER SEQUENCE {table_name}_id_seq OWNED BY {table_name}.id')
+        create_monthly_partitions(table_name)
+        column_names = ', '.join(
+            ['id', 'lesson_code', 'user_id']
+            + [column.split()[0] for column in columns]
+        )
+        op.execute(
+            f'INSERT INTO {table_name} ({column_names}, created_at) '
+            f'SELECT {column_names}, created_at::timestamp '
+            f'FROM {table_name}_unpartitioned'
+        )
+        op.execute(f'DROP TABLE {table_name}_unpartitioned')
+        index_columns = HISTORY_INDEXES[table_name]
+        op.create_index(
+            f'ix_{table_name}_{"_".join(index_columns)}',
+            table_name,
+            list(index_columns),
+            unique=False,
+        )
+
+    op.create_table('attendance_semester_summaries',
+    sa.Column('user_id', sa.BIGINT(), nullable=False),
+    sa.Column('lesson_code', sa.String(), nullable=False),
+    sa.Column('semester', sa.String(), nullable=False),
+    sa.Column('last_theory_skips_percentage', sa.Float(), nullable=True),
+    sa.Column('last_practice_skips_percentage', sa.Float(), nullable=True),
+    sa.Column('max_theory_skips_percentage', sa.Float(), nullable=True),
+    sa.Column('max_practice_skips_percentage', sa.Float(), nullable=True),
+    sa.Column('changes_count', sa.Integer(), nullable=False),
+    sa.Column('first_created_at', sa.DateTime(), nullable=False),
+    sa.Column('last_created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['lesson_code'], ['lessons.code'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'lesson_code', 'semester')
+    )
+    op.create_table('grade_semester_summaries',
+    sa.Column('user_id', sa.BIGINT(), nullable=False),
+    sa.Column('lesson_code', sa.String(), nullable=False),
+    sa.Column('exam_name', sa.String(), nullable=False),
+    sa.Column('semester', sa.String(), nullable=False),
+    sa.Column('last_score', sa.String(), nullable=True),
+    sa.Column('changes_count', sa.Integer(), nullable=False),
+    sa.Column('last_created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['lesson_code'], ['lessons.code'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'lesson_code', 'exam_name', 'semester')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('grade_semester_summaries')
+    op.drop_table('attendance_semester_summaries')
+
+    for table_name, columns in HISTORY_TABLES.items():
+        op.execute(f'ALTER TABLE {table_name} RENAME TO {table_name}_partitioned')
+        op.execute(f'ALTER INDEX {table_name}_pkey RENAME TO {table_name}_partitioned_pkey')
+        created_at_type = 'varchar' if table_name == 'lesson_grades' else 'timestamp'
+        op.execute(
+            f'CREATE TABLE {table_name} ('
+            f"id integer NOT NULL DEFAULT nextval('{table_name}_id_seq') PRIMARY KEY, "
+            'lesson_code varchar NOT NULL '
+            'REFERENCES lessons (code) ON UPDATE CASCADE ON DELETE CASCADE, '
+            'user_id bigint NOT NULL '
+            'REFERENCES users (id) ON UPDATE CASCADE ON DELETE CASCADE, '
+            f'{", ".join(columns)}, '
+            f'created_at {created_at_type} NOT NULL DEFAULT now()'
+            ')'
+        )
+        op.execute(f'ALTER SEQUENCE {table_name}_id_seq OWNED BY {table_name}.id')
+        column_names = ', '.join(
+            ['id', 'lesson_code', 'user_id']
+            + [column.split()[0] for column in columns]
+            + ['created_at']
+        )
+        op.execute(
+            f'INSERT INTO {table_name} ({column_names}) '
+            f'SELECT {column_names} FROM {table_name}_partitioned'
+        )
+        op.execute(f'DROP TABLE {table_name}_partitioned')
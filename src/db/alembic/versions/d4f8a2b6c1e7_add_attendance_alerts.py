@@ -0,0 +1,43 @@
+"""add attendance alerts
+
+Revision ID: d4f8a2b6c1e7
+Revises: c27b91e0a5d3
+Create Date: 2026-10-19 15:22:48.503116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4f8a2b6c1e7'
+down_revision: Union[str, Sequence[str], None] = 'c27b91e0a5d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('attendance_alerts',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('user_id', sa.BIGINT(), nullable=False),
+    sa.Column('lesson_code', sa.String(), nullable=False),
+    sa.Column('kind', sa.String(), nullable=False),
+    sa.Column('remaining_skips', sa.Integer(), nullable=False),
+    sa.Column('skips_percentage', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('sent_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['lesson_code'], ['lessons.code'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'lesson_code', 'kind', 'remaining_skips', name='uq_attendance_alerts_dedupe')
+    )
+    op.create_index('ix_attendance_alerts_pending', 'attendance_alerts', ['id'], unique=False, postgresql_where='sent_at IS NULL')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_attendance_alerts_pending', table_name='attendance_alerts', postgresql_where='sent_at IS NULL')
+    op.drop_table('attendance_alerts')
@@ -0,0 +1,28 @@
+"""add user language code
+
+Revision ID: e61c3a9f7b25
+Revises: d4f8a2b6c1e7
+Create Date: 2026-10-19 16:48:12.274390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e61c3a9f7b25'
+down_revision: Union[str, Sequence[str], None] = 'd4f8a2b6c1e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('language_code', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'language_code')
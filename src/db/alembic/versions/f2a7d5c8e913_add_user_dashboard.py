@@ -0,0 +1,34 @@
+"""add user dashboard
+
+Revision ID: f2a7d5c8e913
+Revises: e61c3a9f7b25
+Create Date: 2026-10-19 17:35:51.908264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a7d5c8e913'
+down_revision: Union[str, Sequence[str], None] = 'e61c3a9f7b25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('is_dashboard_enabled', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.add_column('users', sa.Column('dashboard_message_id', sa.BIGINT(), nullable=True))
+    op.add_column('users', sa.Column('dashboard_content_hash', sa.String(), nullable=True))
+    op.add_column('users', sa.Column('dashboard_updated_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'dashboard_updated_at')
+    op.drop_column('users', 'dashboard_content_hash')
+    op.drop_column('users', 'dashboard_message_id')
+    op.drop_column('users', 'is_dashboard_enabled')
@@ -0,0 +1,14 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def get_dialect_name(session: AsyncSession) -> str:
+    return session.get_bind().dialect.name
+
+
+def upsert(session: AsyncSession, table) -> postgresql.Insert | sqlite.Insert:
+    """An ``INSERT`` of the session's dialect, for its ``ON CONFLICT``
+    clauses, which Postgres and SQLite spell the same way."""
+    if get_dialect_name(session) == "sqlite":
+        return sqlite.insert(table)
+    return postgresql.insert(table)
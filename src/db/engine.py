@@ -1,23 +1,136 @@
+import asyncio
 import logging
 from collections.abc import AsyncGenerator
+from typing import Any, Final
 
 from pydantic import PostgresDsn
+from sqlalchemy import Engine, event, text
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     create_async_engine,
     async_sessionmaker,
     AsyncSession,
 )
+from sqlalchemy.orm import Session
+
+from db.models.base import Base
+from setup.settings.database import DatabaseSettings, SqliteSettings
 
 
 log = logging.getLogger(__name__)
 
+# Bind arguments of reads the replica may serve, for example
+# ``session.scalars(statement, bind_arguments=REPLICA_READ)``.
+REPLICA_READ: Final[dict[str, Any]] = {"use_replica": True}
+
+
+class RoutingSession(Session):
+    """Sends reads marked with ``REPLICA_READ`` to the replica.
+
+    Everything else goes to the primary. Once the session has written, or
+    was pinned with ``pin_to_primary``, its marked reads go there too, so
+    a request always reads its own writes.
+    """
+
+    def __init__(self, *, replica_bind: Engine | None = None, **kwargs):
+        super().__init__(**kwargs)
+        self.__replica_bind = replica_bind
+        self.__is_pinned = replica_bind is None
+
+    def pin_to_primary(self) -> None:
+        self.__is_pinned = True
+
+    def get_bind(
+        self,
+        mapper=None,
+        clause=None,
+        *,
+        use_replica: bool = False,
+        **kwargs,
+    ):
+        if self._flushing or (clause is not None and not clause.is_select):
+            self.__is_pinned = True
+        if use_replica and not self.__is_pinned:
+            return self.__replica_bind
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+
+def pin_to_primary(session: AsyncSession) -> None:
+    """For requests that read what an earlier request has just written."""
+    session.sync_session.pin_to_primary()
+
+
+def create_engine(
+    settings: DatabaseSettings,
+    dsn: PostgresDsn | None = None,
+) -> AsyncEngine:
+    """An engine for ``dsn``, the primary by default."""
+    engine = create_async_engine(
+        settings.url if dsn is None else str(dsn),
+        pool_size=settings.pool_size,
+        max_overflow=settings.max_overflow,
+        pool_timeout=settings.pool_timeout,
+        pool_recycle=settings.pool_recycle,
+        pool_pre_ping=settings.pool_pre_ping,
+        query_cache_size=settings.query_cache_size,
+        connect_args=settings.connect_args,
+    )
+    if settings.backend == "sqlite":
+        event.listen(
+            engine.sync_engine,
+            "connect",
+            lambda dbapi_connection, connection_record: set_sqlite_pragmas(
+                dbapi_connection,
+                settings.sqlite,
+            ),
+        )
+    elif settings.driver == "psycopg":
+
+        @event.listens_for(engine.sync_engine, "connect")
+        def set_prepared_max(dbapi_connection, connection_record) -> None:
+            # not a connection parameter, unlike prepare_threshold
+            dbapi_connection.driver_connection.prepared_max = (
+                settings.prepared_statements_cache_size
+            )
+
+    return engine
+
+
+def set_sqlite_pragmas(dbapi_connection, settings: SqliteSettings) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        # readers don't block the writer and the other way around
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={settings.synchronous}")
+        cursor.execute(
+            f"PRAGMA busy_timeout={int(settings.busy_timeout * 1000)}",
+        )
+        # negative sizes are in KiB rather than pages
+        cursor.execute(f"PRAGMA cache_size=-{settings.cache_size}")
+        cursor.execute(f"PRAGMA mmap_size={settings.mmap_size}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        # Postgres enforces them, SQLite only when asked
+        cursor.execute("PRAGMA foreign_keys=ON")
+    finally:
+        cursor.close()
+
+
+async def create_schema(engine: AsyncEngine) -> None:
+    """Create missing tables from the models, for SQLite databases.
+
+    The migrations are written for Postgres. Tables that exist are left
+    as they are, so a SQLite database is not upgraded when the models
+    change.
+    """
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
 
 async def get_engine(
-    database_url: PostgresDsn,
+    settings: DatabaseSettings,
 ) -> AsyncGenerator[AsyncEngine, None]:
     log.debug("Database engine factory: creating engine")
-    engine = create_async_engine(str(database_url))
+    engine = create_engine(settings)
     log.debug("Database engine factory: engine created")
 
     try:
@@ -28,10 +141,58 @@ async def get_engine(
         log.debug("Database engine factory: engine disposed")
 
 
-def get_session_factory(
+async def warm_up_engine(engine: AsyncEngine) -> None:
+    """Open the pool's connections ahead of the first update or sync job,
+    which would otherwise wait for the connection handshakes."""
+
+    async def connect() -> None:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    connections_count = engine.pool.size()
+    results = await asyncio.gather(
+        *(connect() for _ in range(connections_count)),
+        return_exceptions=True,
+    )
+    errors = [result for result in results if isinstance(result, Exception)]
+    if errors:
+        log.warning(
+            "Database engine warm-up: %d of %d connections failed: %s",
+            len(errors),
+            connections_count,
+            errors[0],
+        )
+    else:
+        log.debug(
+            "Database engine warm-up: %d connections open",
+            connections_count,
+        )
+
+
+async def get_session_factory(
     engine: AsyncEngine,
-) -> async_sessionmaker[AsyncSession]:
-    return async_sessionmaker(engine, expire_on_commit=False)
+    settings: DatabaseSettings,
+) -> AsyncGenerator[async_sessionmaker[AsyncSession], None]:
+    if settings.replica_dsn is None:
+        yield async_sessionmaker(
+            engine,
+            expire_on_commit=False,
+            sync_session_class=RoutingSession,
+        )
+        return
+
+    log.debug("Session factory: creating replica engine")
+    replica_engine = create_engine(settings, settings.replica_dsn)
+    try:
+        yield async_sessionmaker(
+            engine,
+            expire_on_commit=False,
+            sync_session_class=RoutingSession,
+            replica_bind=replica_engine.sync_engine,
+        )
+    finally:
+        log.debug("Session factory: disposing replica engine")
+        await replica_engine.dispose()
 
 
 async def get_session(
@@ -1 +1,11 @@
-from . import user, lesson, lesson_attendance, lesson_grade
+from . import (
+    user,
+    lesson,
+    lesson_attendance,
+    exam,
+    lesson_grade,
+    attendance_snapshot,
+    semester_summary,
+    attendance_alert,
+    lesson_statistics,
+)
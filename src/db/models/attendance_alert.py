@@ -0,0 +1,70 @@
+import datetime
+
+from sqlalchemy import (
+    BIGINT,
+    ForeignKey,
+    Index,
+    UniqueConstraint,
+    func,
+    text,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class AttendanceAlert(Base):
+    __tablename__ = "attendance_alerts"
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id",
+            "lesson_code",
+            "kind",
+            "semester",
+            "remaining_skips",
+            name="uq_attendance_alerts_dedupe",
+        ),
+        Index(
+            "ix_attendance_alerts_pending",
+            "id",
+            postgresql_where="sent_at IS NULL",
+            sqlite_where=text("sent_at IS NULL"),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(
+        BIGINT,
+        ForeignKey(
+            "users.id",
+            onupdate="CASCADE",
+            ondelete="CASCADE",
+        ),
+    )
+    lesson_code: Mapped[str] = mapped_column(
+        ForeignKey(
+            "lessons.code",
+            onupdate="CASCADE",
+            ondelete="CASCADE",
+        ),
+    )
+    kind: Mapped[str]
+    # academic semester the alert was enqueued in, e.g. "2026-fall"
+    semester: Mapped[str]
+    remaining_skips: Mapped[int]
+    skips_percentage: Mapped[float]
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        server_default=func.now(),
+    )
+    sent_at: Mapped[datetime.datetime | None]
+
+    def __repr__(self) -> str:
+        return (
+            f"AttendanceAlert(id={self.id}, "
+            f"user_id={self.user_id}, "
+            f"lesson_code={self.lesson_code}, "
+            f"kind={self.kind}, "
+            f"semester={self.semester}, "
+            f"remaining_skips={self.remaining_skips}, "
+            f"sent_at={self.sent_at})"
+        )
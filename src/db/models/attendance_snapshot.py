@@ -0,0 +1,36 @@
+import datetime
+
+from sqlalchemy import ForeignKey, Index, LargeBinary, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class AttendanceSnapshot(Base):
+    __tablename__ = "attendance_snapshots"
+    __table_args__ = (
+        Index("ix_attendance_snapshots_user_id_id", "user_id", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey(
+            "users.id",
+            onupdate="CASCADE",
+            ondelete="CASCADE",
+        ),
+    )
+    is_keyframe: Mapped[bool]
+    payload: Mapped[bytes] = mapped_column(LargeBinary)
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        server_default=func.now(),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"AttendanceSnapshot(id={self.id}, "
+            f"user_id={self.user_id}, "
+            f"is_keyframe={self.is_keyframe}, "
+            f"payload_size={len(self.payload)}, "
+            f"created_at={self.created_at})"
+        )
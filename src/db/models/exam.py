@@ -0,0 +1,47 @@
+import datetime
+
+from sqlalchemy import ForeignKey, UniqueConstraint, func
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from .base import Base
+
+
+class Exam(Base):
+    """Catalog of the exams seen per lesson.
+
+    Grade history references exams by id instead of repeating the lesson
+    code and exam name in every row.
+    """
+    __tablename__ = "exams"
+    __table_args__ = (
+        UniqueConstraint("lesson_code", "name"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    lesson_code: Mapped[str] = mapped_column(
+        ForeignKey(
+            "lessons.code",
+            onupdate="CASCADE",
+            ondelete="CASCADE",
+        ),
+    )
+    name: Mapped[str]
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        server_default=func.now(),
+    )
+
+    lesson: Mapped['Lesson'] = relationship(
+        'Lesson',
+        back_populates='exams',
+    )
+    grades: Mapped[list["LessonGrade"]] = relationship(
+        'LessonGrade',
+        back_populates='exam',
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"Exam(id={self.id}, "
+            f"lesson_code={self.lesson_code}, "
+            f"name={self.name})"
+        )
@@ -19,8 +19,8 @@ class Lesson(Base):
         'LessonAttendance',
         back_populates='lesson',
     )
-    grades: Mapped[list["LessonGrade"]] = relationship(
-        'LessonGrade',
+    exams: Mapped[list["Exam"]] = relationship(
+        'Exam',
         back_populates='lesson',
     )
 
@@ -1,6 +1,6 @@
 import datetime
 
-from sqlalchemy import ForeignKey, func
+from sqlalchemy import BIGINT, ForeignKey, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
@@ -8,6 +8,17 @@ from .base import Base
 
 class LessonAttendance(Base):
     __tablename__ = "lessons_attendance"
+    # In Postgres the table is range-partitioned by created_at with the
+    # primary key (id, created_at); see the partitioning migration and
+    # HistoryRetentionService. The ORM only needs id to identify rows.
+    __table_args__ = (
+        Index(
+            "ix_lessons_attendance_user_id_lesson_code_created_at",
+            "user_id",
+            "lesson_code",
+            "created_at",
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     lesson_code: Mapped[str] = mapped_column(
@@ -44,3 +55,48 @@ class LessonAttendance(Base):
             f"practice_skips_percentage={self.practice_skips_percentage}, "
             f"created_at={self.created_at})"
         )
+
+
+class LatestLessonAttendance(Base):
+    """The last lessons_attendance row of every user and lesson, kept up
+    to date as rows are added.
+
+    Reads of the current attendance don't touch the history partitions,
+    and dropping old partitions doesn't lose it.
+    """
+    __tablename__ = "latest_lessons_attendance"
+    __table_args__ = (
+        Index("ix_latest_lessons_attendance_created_at", "created_at"),
+    )
+
+    user_id: Mapped[int] = mapped_column(
+        BIGINT,
+        ForeignKey(
+            "users.id",
+            onupdate="CASCADE",
+            ondelete="CASCADE",
+        ),
+        primary_key=True,
+    )
+    lesson_code: Mapped[str] = mapped_column(
+        ForeignKey(
+            "lessons.code",
+            onupdate="CASCADE",
+            ondelete="CASCADE",
+        ),
+        primary_key=True,
+    )
+    theory_skips_percentage: Mapped[float | None]
+    practice_skips_percentage: Mapped[float | None]
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        server_default=func.now(),
+    )
+
+    def __repr__(self):
+        return (
+            f"LatestLessonAttendance(user_id={self.user_id}, "
+            f"lesson_code={self.lesson_code}, "
+            f"theory_skips_percentage={self.theory_skips_percentage}, "
+            f"practice_skips_percentage={self.practice_skips_percentage}, "
+            f"created_at={self.created_at})"
+        )
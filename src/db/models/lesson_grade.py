@@ -1,4 +1,6 @@
-from sqlalchemy import ForeignKey, func
+import datetime
+
+from sqlalchemy import BIGINT, ForeignKey, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
@@ -6,11 +8,20 @@ from .base import Base
 
 class LessonGrade(Base):
     __tablename__ = 'lesson_grades'
+    # Range-partitioned by created_at in Postgres, like lessons_attendance.
+    __table_args__ = (
+        Index(
+            "ix_lesson_grades_user_id_exam_id_created_at",
+            "user_id",
+            "exam_id",
+            "created_at",
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    lesson_code: Mapped[str] = mapped_column(
+    exam_id: Mapped[int] = mapped_column(
         ForeignKey(
-            "lessons.code",
+            "exams.id",
             onupdate="CASCADE",
             ondelete="CASCADE",
         ),
@@ -22,23 +33,63 @@ class LessonGrade(Base):
             ondelete="CASCADE",
         ),
     )
-    exam_name: Mapped[str]
     score: Mapped[str | None]
-    created_at: Mapped[str] = mapped_column(
+    # parsed from score, see models.score
+    score_status: Mapped[str]
+    score_value: Mapped[float | None]
+    created_at: Mapped[datetime.datetime] = mapped_column(
         server_default=func.now(),
     )
 
-    lesson: Mapped['Lesson'] = relationship(
-        'Lesson',
+    exam: Mapped['Exam'] = relationship(
+        'Exam',
         back_populates='grades',
     )
 
     def __repr__(self) -> str:
         return (
             f"LessonGrade(id={self.id}, "
-            f"lesson_code={self.lesson_code}, "
+            f"exam_id={self.exam_id}, "
             f"user_id={self.user_id}, "
-            f"exam_name={self.exam_name}, "
+            f"score={self.score}, "
+            f"score_status={self.score_status}, "
+            f"created_at={self.created_at})"
+        )
+
+
+class LatestLessonGrade(Base):
+    """The last lesson_grades row of every user and exam, kept up to date
+    as rows are added, like LatestLessonAttendance."""
+    __tablename__ = 'latest_lesson_grades'
+
+    user_id: Mapped[int] = mapped_column(
+        BIGINT,
+        ForeignKey(
+            "users.id",
+            onupdate="CASCADE",
+            ondelete="CASCADE",
+        ),
+        primary_key=True,
+    )
+    exam_id: Mapped[int] = mapped_column(
+        ForeignKey(
+            "exams.id",
+            onupdate="CASCADE",
+            ondelete="CASCADE",
+        ),
+        primary_key=True,
+    )
+    score: Mapped[str | None]
+    score_status: Mapped[str]
+    score_value: Mapped[float | None]
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        server_default=func.now(),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"LatestLessonGrade(user_id={self.user_id}, "
+            f"exam_id={self.exam_id}, "
             f"score={self.score}, "
             f"created_at={self.created_at})"
         )
@@ -0,0 +1,58 @@
+from sqlalchemy import ForeignKey, SmallInteger
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class AttendanceHistogramBucket(Base):
+    """Students whose latest theory or practice skip percentage in a lesson
+    falls into ``bucket``, a 1% wide range."""
+    __tablename__ = "attendance_histogram_buckets"
+
+    lesson_code: Mapped[str] = mapped_column(
+        ForeignKey(
+            "lessons.code",
+            onupdate="CASCADE",
+            ondelete="CASCADE",
+        ),
+        primary_key=True,
+    )
+    # "theory" or "practice"
+    kind: Mapped[str] = mapped_column(primary_key=True)
+    bucket: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    students_count: Mapped[int]
+    # sum of the exact values, for averages that don't depend on the buckets
+    values_sum: Mapped[float]
+
+    def __repr__(self) -> str:
+        return (
+            f"AttendanceHistogramBucket(lesson_code={self.lesson_code}, "
+            f"kind={self.kind}, "
+            f"bucket={self.bucket}, "
+            f"students_count={self.students_count})"
+        )
+
+
+class ExamHistogramBucket(Base):
+    """Students whose latest numeric score in an exam falls into
+    ``bucket``, a one point wide range."""
+    __tablename__ = "exam_histogram_buckets"
+
+    exam_id: Mapped[int] = mapped_column(
+        ForeignKey(
+            "exams.id",
+            onupdate="CASCADE",
+            ondelete="CASCADE",
+        ),
+        primary_key=True,
+    )
+    bucket: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    students_count: Mapped[int]
+    values_sum: Mapped[float]
+
+    def __repr__(self) -> str:
+        return (
+            f"ExamHistogramBucket(exam_id={self.exam_id}, "
+            f"bucket={self.bucket}, "
+            f"students_count={self.students_count})"
+        )
@@ -0,0 +1,80 @@
+import datetime
+
+from sqlalchemy import BIGINT, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class AttendanceSemesterSummary(Base):
+    __tablename__ = "attendance_semester_summaries"
+
+    user_id: Mapped[int] = mapped_column(
+        BIGINT,
+        ForeignKey(
+            "users.id",
+            onupdate="CASCADE",
+            ondelete="CASCADE",
+        ),
+        primary_key=True,
+    )
+    lesson_code: Mapped[str] = mapped_column(
+        ForeignKey(
+            "lessons.code",
+            onupdate="CASCADE",
+            ondelete="CASCADE",
+        ),
+        primary_key=True,
+    )
+    semester: Mapped[str] = mapped_column(primary_key=True)
+    last_theory_skips_percentage: Mapped[float | None]
+    last_practice_skips_percentage: Mapped[float | None]
+    max_theory_skips_percentage: Mapped[float | None]
+    max_practice_skips_percentage: Mapped[float | None]
+    changes_count: Mapped[int]
+    first_created_at: Mapped[datetime.datetime]
+    last_created_at: Mapped[datetime.datetime]
+
+    def __repr__(self) -> str:
+        return (
+            f"AttendanceSemesterSummary(user_id={self.user_id}, "
+            f"lesson_code={self.lesson_code}, "
+            f"semester={self.semester}, "
+            f"changes_count={self.changes_count})"
+        )
+
+
+class GradeSemesterSummary(Base):
+    __tablename__ = "grade_semester_summaries"
+
+    user_id: Mapped[int] = mapped_column(
+        BIGINT,
+        ForeignKey(
+            "users.id",
+            onupdate="CASCADE",
+            ondelete="CASCADE",
+        ),
+        primary_key=True,
+    )
+    exam_id: Mapped[int] = mapped_column(
+        ForeignKey(
+            "exams.id",
+            onupdate="CASCADE",
+            ondelete="CASCADE",
+        ),
+        primary_key=True,
+    )
+    semester: Mapped[str] = mapped_column(primary_key=True)
+    last_score: Mapped[str | None]
+    last_score_status: Mapped[str]
+    last_score_value: Mapped[float | None]
+    changes_count: Mapped[int]
+    last_created_at: Mapped[datetime.datetime]
+
+    def __repr__(self) -> str:
+        return (
+            f"GradeSemesterSummary(user_id={self.user_id}, "
+            f"exam_id={self.exam_id}, "
+            f"semester={self.semester}, "
+            f"last_score={self.last_score})"
+        )
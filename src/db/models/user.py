@@ -1,6 +1,6 @@
 import datetime
 
-from sqlalchemy import func, BIGINT
+from sqlalchemy import func, BIGINT, false
 from sqlalchemy.orm import Mapped, mapped_column
 
 from .base import Base
@@ -13,6 +13,25 @@ class User(Base):
     has_accepted_terms: Mapped[bool]
     student_number: Mapped[str]
     encrypted_password: Mapped[str]
+    auth_failures_count: Mapped[int] = mapped_column(
+        default=0,
+        server_default="0",
+    )
+    quarantined_until: Mapped[datetime.datetime | None] = mapped_column(
+        index=True,
+    )
+    is_quarantine_notified: Mapped[bool] = mapped_column(
+        default=False,
+        server_default=false(),
+    )
+    language_code: Mapped[str | None]
+    is_dashboard_enabled: Mapped[bool] = mapped_column(
+        default=False,
+        server_default=false(),
+    )
+    dashboard_message_id: Mapped[int | None] = mapped_column(BIGINT)
+    dashboard_content_hash: Mapped[str | None]
+    dashboard_updated_at: Mapped[datetime.datetime | None]
     created_at: Mapped[datetime.datetime] = mapped_column(
         server_default=func.now(),
     )
@@ -22,5 +41,8 @@ class User(Base):
             f"User(id={self.id}, "
             f"has_accepted_terms={self.has_accepted_terms}, "
             f"student_number={self.student_number}, "
+            f"auth_failures_count={self.auth_failures_count}, "
+            f"quarantined_until={self.quarantined_until}, "
+            f"language_code={self.language_code}, "
             f"created_at={self.created_at})"
         )
@@ -1,2 +1,19 @@
 class ObisClientNotLoggedInError(Exception):
     pass
+
+
+class ObisSessionExpiredError(ObisClientNotLoggedInError):
+    """OBIS sent the login form instead of the requested page."""
+
+
+class ObisServiceUnavailableError(Exception):
+    pass
+
+
+class ObisCircuitOpenError(ObisServiceUnavailableError):
+
+    def __init__(self, retry_after: float):
+        super().__init__(
+            f"OBIS circuit is open, retry after {retry_after:.0f} seconds",
+        )
+        self.retry_after = retry_after
@@ -1,6 +1,17 @@
+from exceptions.obis import ObisClientNotLoggedInError
+
+
 class UserHasNoCredentialsError(Exception):
     pass
 
 
 class UserNotAcceptedTermsError(Exception):
     pass
+
+
+class UserQuarantinedError(ObisClientNotLoggedInError):
+
+    def __init__(self, user_id: int, should_notify: bool):
+        super().__init__(f"User {user_id} is quarantined after auth failures")
+        self.user_id = user_id
+        self.should_notify = should_notify
@@ -0,0 +1,92 @@
+"""Exports attendance or grade history to a CSV, Parquet or Arrow file.
+
+Rows are streamed from the read replica when one is configured::
+
+    python src/export_history.py grades grades.parquet --since 2026-09-01
+"""
+import argparse
+import asyncio
+import pathlib
+import sys
+
+from dishka import make_async_container
+
+from logger import setup_logging
+from models.history_export import (
+    ExportFormat,
+    HistoryExportFilters,
+    HistoryTable,
+)
+from services.history_export import HistoryExportService, parse_export_date
+from setup.ioc.registry import get_providers
+from setup.settings.app import AppSettings
+
+
+async def main(arguments: argparse.Namespace) -> None:
+    setup_logging()
+    settings = AppSettings.from_settings_toml_file()
+    container = make_async_container(
+        *get_providers(), context={
+            AppSettings: settings,
+        },
+    )
+    try:
+        async with container() as request_container:
+            history_export_service = await request_container.get(
+                HistoryExportService,
+            )
+            rows_count = await history_export_service.export(
+                arguments.table,
+                arguments.format,
+                arguments.output,
+                HistoryExportFilters(
+                    since=arguments.since,
+                    until=arguments.until,
+                    lesson_code=arguments.lesson,
+                    user_id=arguments.user_id,
+                ),
+                batch_size=arguments.batch_size,
+            )
+    finally:
+        await container.close()
+    print(f"{rows_count} rows written to {arguments.output}")
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("table", type=HistoryTable, choices=list(HistoryTable))
+    parser.add_argument("output", type=pathlib.Path)
+    parser.add_argument(
+        "--format",
+        type=ExportFormat,
+        choices=list(ExportFormat),
+        help="Taken from the output file extension by default",
+    )
+    parser.add_argument(
+        "--since",
+        type=parse_export_date,
+        help="First day, or date and time, to export",
+    )
+    parser.add_argument(
+        "--until",
+        type=parse_export_date,
+        help="Day, or date and time, the export stops before",
+    )
+    parser.add_argument("--lesson", help="Lesson code")
+    parser.add_argument("--user-id", type=int, help="Telegram user id")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    arguments = parser.parse_args()
+    if arguments.format is None:
+        try:
+            arguments.format = ExportFormat(
+                arguments.output.suffix.removeprefix("."),
+            )
+        except ValueError:
+            parser.error("--format is needed for this output file extension")
+    return arguments
+
+
+if __name__ == "__main__":
+    if sys.platform == "win32":
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(main(parse_arguments()))
@@ -0,0 +1,51 @@
+from aiogram.filters import Filter
+from aiogram.types import Message
+from dishka import AsyncContainer
+
+from setup.settings.telegram_bot import TelegramBotSettings
+from templates import get_template_texts
+
+
+class LocalizedText(Filter):
+    """Matches a menu button text in any locale.
+
+    A keyboard keeps the labels of the locale it was sent in, which can
+    differ from the user's locale once it changes.
+    """
+
+    def __init__(self, template_name: str):
+        self.template_name = template_name
+
+    async def __call__(self, message: Message) -> bool:
+        return message.text in get_template_texts(self.template_name)
+
+
+class LocalizedWebAppButton(Filter):
+    """Matches data sent from a web app button labelled in any locale,
+    like ``LocalizedText``."""
+
+    def __init__(self, template_name: str):
+        self.template_name = template_name
+
+    async def __call__(self, message: Message) -> bool:
+        if message.web_app_data is None:
+            return False
+        return (
+            message.web_app_data.button_text
+            in get_template_texts(self.template_name)
+        )
+
+
+class IsAdmin(Filter):
+    """Matches messages from the ``admin_ids`` of the bot settings."""
+
+    async def __call__(
+        self,
+        message: Message,
+        dishka_container: AsyncContainer,
+    ) -> bool:
+        settings = await dishka_container.get(TelegramBotSettings)
+        return (
+            message.from_user is not None
+            and message.from_user.id in settings.admin_ids
+        )
@@ -1,80 +1,404 @@
-from collections.abc import Iterable
+import datetime
+import math
+from collections.abc import Iterable, Mapping, Sequence
+from functools import lru_cache
 
+from models.attendance_alert import AttendanceAlert, AttendanceAlertKind
+from models.course_average import CourseAverage
 from models.lesson_grade import LessonGradeChange
+from models.lesson_statistics import (
+    AttendanceKind,
+    Histogram,
+    UserLessonStatistics,
+    get_skips_percentage,
+)
 from models.obis import LessonAttendance, LessonSkipOpportunity, LessonExams
-from services.obis import compute_lesson_skip_opportunities
+from templates import (
+    DEFAULT_LOCALE,
+    MessageTemplates,
+    escape_html,
+    get_templates,
+)
 
 
-def inflect_word_skips(count: int) -> str:
-    count = abs(count)
+type AttendanceListFingerprint = tuple[
+    tuple[
+        str,
+        float | None,
+        float | None,
+        int | None,
+        int | None,
+        datetime.date | None,
+    ],
+    ...,
+]
 
-    if count % 10 == 1 and count % 100 != 11:
-        return "пропуск"
-    elif count % 10 in (2, 3, 4) and count % 100 not in (12, 13, 14):
-        return "пропуска"
-    return "пропусков"
+
+def inflect_word_skips(count: int, locale: str = DEFAULT_LOCALE) -> str:
+    return get_templates(locale).inflect_skips(count)
+
+
+def format_none(value: str | None, locale: str = DEFAULT_LOCALE) -> str:
+    if value is None:
+        return get_templates(locale).empty_value
+    return escape_html(value)
+
+
+def format_percentage(
+    value: float | None,
+    locale: str = DEFAULT_LOCALE,
+) -> str:
+    if value is None:
+        return get_templates(locale).no_data
+    return f"{value}%"
+
+
+@lru_cache(maxsize=1024)
+def format_remaining_skips(
+    count: int | None,
+    locale: str = DEFAULT_LOCALE,
+) -> str:
+    templates = get_templates(locale)
+    if count is None:
+        return templates.no_data
+    return templates.attendance_list_remaining.format(
+        count=count,
+        skips_word=templates.inflect_skips(count),
+    )
 
 
 def format_lesson_attendance_change(
     old_lesson_attendance: LessonAttendance,
     new_lesson_attendance: LessonAttendance,
     lesson_skip_opportunity: LessonSkipOpportunity,
-):
-    return (
-        f"<b>Ваша йоклама по предмету {old_lesson_attendance.lesson_name} изменилась:\n</b>"
-        f"{old_lesson_attendance.theory_skips_percentage} → {new_lesson_attendance.theory_skips_percentage} (осталось {lesson_skip_opportunity.theory} {inflect_word_skips(lesson_skip_opportunity.theory)})\n"
-        f"с {old_lesson_attendance.practice_skips_percentage} → {new_lesson_attendance.practice_skips_percentage} (осталось {lesson_skip_opportunity.practice} {inflect_word_skips(lesson_skip_opportunity.practice)})"
+    locale: str = DEFAULT_LOCALE,
+) -> str:
+    templates = get_templates(locale)
+    return templates.attendance_change.format(
+        lesson_name=escape_html(old_lesson_attendance.lesson_name),
+        old_theory=format_percentage(
+            old_lesson_attendance.theory_skips_percentage,
+            locale,
+        ),
+        new_theory=format_percentage(
+            new_lesson_attendance.theory_skips_percentage,
+            locale,
+        ),
+        theory_remaining=format_remaining_skips(
+            lesson_skip_opportunity.theory,
+            locale,
+        ),
+        old_practice=format_percentage(
+            old_lesson_attendance.practice_skips_percentage,
+            locale,
+        ),
+        new_practice=format_percentage(
+            new_lesson_attendance.practice_skips_percentage,
+            locale,
+        ),
+        practice_remaining=format_remaining_skips(
+            lesson_skip_opportunity.practice,
+            locale,
+        ),
     )
 
 
-def format_exams_list(lessons_exams: Iterable[LessonExams]) -> str:
+def format_course_average(
+    course_average: CourseAverage,
+    locale: str = DEFAULT_LOCALE,
+) -> list[str]:
+    templates = get_templates(locale)
+    lines: list[str] = []
+    if course_average.average is not None:
+        lines.append(
+            templates.exams_list_average.format(
+                average=f"{course_average.average:.1f}",
+                graded=f"{course_average.graded_percentage:.0f}",
+            ),
+        )
+    for required_score, template in (
+        (
+            course_average.required_final_score,
+            templates.exams_list_required_final,
+        ),
+        (
+            course_average.required_makeup_score,
+            templates.exams_list_required_makeup,
+        ),
+    ):
+        if required_score is None:
+            continue
+        # rounded up, a rounded down score wouldn't be enough
+        required_score = math.ceil(required_score * 10) / 10
+        lines.append(template.format(score=f"{required_score:.1f}"))
+    if course_average.passed is True:
+        lines.append(templates.exams_list_passed)
+    elif course_average.passed is False:
+        lines.append(templates.exams_list_failed)
+    return lines
+
+
+def format_exams_list(
+    lessons_exams: Iterable[LessonExams],
+    course_averages: Mapping[str, CourseAverage],
+    locale: str = DEFAULT_LOCALE,
+) -> str:
+    templates = get_templates(locale)
     lines: list[str] = []
     for lesson_exams in lessons_exams:
         lesson_lines = [
-            f"<b>{lesson_exams.lesson_name} ({lesson_exams.lesson_code})</b>"]
+            templates.exams_list_lesson.format(
+                lesson_name=escape_html(lesson_exams.lesson_name),
+                lesson_code=escape_html(lesson_exams.lesson_code),
+            ),
+        ]
         for exam in lesson_exams.exams:
-            lesson_lines.append(f" - {exam.name}: {format_none(exam.score)}")
+            lesson_lines.append(
+                templates.exams_list_exam.format(
+                    exam_name=escape_html(exam.name),
+                    score=format_none(exam.score, locale),
+                ),
+            )
+        course_average = course_averages.get(lesson_exams.lesson_code)
+        if course_average is not None:
+            lesson_lines.extend(format_course_average(course_average, locale))
         lines.append("\n".join(lesson_lines))
 
     if not lines:
-        return "У вас нет оценок за экзамены."
+        return templates.exams_list_empty
     return "\n\n".join(lines)
 
 
-def format_attendance_list(lessons_attendance: Iterable[LessonAttendance]) -> str:
-    lines: list[str] = []
-    for lesson_attendance in lessons_attendance:
-        skipping = compute_lesson_skip_opportunities(lesson_attendance)
-        lesson_name = f"<b>{lesson_attendance.lesson_name}</b>"
+@lru_cache(maxsize=4096)
+def format_attendance_lesson_header(
+    lesson_name: str,
+    theory_remaining: int | None,
+    practice_remaining: int | None,
+    locale: str = DEFAULT_LOCALE,
+) -> str:
+    templates = get_templates(locale)
+    remaining = [
+        count
+        for count in (theory_remaining, practice_remaining)
+        if count is not None
+    ]
+    marker = ""
+    if any(count <= 0 for count in remaining):
+        marker = templates.attendance_exhausted_marker
+    elif any(count <= 1 for count in remaining):
+        marker = templates.attendance_warning_marker
+    return f"{marker}<b>{escape_html(lesson_name)}</b>"
 
-        if skipping.practice <= 1 or skipping.theory <= 1:
-            lesson_name = f"⚠️ {lesson_name}"
-        elif skipping.practice == 0 or skipping.theory == 0:
-            lesson_name = f"❗ {lesson_name}"
 
-        lines.append(
-            f"{lesson_name}\n"
-            f"Теория: {lesson_attendance.theory_skips_percentage}% (осталось {skipping.theory} {inflect_word_skips(skipping.theory)}\n"
-            f"Практика: {lesson_attendance.practice_skips_percentage}% (осталось {skipping.practice} {inflect_word_skips(skipping.practice)})"
+def get_attendance_list_fingerprint(
+    lessons_attendance: Sequence[LessonAttendance],
+    skip_opportunities: Sequence[LessonSkipOpportunity],
+) -> AttendanceListFingerprint:
+    """Everything the rendered attendance list depends on, usable as a
+    cache key and for detecting that a view hasn't changed."""
+    return tuple(
+        (
+            lesson_attendance.lesson_name,
+            lesson_attendance.theory_skips_percentage,
+            lesson_attendance.practice_skips_percentage,
+            skipping.theory,
+            skipping.practice,
+            skipping.at_risk_date,
+        )
+        for lesson_attendance, skipping in zip(
+            lessons_attendance,
+            skip_opportunities,
         )
+    )
 
-    if not lines:
-        return "У вас нет предметов."
-    return "\n\n".join(lines)
 
+def render_attendance_lesson(
+    templates: MessageTemplates,
+    lesson_name: str,
+    theory_skips_percentage: float | None,
+    practice_skips_percentage: float | None,
+    theory_remaining: int | None,
+    practice_remaining: int | None,
+    at_risk_date: datetime.date | None,
+    locale: str,
+) -> str:
+    text = templates.attendance_list_lesson.format(
+        lesson_header=format_attendance_lesson_header(
+            lesson_name,
+            theory_remaining,
+            practice_remaining,
+            locale,
+        ),
+        theory=format_percentage(theory_skips_percentage, locale),
+        theory_remaining=format_remaining_skips(theory_remaining, locale),
+        practice=format_percentage(practice_skips_percentage, locale),
+        practice_remaining=format_remaining_skips(practice_remaining, locale),
+    )
+    if at_risk_date is not None:
+        text += templates.attendance_list_at_risk.format(date=at_risk_date)
+    return text
 
-def format_none(value: str | None) -> str:
-    return value if value is not None else "-"
+
+@lru_cache(maxsize=1024)
+def render_attendance_list(
+    fingerprint: AttendanceListFingerprint,
+    locale: str = DEFAULT_LOCALE,
+) -> str:
+    templates = get_templates(locale)
+    if not fingerprint:
+        return templates.attendance_list_empty
+    return "\n\n".join(
+        render_attendance_lesson(templates, *lesson, locale)
+        for lesson in fingerprint
+    )
+
+
+def format_attendance_list(
+    lessons_attendance: Sequence[LessonAttendance],
+    skip_opportunities: Sequence[LessonSkipOpportunity],
+    locale: str = DEFAULT_LOCALE,
+) -> str:
+    return render_attendance_list(
+        get_attendance_list_fingerprint(lessons_attendance, skip_opportunities),
+        locale,
+    )
+
+
+def format_attendance_dashboard(
+    attendance_text: str,
+    updated_at: datetime.datetime,
+    locale: str = DEFAULT_LOCALE,
+) -> str:
+    return get_templates(locale).dashboard.format(
+        attendance=attendance_text,
+        updated_at=updated_at,
+    )
 
 
 def format_lesson_grade_change(
     lesson_grade_change: LessonGradeChange,
+    locale: str = DEFAULT_LOCALE,
 ) -> str:
+    templates = get_templates(locale)
+    lesson_name = escape_html(lesson_grade_change.lesson_name)
     if lesson_grade_change.is_first_grade:
-        return (
-            f"Новая оценка по предмету: {lesson_grade_change.lesson_name} - {format_none(lesson_grade_change.current_score)}"
+        return templates.grade_first.format(
+            lesson_name=lesson_name,
+            score=format_none(lesson_grade_change.current_score, locale),
+        )
+    return templates.grade_change.format(
+        lesson_name=lesson_name,
+        previous_score=format_none(lesson_grade_change.previous_score, locale),
+        current_score=format_none(lesson_grade_change.current_score, locale),
+    )
+
+
+def format_attendance_alert(
+    alert: AttendanceAlert,
+    locale: str = DEFAULT_LOCALE,
+) -> str:
+    templates = get_templates(locale)
+    if alert.kind == AttendanceAlertKind.THEORY:
+        kind = templates.alert_kind_theory
+    else:
+        kind = templates.alert_kind_practice
+    if alert.remaining_skips > 0:
+        remaining = templates.alert_remaining.format(
+            count=alert.remaining_skips,
+            skips_word=templates.inflect_skips(alert.remaining_skips),
         )
-    return (
-        f"Ваша оценка по предмету {lesson_grade_change.lesson_name} изменилась: "
-        f"{format_none(lesson_grade_change.previous_score)} → {format_none(lesson_grade_change.current_score)}"
+    else:
+        remaining = templates.alert_exhausted
+    return templates.alert.format(
+        lesson_name=escape_html(alert.lesson_name),
+        kind=kind,
+        remaining=remaining,
+        percentage=alert.skips_percentage,
     )
+
+
+def format_histogram_comparison(
+    template: str,
+    histogram: Histogram | None,
+    compared_value: float | None,
+    locale: str = DEFAULT_LOCALE,
+    **fields: str,
+) -> str | None:
+    if histogram is None or compared_value is None:
+        return None
+    average = histogram.average
+    rank = histogram.get_percentile_rank(compared_value)
+    if average is None or rank is None:
+        return None
+    templates = get_templates(locale)
+    count = histogram.students_count
+    return template.format(
+        average=f"{average:.1f}",
+        rank=f"{rank:.0f}",
+        count=count,
+        students_word=templates.inflect(count, templates.students_word_forms),
+        **fields,
+    )
+
+
+def format_lesson_statistics(
+    statistics: UserLessonStatistics,
+    locale: str = DEFAULT_LOCALE,
+) -> str:
+    templates = get_templates(locale)
+    kind_names = {
+        AttendanceKind.THEORY: templates.statistics_kind_theory,
+        AttendanceKind.PRACTICE: templates.statistics_kind_practice,
+    }
+    # lesson code -> (lesson name, lines)
+    lessons: dict[str, tuple[str, list[str]]] = {}
+    for attendance in statistics.lessons_attendance:
+        _, lines = lessons.setdefault(
+            attendance.lesson_code,
+            (attendance.lesson_name, []),
+        )
+        for kind in AttendanceKind:
+            value = get_skips_percentage(attendance, kind)
+            line = format_histogram_comparison(
+                templates.statistics_attendance,
+                statistics.attendance_histograms.get(
+                    (attendance.lesson_code, kind),
+                ),
+                value,
+                locale,
+                kind=kind_names[kind],
+                value=format_percentage(value, locale),
+            )
+            if line is not None:
+                lines.append(line)
+    for exam_grade in statistics.exam_grades:
+        _, lines = lessons.setdefault(
+            exam_grade.lesson_code,
+            (exam_grade.lesson_name, []),
+        )
+        line = format_histogram_comparison(
+            templates.statistics_exam,
+            statistics.exam_histograms.get(exam_grade.exam_id),
+            exam_grade.score_value,
+            locale,
+            exam_name=escape_html(exam_grade.exam_name),
+            score=format_none(exam_grade.score, locale),
+        )
+        if line is not None:
+            lines.append(line)
+
+    sections = [
+        "\n".join(
+            [
+                templates.statistics_lesson.format(
+                    lesson_name=escape_html(lesson_name),
+                ),
+                *lines,
+            ],
+        )
+        for lesson_name, lines in lessons.values()
+        if lines
+    ]
+    if not sections:
+        return templates.statistics_empty
+    return "\n\n".join([templates.statistics_title, *sections])
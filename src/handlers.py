@@ -1,54 +1,138 @@
+import datetime
+import pathlib
+import tempfile
+from functools import lru_cache
 from typing import Annotated
 
 from aiogram import Router, F
-from aiogram.filters import CommandStart, ExceptionTypeFilter
+from aiogram.exceptions import TelegramAPIError
+from aiogram.filters import Command, CommandStart, ExceptionTypeFilter
 from aiogram.fsm.state import StatesGroup, State
+from aiogram.filters.command import CommandObject
 from aiogram.types import (
     Message, ReplyKeyboardMarkup, KeyboardButton,
     CallbackQuery, WebAppInfo, ErrorEvent, InlineKeyboardMarkup,
-    InlineKeyboardButton,
+    InlineKeyboardButton, FSInputFile,
 )
 from dishka import FromDishka
 from pydantic import BaseModel, Field
 
-from exceptions.obis import ObisClientNotLoggedInError
+from exceptions.obis import (
+    ObisClientNotLoggedInError,
+    ObisServiceUnavailableError,
+)
 from exceptions.user import (
     UserHasNoCredentialsError,
     UserNotAcceptedTermsError,
 )
-from formatters import format_exams_list, format_attendance_list
+from dashboard import get_content_hash, publish_dashboard
+from filters import IsAdmin, LocalizedText, LocalizedWebAppButton
+from formatters import (
+    format_attendance_dashboard,
+    format_attendance_list,
+    format_exams_list,
+    format_lesson_statistics,
+)
+from middlewares import LocaleMiddleware
+from models.history_export import (
+    ExportFormat,
+    HistoryExportFilters,
+    HistoryTable,
+)
+from models.sync_request import SyncReason, SyncRequest
 from repositories.user import UserRepository
+from services.course_average import CourseAverageService
+from services.event_bus import EventBus
+from services.history_export import HistoryExportService, parse_export_date
+from services.lesson_statistics import LessonStatisticsService
+from services.skip_budget import SkipBudgetEngine
 from services.user import UserService
+from templates import (
+    DEFAULT_LOCALE,
+    LANGUAGE_NAMES,
+    SUPPORTED_LOCALES,
+    MessageTemplates,
+    get_templates,
+)
 
 
 router = Router(name=__name__)
 
-WEB_APP_BUTTON = KeyboardButton(
-    text="Ввести данные от OBIS", web_app=WebAppInfo(
-        url="https://yoklama-bot-mini-app.vercel.app/enter-credentials",
-    ),
+WEB_APP_URL = "https://yoklama-bot-mini-app.vercel.app/enter-credentials"
+# bots can't send larger documents through the public Bot API
+TELEGRAM_DOCUMENT_SIZE_LIMIT = 50 * 1024 * 1024
+
+# Admin replies are for operators and aren't localized.
+EXPORT_USAGE = (
+    "Usage: /export attendance|grades [csv|parquet|arrow] "
+    "[since=YYYY-MM-DD] [until=YYYY-MM-DD] [lesson=CODE] [user=ID]"
 )
 
-MAIN_MENU = ReplyKeyboardMarkup(
-    resize_keyboard=True,
-    is_persistent=True,
-    keyboard=[
-        [
-            KeyboardButton(text="Йоклама"),
-            KeyboardButton(text="Экзамены"),
+
+def get_web_app_button(templates: MessageTemplates) -> KeyboardButton:
+    return KeyboardButton(
+        text=templates.button_enter_credentials,
+        web_app=WebAppInfo(url=WEB_APP_URL),
+    )
+
+
+@lru_cache(maxsize=None)
+def get_main_menu(locale: str = DEFAULT_LOCALE) -> ReplyKeyboardMarkup:
+    templates = get_templates(locale)
+    return ReplyKeyboardMarkup(
+        resize_keyboard=True,
+        is_persistent=True,
+        keyboard=[
+            [
+                KeyboardButton(text=templates.button_attendance),
+                KeyboardButton(text=templates.button_exams),
+            ],
+            [
+                get_web_app_button(templates),
+            ]
         ],
-        [
-            WEB_APP_BUTTON
-        ]
-    ],
-)
+    )
+
+
+@lru_cache(maxsize=None)
+def get_unauthorized_menu(
+    locale: str = DEFAULT_LOCALE,
+) -> ReplyKeyboardMarkup:
+    return ReplyKeyboardMarkup(
+        resize_keyboard=True,
+        keyboard=[
+            [
+                get_web_app_button(get_templates(locale)),
+            ]
+        ],
+    )
+
+
+@lru_cache(maxsize=None)
+def get_dashboard_keyboard(
+    locale: str = DEFAULT_LOCALE,
+) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+            [
+                InlineKeyboardButton(
+                    text=get_templates(locale).button_refresh,
+                    callback_data="dashboard:refresh",
+                ),
+            ],
+        ],
+    )
 
-UNAUTHORIZED_MENU = ReplyKeyboardMarkup(
-    resize_keyboard=True,
-    keyboard=[
+
+LANGUAGE_MENU = InlineKeyboardMarkup(
+    inline_keyboard=[
         [
-            WEB_APP_BUTTON,
+            InlineKeyboardButton(
+                text=LANGUAGE_NAMES[locale],
+                callback_data=f"language:{locale}",
+            ),
         ]
+        for locale in SUPPORTED_LOCALES
     ],
 )
 
@@ -62,28 +146,37 @@ class CredentialsStates(StatesGroup):
 async def on_accept_terms(
     callback_query: CallbackQuery,
     user_service: FromDishka[UserService],
+    event_bus: FromDishka[EventBus],
+    locale: str,
+    templates: MessageTemplates,
 ) -> None:
     await user_service.accept_terms(callback_query.from_user.id)
-    await callback_query.message.edit_text(
-        "✅ Вы успешно приняли условия использования бота.",
+    await event_bus.publish(
+        SyncRequest(
+            user_id=callback_query.from_user.id,
+            reason=SyncReason.TERMS_ACCEPTED,
+        ),
     )
+    await callback_query.message.edit_text(templates.terms_accepted)
     await callback_query.message.answer(
-        "📲 Главное меню.",
-        reply_markup=MAIN_MENU,
+        templates.main_menu,
+        reply_markup=get_main_menu(locale),
     )
 
 
 @router.error(ExceptionTypeFilter(UserNotAcceptedTermsError))
 async def on_user_not_accepted_terms_error(
     event: ErrorEvent,
+    locale: str = DEFAULT_LOCALE,
 ) -> None:
+    templates = get_templates(locale)
     await event.update.message.answer(
-        "🗝️ Пожалуйста, примите условия использования бота, чтобы продолжить: https://graph.org/Polzovatelskoe-soglashenie-manas-yoklama-bot-01-06",
+        templates.terms_prompt,
         reply_markup=InlineKeyboardMarkup(
             inline_keyboard=[
                 [
                     InlineKeyboardButton(
-                        text="✅ Принять",
+                        text=templates.button_accept_terms,
                         callback_data="accept_terms",
                     ),
                 ],
@@ -100,10 +193,21 @@ async def on_user_not_accepted_terms_error(
 )
 async def on_user_has_no_credentials_error(
     event: ErrorEvent,
+    locale: str = DEFAULT_LOCALE,
+) -> None:
+    await event.update.message.answer(
+        get_templates(locale).enter_credentials_prompt,
+        reply_markup=get_unauthorized_menu(locale),
+    )
+
+
+@router.error(ExceptionTypeFilter(ObisServiceUnavailableError))
+async def on_obis_service_unavailable_error(
+    event: ErrorEvent,
+    locale: str = DEFAULT_LOCALE,
 ) -> None:
     await event.update.message.answer(
-        "📲 Чтобы использовать бота, введите ваши данные от OBIS.",
-        reply_markup=UNAUTHORIZED_MENU,
+        get_templates(locale).obis_unavailable,
     )
 
 
@@ -111,14 +215,14 @@ async def on_user_has_no_credentials_error(
 async def on_accept_terms(
     callback_query: CallbackQuery,
     user_repository: FromDishka[UserRepository],
+    locale: str,
+    templates: MessageTemplates,
 ) -> None:
     await user_repository.create_user(callback_query.from_user.id)
-    await callback_query.message.edit_text(
-        "✅ Вы успешно приняли условия использования бота.",
-    )
+    await callback_query.message.edit_text(templates.terms_accepted)
     await callback_query.message.answer(
-        "📲 Главное меню.",
-        reply_markup=MAIN_MENU,
+        templates.main_menu,
+        reply_markup=get_main_menu(locale),
     )
 
 
@@ -126,64 +230,270 @@ async def on_accept_terms(
 async def on_start(
     message: Message,
     user_repository: FromDishka[UserRepository],
+    locale: str,
+    templates: MessageTemplates,
 ) -> None:
-    user = await user_repository.get_user_by_id(message.from_user.id)
+    user = await user_repository.get_user_by_id(
+        message.from_user.id,
+        use_replica=True,
+    )
     if user is None:
         await message.answer(
-            "📲 Чтобы использовать бота, введите ваши данные от OBIS.",
-            reply_markup=UNAUTHORIZED_MENU,
+            templates.enter_credentials_prompt,
+            reply_markup=get_unauthorized_menu(locale),
         )
         return
     await message.answer(
-        "📲 Главное меню.",
-        reply_markup=MAIN_MENU,
+        templates.main_menu,
+        reply_markup=get_main_menu(locale),
     )
 
 
-@router.message(F.text == "Экзамены")
+@router.message(Command("language"))
+async def on_language_command(
+    message: Message,
+    templates: MessageTemplates,
+) -> None:
+    await message.answer(templates.choose_language, reply_markup=LANGUAGE_MENU)
+
+
+@router.callback_query(F.data.startswith("language:"))
+async def on_language_chosen(
+    callback_query: CallbackQuery,
+    user_repository: FromDishka[UserRepository],
+    locale_middleware: LocaleMiddleware,
+) -> None:
+    locale = callback_query.data.removeprefix("language:")
+    if locale not in SUPPORTED_LOCALES:
+        await callback_query.answer()
+        return
+    user_id = callback_query.from_user.id
+    # Users without saved credentials have no row yet, their choice is
+    # kept in memory and stored together with the credentials.
+    locale_middleware.set_language_code(user_id, locale)
+    user = await user_repository.get_user_by_id(user_id)
+    if user is None:
+        reply_markup = get_unauthorized_menu(locale)
+    else:
+        await user_repository.update_language_code(user_id, locale)
+        reply_markup = get_main_menu(locale)
+
+    templates = get_templates(locale)
+    await callback_query.message.edit_text(templates.language_changed)
+    await callback_query.message.answer(
+        templates.main_menu,
+        reply_markup=reply_markup,
+    )
+
+
+@router.message(LocalizedText("button_exams"))
 async def on_view_exams_command(
     message: Message,
     user_service: FromDishka[UserService],
+    course_average_service: FromDishka[CourseAverageService],
+    locale: str,
+    templates: MessageTemplates,
 ) -> None:
-    sent_message = await message.answer("⌛ Загрузка ваших экзаменов...")
+    sent_message = await message.answer(templates.loading_exams)
     exams = await user_service.get_exams(message.from_user.id)
-    text = format_exams_list(exams)
+    text = format_exams_list(
+        exams,
+        await course_average_service.get_course_averages(
+            message.from_user.id,
+            exams,
+        ),
+        locale,
+    )
     await sent_message.edit_text(text)
 
 
-@router.message(F.text == "Йоклама")
+@router.message(LocalizedText("button_attendance"))
 async def on_view_yoklama_command(
     message: Message,
     user_service: FromDishka[UserService],
+    skip_budget_engine: FromDishka[SkipBudgetEngine],
+    locale: str,
+    templates: MessageTemplates,
 ) -> None:
-    sent_message = await message.answer("⌛ Загрузка вашей йокламы...")
+    sent_message = await message.answer(templates.loading_attendance)
     attendance = await user_service.get_attendance(message.from_user.id)
-    text = format_attendance_list(attendance)
+    text = format_attendance_list(
+        attendance,
+        skip_budget_engine.compute(attendance),
+        locale,
+    )
     await sent_message.edit_text(text)
 
 
+@router.message(Command("stats"))
+async def on_stats_command(
+    message: Message,
+    lesson_statistics_service: FromDishka[LessonStatisticsService],
+    locale: str,
+) -> None:
+    statistics = await lesson_statistics_service.get_user_statistics(
+        message.from_user.id,
+    )
+    await message.answer(format_lesson_statistics(statistics, locale))
+
+
+@router.message(Command("dashboard"))
+async def on_dashboard_command(
+    message: Message,
+    user_service: FromDishka[UserService],
+    user_repository: FromDishka[UserRepository],
+    skip_budget_engine: FromDishka[SkipBudgetEngine],
+    locale: str,
+    templates: MessageTemplates,
+) -> None:
+    user_id = message.from_user.id
+    user = await user_repository.get_user_by_id(user_id)
+    if user is not None and user.is_dashboard_enabled:
+        await user_service.disable_dashboard(user_id)
+        if user.dashboard_message_id is not None:
+            try:
+                await message.bot.unpin_chat_message(
+                    chat_id=user_id,
+                    message_id=user.dashboard_message_id,
+                )
+            except TelegramAPIError:
+                pass
+        await message.answer(templates.dashboard_disabled)
+        return
+
+    attendance = await user_service.get_attendance(user_id)
+    attendance_text = format_attendance_list(
+        attendance,
+        skip_budget_engine.compute(attendance),
+        locale,
+    )
+    await message.answer(templates.dashboard_enabled)
+    message_id = await publish_dashboard(
+        message.bot,
+        chat_id=user_id,
+        text=format_attendance_dashboard(
+            attendance_text,
+            datetime.datetime.now(),
+            locale,
+        ),
+        message_id=None,
+        reply_markup=get_dashboard_keyboard(locale),
+    )
+    await user_service.save_dashboard(
+        user_id,
+        message_id=message_id,
+        content_hash=get_content_hash(attendance_text),
+    )
+
+
+@router.callback_query(F.data == "dashboard:refresh")
+async def on_dashboard_refresh(
+    callback_query: CallbackQuery,
+    event_bus: FromDishka[EventBus],
+    templates: MessageTemplates,
+) -> None:
+    await event_bus.publish(
+        SyncRequest(
+            user_id=callback_query.from_user.id,
+            reason=SyncReason.REFRESH_REQUESTED,
+        ),
+    )
+    await callback_query.answer(templates.refresh_requested)
+
+
 class Credentials(BaseModel):
     student_number: Annotated[str, Field(validation_alias="studentNumber")]
     password: str
 
 
-@router.message(
-    F.web_app_data.button_text == "Ввести данные от OBIS",
-)
+@router.message(LocalizedWebAppButton("button_enter_credentials"))
 async def on_obis_password_entered(
     message: Message,
     user_service: FromDishka[UserService],
+    event_bus: FromDishka[EventBus],
+    locale: str,
+    templates: MessageTemplates,
 ) -> None:
     credentials = Credentials.model_validate_json(message.web_app_data.data)
     await user_service.save_user(
         user_id=message.from_user.id,
         student_number=credentials.student_number,
         password=credentials.password,
+        language_code=locale,
     )
-    await message.answer(
-        "✅ Ваши данные от OBIS успешно сохранены.",
+    # The first sync stores the baseline that later changes are compared
+    # against, so it shouldn't wait for the next periodic pass.
+    await event_bus.publish(
+        SyncRequest(
+            user_id=message.from_user.id,
+            reason=SyncReason.CREDENTIALS_SAVED,
+        ),
     )
+    await message.answer(templates.credentials_saved)
     await message.answer(
-        "📲 Главное меню.",
-        reply_markup=MAIN_MENU,
+        templates.main_menu,
+        reply_markup=get_main_menu(locale),
+    )
+
+
+def parse_export_arguments(
+    arguments: str | None,
+) -> tuple[HistoryTable, ExportFormat, HistoryExportFilters]:
+    """``/export`` arguments, ValueError when they don't parse."""
+    table_name, *options = (arguments or "").split()
+    export_format = ExportFormat.CSV
+    if options and "=" not in options[0]:
+        export_format = ExportFormat(options.pop(0))
+    filter_values = {}
+    for option in options:
+        name, _, value = option.partition("=")
+        match name:
+            case "since" | "until":
+                filter_values[name] = parse_export_date(value)
+            case "lesson":
+                filter_values["lesson_code"] = value
+            case "user":
+                filter_values["user_id"] = int(value)
+            case _:
+                raise ValueError(f"unknown filter {name!r}")
+    return (
+        HistoryTable(table_name),
+        export_format,
+        HistoryExportFilters(**filter_values),
     )
+
+
+@router.message(Command("export"), IsAdmin())
+async def on_export_command(
+    message: Message,
+    command: CommandObject,
+    history_export_service: FromDishka[HistoryExportService],
+) -> None:
+    try:
+        table, export_format, filters = parse_export_arguments(command.args)
+    except ValueError:
+        await message.answer(EXPORT_USAGE)
+        return
+
+    sent_message = await message.answer(f"Exporting {table}...")
+    with tempfile.TemporaryDirectory() as directory:
+        path = pathlib.Path(directory) / (
+            f"{table}-{datetime.date.today():%Y%m%d}.{export_format}"
+        )
+        rows_count = await history_export_service.export(
+            table,
+            export_format,
+            path,
+            filters,
+        )
+        if path.stat().st_size > TELEGRAM_DOCUMENT_SIZE_LIMIT:
+            await sent_message.edit_text(
+                f"{rows_count} rows don't fit in a Telegram document, "
+                f"narrow the filters or run export_history.py",
+            )
+            return
+        await message.answer_document(
+            FSInputFile(path),
+            caption=f"{rows_count} rows",
+        )
+    await sent_message.delete()
@@ -1,24 +1,151 @@
+import argparse
 import asyncio
+import datetime
 import sys
+from collections.abc import Awaitable, Callable
 
 from aiogram import Bot, Dispatcher
 from aiogram.types import BotCommand
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
-from dishka import make_async_container
+from dishka import AsyncContainer, make_async_container
 from dishka.integrations.aiogram import setup_dishka
 from sqlalchemy.ext.asyncio import AsyncEngine
 
-from db.models.base import Base
+from db.engine import create_schema, warm_up_engine
 from handlers import router
 from logger import setup_logging
-from periodic_tasks import LessonAttendanceCheckTask, LessonGradeSyncTask
+from middlewares import LocaleMiddleware
+from periodic_tasks import (
+    AttendanceAlertTask,
+    HistoryRetentionTask,
+    ImmediateSyncTask,
+    LessonAttendanceCheckTask,
+    LessonGradeSyncTask,
+)
+from runtime import BackgroundTasks, JobTracker, wait_for_stop_signal
 from setup.ioc.registry import get_providers
 from setup.settings.app import AppSettings
+from setup.settings.worker import WorkerSettings
+from templates import DEFAULT_LOCALE, load_templates
 
 
-async def main() -> None:
+BOT_COMMANDS = [
+    BotCommand(command="start", description="📲 Главное меню"),
+    BotCommand(command="dashboard", description="📌 Живая сводка йокламы"),
+    BotCommand(command="stats", description="📊 Сравнение с другими студентами"),
+    BotCommand(command="language", description="🌐 Язык / Language"),
+]
+
+
+class SyncWorker:
+    """Periodic sync passes plus immediate syncs requested over the event
+    bus."""
+
+    def __init__(self, container: AsyncContainer, settings: AppSettings):
+        self.__container = container
+        self.__settings = settings
+        self.__job_tracker = JobTracker()
+        self.__scheduler: AsyncIOScheduler | None = None
+        self.__immediate_sync_task = ImmediateSyncTask(container)
+        self.__immediate_sync_listener: asyncio.Task | None = None
+
+    async def start(self, **kwargs) -> None:
+        container = self.__container
+        job_tracker = self.__job_tracker
+        scheduler = AsyncIOScheduler()
+        scheduler.add_job(
+            job_tracker.track(LessonAttendanceCheckTask(container).execute),
+            IntervalTrigger(minutes=5),
+        )
+        scheduler.add_job(
+            job_tracker.track(LessonGradeSyncTask(container).execute),
+            IntervalTrigger(minutes=30),
+        )
+        scheduler.add_job(
+            job_tracker.track(AttendanceAlertTask(container).execute),
+            IntervalTrigger(minutes=15),
+        )
+        if self.__settings.worker.is_primary:
+            scheduler.add_job(
+                job_tracker.track(HistoryRetentionTask(container).execute),
+                IntervalTrigger(days=1),
+                next_run_time=datetime.datetime.now(),
+            )
+        scheduler.start()
+        self.__scheduler = scheduler
+        self.__immediate_sync_listener = asyncio.create_task(
+            self.__immediate_sync_task.execute(),
+        )
+
+    async def shutdown(self) -> None:
+        timeout = self.__settings.telegram_bot.shutdown_timeout
+        if self.__immediate_sync_listener is not None:
+            self.__immediate_sync_listener.cancel()
+            await asyncio.gather(
+                self.__immediate_sync_listener,
+                return_exceptions=True,
+            )
+            await self.__immediate_sync_task.shutdown(timeout)
+        if self.__scheduler is not None:
+            await self.__job_tracker.shutdown(self.__scheduler, timeout)
+
+
+async def warm_up_database(container: AsyncContainer) -> None:
+    engine = await container.get(AsyncEngine)
+    await warm_up_engine(engine)
+
+
+async def serve_updates(
+    container: AsyncContainer,
+    bot: Bot,
+    settings: AppSettings,
+    background_tasks: BackgroundTasks,
+    on_startup: Callable[..., Awaitable[None]] | None = None,
+) -> None:
+    """Serve updates until stopped; ``on_startup`` runs once the
+    dispatcher is ready to take them."""
+    # The command list rarely changes, updates shouldn't wait for it.
+    background_tasks.start(
+        bot.set_my_commands(BOT_COMMANDS),
+        "set_my_commands",
+    )
+
+    dispatcher = Dispatcher()
+    dispatcher.update.outer_middleware(LocaleMiddleware(container))
+    dispatcher.include_router(router)
+    if on_startup is not None:
+        dispatcher.startup.register(on_startup)
+
+    setup_dishka(container, router=dispatcher, auto_inject=True)
+
+    if settings.telegram_bot.webhook is None:
+        # getUpdates is refused while a webhook is set
+        await bot.delete_webhook()
+        await dispatcher.start_polling(
+            bot,
+            close_bot_session=False,
+            tasks_concurrency_limit=(
+                settings.telegram_bot.max_concurrent_updates
+            ),
+        )
+    else:
+        # aiohttp's server is only needed in webhook mode
+        from webhook import run_webhook
+
+        await run_webhook(dispatcher, bot, settings.telegram_bot)
+
+
+async def main(role: str, worker_settings: WorkerSettings | None) -> None:
+    """Runs the ``bot`` (update handlers), the ``worker`` (periodic sync
+    and delivery) or ``all`` of them in one process.
+
+    Both sides only share the database, so one bot can be run next to any
+    number of workers, each owning a shard of the users.
+    """
     settings = AppSettings.from_settings_toml_file()
+    if worker_settings is not None:
+        settings.worker = worker_settings
     container = make_async_container(
         *get_providers(), context={
             AppSettings: settings,
@@ -28,33 +155,75 @@ async def main() -> None:
     bot = await container.get(Bot)
 
     setup_logging()
+    # Other locales are compiled on first use.
+    load_templates(DEFAULT_LOCALE)
 
-    await bot.set_my_commands(
-        [
-            BotCommand(command="start", description="📲 Главное меню")
-        ],
-    )
+    if settings.database.backend == "sqlite":
+        await create_schema(await container.get(AsyncEngine))
+
+    background_tasks = BackgroundTasks()
+    # The engine connects lazily; opening the pool now, next to polling,
+    # spares the first update the handshakes.
+    background_tasks.start(warm_up_database(container), "warm_up_database")
+
+    sync_worker = None
+    if role in ("worker", "all"):
+        sync_worker = SyncWorker(container, settings)
 
-    scheduler = AsyncIOScheduler()
-    scheduler.add_job(
-        LessonAttendanceCheckTask(container).execute,
-        IntervalTrigger(minutes=5),
+    try:
+        if role in ("bot", "all"):
+            # Sync jobs are only scheduled once polling has started, so a
+            # restart doesn't leave users waiting behind a sync pass.
+            await serve_updates(
+                container,
+                bot,
+                settings,
+                background_tasks,
+                on_startup=None if sync_worker is None else sync_worker.start,
+            )
+        else:
+            await sync_worker.start()
+            await wait_for_stop_signal()
+    finally:
+        if sync_worker is not None:
+            await sync_worker.shutdown()
+        await background_tasks.cancel()
+        await bot.session.close()
+        await container.close()
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Yoklama bot")
+    parser.add_argument(
+        "role",
+        nargs="?",
+        choices=("all", "bot", "worker"),
+        default="all",
     )
-    scheduler.add_job(
-        LessonGradeSyncTask(container).execute,
-        IntervalTrigger(minutes=30),
+    parser.add_argument(
+        "--shard-index",
+        type=int,
+        help="Shard of the users this worker syncs, [worker] in settings.toml by default",
     )
-    scheduler.start()
+    parser.add_argument("--shard-count", type=int)
+    return parser.parse_args()
 
-    dispatcher = Dispatcher()
-    dispatcher.include_router(router)
 
-    setup_dishka(container, router=dispatcher, auto_inject=True)
-
-    await dispatcher.start_polling(bot)
+def get_worker_settings(
+    arguments: argparse.Namespace,
+) -> WorkerSettings | None:
+    if arguments.shard_index is None and arguments.shard_count is None:
+        return None
+    if arguments.shard_index is None or arguments.shard_count is None:
+        sys.exit("--shard-index and --shard-count go together")
+    return WorkerSettings(
+        shard_index=arguments.shard_index,
+        shard_count=arguments.shard_count,
+    )
 
 
 if __name__ == '__main__':
     if sys.platform == "win32":
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
-    asyncio.run(main())
+    arguments = parse_arguments()
+    asyncio.run(main(arguments.role, get_worker_settings(arguments)))
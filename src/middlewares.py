@@ -0,0 +1,60 @@
+from collections.abc import Awaitable, Callable
+from typing import Any, Final
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, User as TelegramUser
+from dishka import AsyncContainer
+
+from repositories.user import UserRepository
+from templates import get_templates, resolve_locale
+
+
+LANGUAGE_CODES_CACHE_SIZE: Final[int] = 100_000
+
+
+class LocaleMiddleware(BaseMiddleware):
+    """Puts the user's ``locale`` and its ``templates`` into handler data.
+
+    The stored preference is looked up once per user and kept in memory;
+    users without one get the locale of their Telegram client.
+    """
+
+    def __init__(self, container: AsyncContainer):
+        self.__container = container
+        self.__language_codes: dict[int, str | None] = {}
+
+    def set_language_code(self, user_id: int, language_code: str) -> None:
+        self.__language_codes[user_id] = language_code
+
+    async def __get_language_code(self, user_id: int) -> str | None:
+        if user_id in self.__language_codes:
+            return self.__language_codes[user_id]
+        async with self.__container() as request_container:
+            user_repository = await request_container.get(UserRepository)
+            user = await user_repository.get_user_by_id(
+                user_id,
+                use_replica=True,
+            )
+        language_code = None if user is None else user.language_code
+        if len(self.__language_codes) >= LANGUAGE_CODES_CACHE_SIZE:
+            self.__language_codes.clear()
+        self.__language_codes[user_id] = language_code
+        return language_code
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        telegram_user: TelegramUser | None = data.get("event_from_user")
+        language_code = None
+        if telegram_user is not None:
+            language_code = await self.__get_language_code(telegram_user.id)
+            if language_code is None:
+                language_code = telegram_user.language_code
+        locale = resolve_locale(language_code)
+        data["locale"] = locale
+        data["templates"] = get_templates(locale)
+        data["locale_middleware"] = self
+        return await handler(event, data)
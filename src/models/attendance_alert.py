@@ -0,0 +1,19 @@
+from dataclasses import dataclass
+from enum import StrEnum
+
+
+class AttendanceAlertKind(StrEnum):
+    THEORY = "theory"
+    PRACTICE = "practice"
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class AttendanceAlert:
+    id: int
+    user_id: int
+    lesson_code: str
+    lesson_name: str
+    kind: AttendanceAlertKind
+    remaining_skips: int
+    skips_percentage: float
+    language_code: str | None
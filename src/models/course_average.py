@@ -0,0 +1,19 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class CourseAverage:
+    """Weighted average of the graded exams of a lesson."""
+    lesson_code: str
+    # None before the first weighted exam is graded
+    average: float | None
+    # share of the course grade graded so far, in percent
+    graded_percentage: float
+    # final exam score needed to pass, once only the final is left
+    required_final_score: float | None = None
+    # makeup exam score needed to pass, once the final wasn't enough and
+    # the makeup exam isn't graded yet
+    required_makeup_score: float | None = None
+    # None while the lesson can still be passed or failed, False as soon
+    # as even the max score on the final or the makeup exam isn't enough
+    passed: bool | None = None
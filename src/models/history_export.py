@@ -0,0 +1,24 @@
+import datetime
+from dataclasses import dataclass
+from enum import StrEnum
+
+
+class HistoryTable(StrEnum):
+    ATTENDANCE = "attendance"
+    GRADES = "grades"
+
+
+class ExportFormat(StrEnum):
+    CSV = "csv"
+    PARQUET = "parquet"
+    ARROW = "arrow"
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class HistoryExportFilters:
+    """Rows created in [since, until), of one lesson and one user when
+    given."""
+    since: datetime.datetime | None = None
+    until: datetime.datetime | None = None
+    lesson_code: str | None = None
+    user_id: int | None = None
@@ -4,12 +4,22 @@ from dataclasses import dataclass
 
 @dataclass
 class LessonGrade:
-    id: int
     user_id: int
+    exam_id: int
+    score: str | None
+    created_at: datetime.datetime
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class ExamGrade:
+    """Latest score of a user in an exam."""
+    exam_id: int
     lesson_code: str
+    lesson_name: str
     exam_name: str
     score: str | None
-    created_at: datetime.datetime
+    # None unless the score is a number
+    score_value: float | None
 
 
 @dataclass(frozen=True, slots=True, kw_only=True)
@@ -0,0 +1,75 @@
+from dataclasses import dataclass
+from enum import StrEnum
+from typing import Final
+
+from models.lesson_grade import ExamGrade
+from models.obis import LessonAttendance
+
+
+# Skip percentages and scores both run from 0 to 100, one bucket per
+# whole number and a last one for 100 and above.
+BUCKETS_COUNT: Final[int] = 101
+
+
+def get_bucket(value: float) -> int:
+    return min(max(int(value), 0), BUCKETS_COUNT - 1)
+
+
+class AttendanceKind(StrEnum):
+    THEORY = "theory"
+    PRACTICE = "practice"
+
+
+# bucket key -> (students added, values added), negative for removed ones
+type HistogramDeltas[K] = dict[K, tuple[int, float]]
+
+
+def get_skips_percentage(
+    attendance: LessonAttendance,
+    kind: AttendanceKind,
+) -> float | None:
+    if kind == AttendanceKind.THEORY:
+        return attendance.theory_skips_percentage
+    return attendance.practice_skips_percentage
+
+
+@dataclass(frozen=True, slots=True)
+class Histogram:
+    """Latest values of the students of one lesson or exam."""
+    students_counts: tuple[int, ...]
+    values_sum: float
+
+    @property
+    def students_count(self) -> int:
+        return sum(self.students_counts)
+
+    @property
+    def average(self) -> float | None:
+        students_count = self.students_count
+        if students_count <= 0:
+            return None
+        return self.values_sum / students_count
+
+    def get_percentile_rank(self, value: float) -> float | None:
+        """Share of the students in lower buckets than ``value``, in
+        percent: all of them have a lower value."""
+        students_count = self.students_count
+        if students_count <= 0:
+            return None
+        lower_count = sum(self.students_counts[:get_bucket(value)])
+        return lower_count / students_count * 100
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class LessonStatisticsRebuild:
+    users_count: int
+    # buckets whose stored count or sum differed from the history
+    stale_buckets_count: int
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class UserLessonStatistics:
+    lessons_attendance: list[LessonAttendance]
+    attendance_histograms: dict[tuple[str, AttendanceKind], Histogram]
+    exam_grades: list[ExamGrade]
+    exam_histograms: dict[int, Histogram]
@@ -1,14 +1,6 @@
+import datetime
 from dataclasses import dataclass
 
-from pydantic import BaseModel
-
-
-class LessonAttendanceParseResult(BaseModel):
-    lesson_name: str
-    lesson_code: str
-    theory_skips_percentage: float | None
-    practice_skips_percentage: float | None
-
 
 @dataclass(frozen=True, slots=True, kw_only=True)
 class LessonAttendance:
@@ -35,17 +27,28 @@ class LessonAttendanceChange:
     current: LessonAttendance
 
 
-class LessonSkipOpportunity(BaseModel):
+@dataclass(frozen=True, slots=True, kw_only=True)
+class LessonAttendanceHistoryEntry:
+    theory_skips_percentage: float | None
+    practice_skips_percentage: float | None
+    created_at: datetime.datetime
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class LessonSkipOpportunity:
     theory: int | None
     practice: int | None
+    at_risk_date: datetime.date | None = None
 
 
-class Exam(BaseModel):
+@dataclass(frozen=True, slots=True, kw_only=True)
+class Exam:
     name: str
     score: str | None
 
 
-class LessonExams(BaseModel):
+@dataclass(frozen=True, slots=True, kw_only=True)
+class LessonExams:
     lesson_name: str
     lesson_code: str
     exams: list[Exam]
@@ -0,0 +1,57 @@
+import math
+from dataclasses import dataclass
+from enum import StrEnum
+from typing import Final
+
+
+class ScoreStatus(StrEnum):
+    MISSING = "missing"
+    ABSENT = "absent"
+    NUMERIC = "numeric"
+    # letter grades and anything else that isn't a number or a known mark
+    OTHER = "other"
+
+
+# compared casefolded, with runs of whitespace collapsed
+MISSING_MARKS: Final[frozenset[str]] = frozenset({"", "-", "–", "—"})
+ABSENT_MARKS: Final[frozenset[str]] = frozenset({
+    "g",
+    "gr",
+    "girmedi",
+    "gelmedi",
+    "katılmadı",
+    "келген жок",
+    "катышкан жок",
+    "н/я",
+    "неявка",
+    "absent",
+})
+
+
+@dataclass(frozen=True, slots=True)
+class Score:
+    """A score as OBIS shows it, normalized so that e.g. ``85``,
+    ``85.0`` and `` 85 `` compare equal."""
+    status: ScoreStatus
+    value: float | None = None
+    # the collapsed text, only kept for OTHER scores
+    text: str | None = None
+
+
+def parse_score(score: str | None) -> Score:
+    if score is None:
+        return Score(ScoreStatus.MISSING)
+    text = " ".join(score.split())
+    mark = text.casefold()
+    if mark in MISSING_MARKS:
+        return Score(ScoreStatus.MISSING)
+    if mark in ABSENT_MARKS:
+        return Score(ScoreStatus.ABSENT)
+    try:
+        value = float(text.replace(",", "."))
+    except ValueError:
+        return Score(ScoreStatus.OTHER, text=text)
+    if not math.isfinite(value):
+        return Score(ScoreStatus.OTHER, text=text)
+    # -0.0 is stored as is otherwise
+    return Score(ScoreStatus.NUMERIC, value=value + 0.0)
@@ -0,0 +1,14 @@
+from dataclasses import dataclass
+from enum import StrEnum
+
+
+class SyncReason(StrEnum):
+    CREDENTIALS_SAVED = "credentials_saved"
+    TERMS_ACCEPTED = "terms_accepted"
+    REFRESH_REQUESTED = "refresh_requested"
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class SyncRequest:
+    user_id: int
+    reason: SyncReason
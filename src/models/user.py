@@ -1,8 +1,18 @@
-from pydantic import BaseModel
+import datetime
+from dataclasses import dataclass
 
 
-class User(BaseModel):
+@dataclass(frozen=True, slots=True, kw_only=True)
+class User:
     id: int
     student_number: str
     encrypted_password: str
     has_accepted_terms: bool
+    auth_failures_count: int = 0
+    quarantined_until: datetime.datetime | None = None
+    is_quarantine_notified: bool = False
+    language_code: str | None = None
+    is_dashboard_enabled: bool = False
+    dashboard_message_id: int | None = None
+    dashboard_content_hash: str | None = None
+    dashboard_updated_at: datetime.datetime | None = None
@@ -1,116 +1,779 @@
 import asyncio
+import datetime
 import logging
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
 
 from aiogram import Bot
-from aiogram.exceptions import TelegramAPIError
+from aiogram.exceptions import TelegramAPIError, TelegramForbiddenError
 from dishka import AsyncContainer
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from exceptions.obis import (
+    ObisCircuitOpenError,
+    ObisClientNotLoggedInError,
+    ObisServiceUnavailableError,
+)
+from exceptions.user import UserQuarantinedError
+from dashboard import get_content_hash, publish_dashboard
+from db.engine import pin_to_primary
 from formatters import (
+    format_attendance_alert,
+    format_attendance_dashboard,
+    format_attendance_list,
     format_lesson_attendance_change,
     format_lesson_grade_change,
 )
+from handlers import get_dashboard_keyboard, get_unauthorized_menu
+from models.lesson_grade import LessonGradeChange
+from models.obis import LessonAttendance, LessonAttendanceChange, LessonExams
+from models.sync_request import SyncReason, SyncRequest
 from models.user import User
-from services.obis import compute_lesson_skip_opportunities
-from services.user import UserService
+from pipeline import Pipeline, Stage, StageMetrics, format_stage_metrics
+from runtime import drain_tasks
+from services.attendance_alert import AttendanceAlertService
+from services.event_bus import EventBus
+from services.history_retention import HistoryRetentionService
+from services.obis import parse_lessons_attendance_page, parse_taken_grades_page
+from services.skip_budget import SkipBudgetEngine
+from services.sync_fingerprint import SyncFingerprints, get_fingerprint
+from services.user import UserService, get_utc_now
+from services.user_sync_lock import UserSyncLocks
+from setup.settings.dashboard import DashboardSettings
+from setup.settings.event_bus import EventBusSettings
+from setup.settings.sync_pipeline import SyncPipelineSettings
+from setup.settings.worker import WorkerSettings
+from templates import get_templates, resolve_locale
 
 
 logger = logging.getLogger(__name__)
 
 
-class LessonGradeSyncTask:
+async def notify_quarantined_user(
+    error: UserQuarantinedError,
+    user_service: UserService,
+    bot: Bot,
+    locale: str,
+) -> None:
+    if not error.should_notify:
+        return
+    try:
+        await bot.send_message(
+            chat_id=error.user_id,
+            text=get_templates(locale).quarantine_notification,
+            reply_markup=get_unauthorized_menu(locale),
+        )
+    except TelegramAPIError:
+        logger.error(
+            "Could not send quarantine notification to user %s",
+            error.user_id,
+        )
+    else:
+        await user_service.mark_quarantine_notified(error.user_id)
+
+
+@dataclass(slots=True, kw_only=True)
+class UserSync:
+    """A user on their way through the sync stages."""
+    user: User
+    lock: asyncio.Lock | None = None
+    started_at: float | None = None
+    is_failed: bool = False
+    page: str | None = None
+    # of the parsed page, set when the task compared it to the last sync's
+    fingerprint: str | None = None
+
+
+@dataclass(slots=True, kw_only=True)
+class GradeSync(UserSync):
+    lessons_exams: list[LessonExams] = field(default_factory=list)
+    changes: list[LessonGradeChange] = field(default_factory=list)
+    changes_to_save: list[LessonGradeChange] = field(default_factory=list)
+
+
+@dataclass(slots=True, kw_only=True)
+class AttendanceSync(UserSync):
+    is_refresh: bool = False
+    lessons_attendance: list[LessonAttendance] = field(default_factory=list)
+    changes: list[LessonAttendanceChange] = field(default_factory=list)
+    changes_to_save: list[LessonAttendanceChange] = field(
+        default_factory=list,
+    )
+
+
+class UserSyncTask[S: UserSync](ABC):
+    """Syncs users through the fetch, parse, diff, notify and persist
+    stages.
+
+    A periodic pass runs them as a pipeline, so OBIS requests for the next
+    users overlap the database and Telegram work for the previous ones. A
+    single user runs them one after another.
+
+    Changes are only persisted once they were announced, a change that
+    could not be sent is found again by the next pass. Pages are parsed in
+    worker threads, so parsing doesn't hold up the other stages.
+    """
+
+    # what is being synced, for the logs
+    subject = "data"
 
     def __init__(self, container: AsyncContainer):
         self.__container = container
 
-    async def _process_user(self, user: User, user_service: UserService, bot: Bot) -> None:
-        grade_changes = await user_service.get_lesson_grade_changes(user_id=user.id)
-        for grade_change in grade_changes:
-            logger.info("Processing grade change for user %s", user.id)
+    @abstractmethod
+    def _create_sync(self, user: User, **sync_options) -> S:
+        pass
 
-            text = format_lesson_grade_change(grade_change)
-            try:
-                await bot.send_message(
-                    chat_id=user.id,
-                    text=text,
-                )
-            except TelegramAPIError:
-                logger.error(
-                    "Could not send attendance change to user %s", user.id,
-                )
-            else:
-                await user_service.save_grade_change(grade_change)
-                logger.info(
-                    "Successfully sent attendance change to user %s", user.id,
-                )
-            finally:
-                await asyncio.sleep(0.1)
+    @abstractmethod
+    async def _fetch(self, sync: S, container: AsyncContainer) -> bool:
+        pass
 
-    async def execute(self) -> None:
-        bot = await self.__container.get(Bot)
+    @abstractmethod
+    async def _parse(self, sync: S, container: AsyncContainer) -> bool:
+        pass
+
+    @abstractmethod
+    async def _diff(self, sync: S, container: AsyncContainer) -> bool:
+        pass
+
+    @abstractmethod
+    async def _notify(self, sync: S, container: AsyncContainer) -> bool:
+        pass
+
+    @abstractmethod
+    async def _persist(self, sync: S, container: AsyncContainer) -> bool:
+        pass
+
+    async def _process_user(self, sync: S, container: AsyncContainer) -> None:
+        """Every stage for one user; the caller holds the user's lock."""
+        sync.started_at = time.perf_counter()
+        for handler in (
+            self._fetch,
+            self._parse,
+            self._diff,
+            self._notify,
+            self._persist,
+        ):
+            if not await handler(sync, container):
+                return
+
+    async def __fetch_locked(
+        self,
+        sync: S,
+        container: AsyncContainer,
+    ) -> bool:
+        user_sync_locks = await container.get(UserSyncLocks)
+        sync.started_at = time.perf_counter()
+        lock = user_sync_locks.get(sync.user.id)
+        await lock.acquire()
+        # released by _finish_user once the user leaves the pipeline
+        sync.lock = lock
+        return await self._fetch(sync, container)
+
+    async def _is_changed_since_last_sync(
+        self,
+        sync: S,
+        content: object,
+        container: AsyncContainer,
+    ) -> bool:
+        """Whether the parsed ``content`` differs from what the last
+        complete sync of the user found."""
+        sync.fingerprint = get_fingerprint(content)
+        sync_fingerprints = await container.get(SyncFingerprints)
+        return not await sync_fingerprints.is_unchanged(
+            self.subject,
+            sync.user.id,
+            sync.fingerprint,
+        )
+
+    async def _remember_sync(
+        self,
+        sync: S,
+        container: AsyncContainer,
+    ) -> None:
+        """Called once the database holds everything the sync found."""
+        if sync.fingerprint is None:
+            return
+        sync_fingerprints = await container.get(SyncFingerprints)
+        await sync_fingerprints.remember(
+            self.subject,
+            sync.user.id,
+            sync.fingerprint,
+        )
+
+    def _finish_user(self, sync: S) -> None:
+        if sync.lock is not None:
+            sync.lock.release()
+            sync.lock = None
+
+    async def _handle_error(
+        self,
+        sync: S,
+        error: Exception,
+        container: AsyncContainer,
+    ) -> None:
+        sync.is_failed = True
+        user = sync.user
+        if isinstance(error, UserQuarantinedError):
+            await notify_quarantined_user(
+                error,
+                await container.get(UserService),
+                await container.get(Bot),
+                resolve_locale(user.language_code),
+            )
+        elif isinstance(
+            error,
+            (ObisServiceUnavailableError, ObisClientNotLoggedInError),
+        ):
+            logger.info(
+                "Could not sync %s of user %s: %s", self.subject, user.id, error,
+            )
+        else:
+            logger.exception("Error processing user %s: %s", user.id, error)
+
+    async def execute_for_user(self, user_id: int, **sync_options) -> None:
+        user_sync_locks = await self.__container.get(UserSyncLocks)
         async with self.__container() as nested_container:
+            # Immediate syncs follow the write that triggered them, such as
+            # saved credentials, which the replica may not have yet.
+            pin_to_primary(await nested_container.get(AsyncSession))
             user_service = await nested_container.get(UserService)
-            users = await user_service.get_users()
-
-            for user in users:
+            async with user_sync_locks.get(user_id):
+                user = await user_service.get_user_to_sync(user_id)
+                if user is None:
+                    return
+                sync = self._create_sync(user, **sync_options)
                 try:
-                    await self._process_user(user, user_service, bot)
+                    await self._process_user(sync, nested_container)
                 except Exception as e:
-                    logger.exception("Error processing user %s: %s", user.id, e)
+                    await self._handle_error(sync, e, nested_container)
 
+    async def execute(self) -> list[StageMetrics]:
+        worker_settings = await self.__container.get(WorkerSettings)
+        pipeline_settings = await self.__container.get(SyncPipelineSettings)
+        async with self.__container() as nested_container:
+            user_service = await nested_container.get(UserService)
+            users = await user_service.get_users_to_sync(
+                shard_index=worker_settings.shard_index,
+                shard_count=worker_settings.shard_count,
+            )
 
-class LessonAttendanceCheckTask:
+        async def handle_error(
+            sync: S,
+            error: Exception,
+            container: AsyncContainer,
+        ) -> None:
+            # only an open circuit means OBIS is down for everyone, other
+            # errors fail just this user
+            if not isinstance(error, ObisCircuitOpenError):
+                await self._handle_error(sync, error, container)
+                return
+            sync.is_failed = True
+            if not pipeline.is_stopped:
+                logger.warning("Stopping pass, OBIS is unavailable: %s", error)
+                pipeline.stop()
 
-    def __init__(self, container: AsyncContainer):
-        self.__container = container
+        pipeline = Pipeline(
+            self.__container,
+            [
+                Stage(
+                    name="fetch",
+                    handler=self.__fetch_locked,
+                    concurrency=pipeline_settings.fetch_concurrency,
+                ),
+                Stage(
+                    name="parse",
+                    handler=self._parse,
+                    concurrency=pipeline_settings.parse_concurrency,
+                ),
+                Stage(
+                    name="diff",
+                    handler=self._diff,
+                    concurrency=pipeline_settings.diff_concurrency,
+                ),
+                Stage(
+                    name="notify",
+                    handler=self._notify,
+                    concurrency=pipeline_settings.notify_concurrency,
+                ),
+                Stage(
+                    name="persist",
+                    handler=self._persist,
+                    concurrency=pipeline_settings.persist_concurrency,
+                ),
+            ],
+            queue_size=pipeline_settings.queue_size,
+            on_error=handle_error,
+            on_exit=self._finish_user,
+        )
+        started_at = time.perf_counter()
+        metrics = await pipeline.run(self._create_sync(user) for user in users)
+        elapsed = time.perf_counter() - started_at
+        logger.info(
+            "Synced %s of %s users in %.1fs: %s",
+            self.subject,
+            len(users),
+            elapsed,
+            format_stage_metrics(metrics, elapsed),
+        )
+        return metrics
+
+
+class LessonGradeSyncTask(UserSyncTask[GradeSync]):
+
+    subject = "grades"
 
-    async def _process_user(
+    def _create_sync(self, user: User) -> GradeSync:
+        return GradeSync(user=user)
+
+    async def _fetch(
+        self,
+        sync: GradeSync,
+        container: AsyncContainer,
+    ) -> bool:
+        user_service = await container.get(UserService)
+        sync.page = await user_service.get_exams_page(sync.user)
+        return True
+
+    async def _parse(
+        self,
+        sync: GradeSync,
+        container: AsyncContainer,
+    ) -> bool:
+        sync.lessons_exams = await asyncio.to_thread(
+            parse_taken_grades_page,
+            sync.page,
+        )
+        sync.page = None
+        return await self._is_changed_since_last_sync(
+            sync,
+            sync.lessons_exams,
+            container,
+        )
+
+    async def _diff(
+        self,
+        sync: GradeSync,
+        container: AsyncContainer,
+    ) -> bool:
+        user_service = await container.get(UserService)
+        sync.changes = await user_service.compute_lesson_grade_changes(
+            sync.user.id,
+            sync.lessons_exams,
+        )
+        if not sync.changes:
+            await self._remember_sync(sync, container)
+        return bool(sync.changes)
+
+    async def _notify(
+        self,
+        sync: GradeSync,
+        container: AsyncContainer,
+    ) -> bool:
+        bot = await container.get(Bot)
+        user = sync.user
+        try:
+            for grade_change in sync.changes:
+                logger.info("Processing grade change for user %s", user.id)
+
+                text = format_lesson_grade_change(
+                    grade_change,
+                    resolve_locale(user.language_code),
+                )
+                try:
+                    await bot.send_message(
+                        chat_id=user.id,
+                        text=text,
+                    )
+                except TelegramAPIError:
+                    logger.error(
+                        "Could not send grade change to user %s", user.id,
+                    )
+                else:
+                    sync.changes_to_save.append(grade_change)
+                    logger.info(
+                        "Successfully sent grade change to user %s", user.id,
+                    )
+                finally:
+                    await asyncio.sleep(0.1)
+        except Exception as e:
+            # the changes sent so far are still persisted
+            logger.exception("Error notifying user %s: %s", user.id, e)
+        return bool(sync.changes_to_save)
+
+    async def _persist(
+        self,
+        sync: GradeSync,
+        container: AsyncContainer,
+    ) -> bool:
+        user_service = await container.get(UserService)
+        for grade_change in sync.changes_to_save:
+            await user_service.save_grade_change(grade_change)
+        if len(sync.changes_to_save) == len(sync.changes):
+            await self._remember_sync(sync, container)
+        return False
+
+
+class LessonAttendanceCheckTask(UserSyncTask[AttendanceSync]):
+
+    subject = "attendance"
+
+    def _create_sync(
         self,
         user: User,
+        *,
+        is_refresh: bool = False,
+    ) -> AttendanceSync:
+        return AttendanceSync(user=user, is_refresh=is_refresh)
+
+    async def _update_dashboard(
+        self,
+        user: User,
+        lessons_attendance: list[LessonAttendance],
         user_service: UserService,
+        skip_budget_engine: SkipBudgetEngine,
         bot: Bot,
+        dashboard_settings: DashboardSettings,
     ) -> None:
-        logger.info("Checking lesson attendance for user %s", user.id)
-        changes = await user_service.get_attendance_changes(user_id=user.id)
-
-        for attendance_change in changes:
-            if attendance_change.previous is None:
-                await user_service.save_attendance_change(attendance_change)
-                logger.info(
-                    "Saved first attendance change for user %s", user.id,
-                )
-                continue
-            text = format_lesson_attendance_change(
-                old_lesson_attendance=attendance_change.previous,
-                new_lesson_attendance=attendance_change.current,
-                lesson_skip_opportunity=compute_lesson_skip_opportunities(
-                    attendance_change.current,
+        locale = resolve_locale(user.language_code)
+        attendance_text = format_attendance_list(
+            lessons_attendance,
+            skip_budget_engine.compute(lessons_attendance),
+            locale,
+        )
+        content_hash = get_content_hash(attendance_text)
+        if content_hash == user.dashboard_content_hash:
+            return
+
+        now = get_utc_now()
+        coalesce_window = datetime.timedelta(
+            seconds=dashboard_settings.coalesce_window_seconds,
+        )
+        if (
+            user.dashboard_updated_at is not None
+            and now - user.dashboard_updated_at < coalesce_window
+        ):
+            logger.debug("Coalescing dashboard update for user %s", user.id)
+            return
+
+        try:
+            message_id = await publish_dashboard(
+                bot,
+                chat_id=user.id,
+                text=format_attendance_dashboard(
+                    attendance_text,
+                    datetime.datetime.now(),
+                    locale,
                 ),
+                message_id=user.dashboard_message_id,
+                reply_markup=get_dashboard_keyboard(locale),
             )
-            try:
-                await bot.send_message(
-                    chat_id=user.id,
-                    text=text,
-                )
-            except TelegramAPIError:
-                logger.error(
-                    "Could not send attendance change to user %s", user.id,
+        except TelegramAPIError:
+            logger.error("Could not update dashboard of user %s", user.id)
+            return
+        await user_service.save_dashboard(
+            user.id,
+            message_id=message_id,
+            content_hash=content_hash,
+        )
+        logger.info("Updated dashboard of user %s", user.id)
+
+    async def _fetch(
+        self,
+        sync: AttendanceSync,
+        container: AsyncContainer,
+    ) -> bool:
+        logger.info("Checking lesson attendance for user %s", sync.user.id)
+        user_service = await container.get(UserService)
+        sync.page = await user_service.get_attendance_page(sync.user)
+        return True
+
+    async def _parse(
+        self,
+        sync: AttendanceSync,
+        container: AsyncContainer,
+    ) -> bool:
+        sync.lessons_attendance = await asyncio.to_thread(
+            parse_lessons_attendance_page,
+            sync.page,
+            sync.user.id,
+        )
+        sync.page = None
+        if sync.is_refresh or sync.user.is_dashboard_enabled:
+            # the dashboard may be due an edit that was held back
+            return True
+        return await self._is_changed_since_last_sync(
+            sync,
+            sync.lessons_attendance,
+            container,
+        )
+
+    async def _diff(
+        self,
+        sync: AttendanceSync,
+        container: AsyncContainer,
+    ) -> bool:
+        user_service = await container.get(UserService)
+        sync.changes = await user_service.compute_attendance_changes(
+            sync.user.id,
+            sync.lessons_attendance,
+        )
+        if not sync.changes:
+            await self._remember_sync(sync, container)
+        # the dashboard may be due an edit without any change
+        return bool(sync.changes) or sync.user.is_dashboard_enabled
+
+    async def _notify(
+        self,
+        sync: AttendanceSync,
+        container: AsyncContainer,
+    ) -> bool:
+        user = sync.user
+        bot = await container.get(Bot)
+        skip_budget_engine = await container.get(SkipBudgetEngine)
+        if user.is_dashboard_enabled:
+            dashboard_settings = await container.get(DashboardSettings)
+            if sync.is_refresh:
+                # the user asked for it, so the dashboard isn't held back
+                dashboard_settings = dashboard_settings.model_copy(
+                    update={"coalesce_window_seconds": 0},
                 )
-            else:
-                await user_service.save_attendance_change(attendance_change)
-                logger.info(
-                    "Successfully sent attendance change to user %s", user.id,
+            # The dashboard always shows the current state, so changes are
+            # persisted whether or not the edit went through.
+            sync.changes_to_save = sync.changes
+            await self._update_dashboard(
+                user,
+                sync.lessons_attendance,
+                await container.get(UserService),
+                skip_budget_engine,
+                bot,
+                dashboard_settings,
+            )
+            return bool(sync.changes_to_save)
+
+        skip_opportunities = skip_budget_engine.compute(
+            [attendance_change.current for attendance_change in sync.changes],
+        )
+        try:
+            for attendance_change, skip_opportunity in zip(
+                sync.changes,
+                skip_opportunities,
+            ):
+                if attendance_change.previous is None:
+                    sync.changes_to_save.append(attendance_change)
+                    logger.info(
+                        "Saving first attendance change for user %s", user.id,
+                    )
+                    continue
+                text = format_lesson_attendance_change(
+                    old_lesson_attendance=attendance_change.previous,
+                    new_lesson_attendance=attendance_change.current,
+                    lesson_skip_opportunity=skip_opportunity,
+                    locale=resolve_locale(user.language_code),
                 )
+                try:
+                    await bot.send_message(
+                        chat_id=user.id,
+                        text=text,
+                    )
+                except TelegramAPIError:
+                    logger.error(
+                        "Could not send attendance change to user %s", user.id,
+                    )
+                else:
+                    sync.changes_to_save.append(attendance_change)
+                    logger.info(
+                        "Successfully sent attendance change to user %s",
+                        user.id,
+                    )
+                finally:
+                    await asyncio.sleep(0.1)
+        except Exception as e:
+            # the changes sent so far are still persisted
+            logger.exception("Error notifying user %s: %s", user.id, e)
+        return bool(sync.changes_to_save)
+
+    async def _persist(
+        self,
+        sync: AttendanceSync,
+        container: AsyncContainer,
+    ) -> bool:
+        user_service = await container.get(UserService)
+        await user_service.save_attendance_changes(
+            sync.user.id,
+            sync.changes_to_save,
+        )
+        if len(sync.changes_to_save) == len(sync.changes):
+            await self._remember_sync(sync, container)
+        return False
+
+    async def execute_for_user(
+        self,
+        user_id: int,
+        *,
+        is_refresh: bool = False,
+    ) -> None:
+        await super().execute_for_user(user_id, is_refresh=is_refresh)
+
+
+class HistoryRetentionTask:
+
+    def __init__(self, container: AsyncContainer):
+        self.__container = container
+
+    async def execute(self) -> None:
+        async with self.__container() as nested_container:
+            history_retention_service = await nested_container.get(
+                HistoryRetentionService,
+            )
+            try:
+                await history_retention_service.maintain(datetime.date.today())
+            except Exception as e:
+                logger.exception("Error maintaining history partitions: %s", e)
+
+
+class AttendanceAlertTask:
+
+    def __init__(self, container: AsyncContainer, batch_size: int = 500):
+        self.__container = container
+        self.__batch_size = batch_size
+
+    async def _deliver_alerts(
+        self,
+        attendance_alert_service: AttendanceAlertService,
+        bot: Bot,
+        worker_settings: WorkerSettings,
+    ) -> None:
+        while True:
+            alerts = await attendance_alert_service.get_pending_alerts(
+                self.__batch_size,
+                shard_index=worker_settings.shard_index,
+                shard_count=worker_settings.shard_count,
+            )
+            handled_alert_ids: list[int] = []
+            try:
+                for alert in alerts:
+                    try:
+                        await bot.send_message(
+                            chat_id=alert.user_id,
+                            text=format_attendance_alert(
+                                alert,
+                                resolve_locale(alert.language_code),
+                            ),
+                        )
+                    except TelegramForbiddenError:
+                        handled_alert_ids.append(alert.id)
+                        logger.info(
+                            "Dropping attendance alert, user %s blocked the bot",
+                            alert.user_id,
+                        )
+                    except TelegramAPIError:
+                        logger.error(
+                            "Could not send attendance alert to user %s",
+                            alert.user_id,
+                        )
+                    else:
+                        handled_alert_ids.append(alert.id)
+                    finally:
+                        await asyncio.sleep(0.1)
             finally:
-                await asyncio.sleep(0.1)
+                await attendance_alert_service.mark_alerts_sent(
+                    handled_alert_ids,
+                )
+            if len(alerts) < self.__batch_size or not handled_alert_ids:
+                return
 
     async def execute(self) -> None:
         bot = await self.__container.get(Bot)
+        worker_settings = await self.__container.get(WorkerSettings)
         async with self.__container() as nested_container:
-            user_service = await nested_container.get(UserService)
-            users = await user_service.get_users()
+            attendance_alert_service = await nested_container.get(
+                AttendanceAlertService,
+            )
+            try:
+                # Alerts are computed for every user at once, each shard
+                # then delivers its own users' ones.
+                if worker_settings.is_primary:
+                    await attendance_alert_service.enqueue_alerts()
+                await self._deliver_alerts(
+                    attendance_alert_service,
+                    bot,
+                    worker_settings,
+                )
+            except Exception as e:
+                logger.exception("Error processing attendance alerts: %s", e)
 
-            for user in users:
-                try:
-                    await self._process_user(user, user_service, bot)
-                except Exception as e:
-                    logger.exception("Error processing user %s: %s", user.id, e)
+
+class ImmediateSyncTask:
+    """Syncs a user as soon as the event bus asks for it.
+
+    Requested syncs run next to the periodic passes, which stay as the
+    backstop for requests published while no worker was listening.
+    """
+
+    def __init__(self, container: AsyncContainer):
+        self.__container = container
+        self.__attendance_check_task = LessonAttendanceCheckTask(container)
+        self.__grade_sync_task = LessonGradeSyncTask(container)
+        self.__pending_user_ids: set[int] = set()
+        self.__sync_tasks: set[asyncio.Task] = set()
+
+    async def _sync_user(self, sync_request: SyncRequest) -> None:
+        logger.info(
+            "Immediate sync of user %s: %s",
+            sync_request.user_id,
+            sync_request.reason,
+        )
+        await self.__attendance_check_task.execute_for_user(
+            sync_request.user_id,
+            is_refresh=sync_request.reason == SyncReason.REFRESH_REQUESTED,
+        )
+        await self.__grade_sync_task.execute_for_user(sync_request.user_id)
+
+    async def __run_sync(
+        self,
+        sync_request: SyncRequest,
+        semaphore: asyncio.Semaphore,
+    ) -> None:
+        try:
+            await self._sync_user(sync_request)
+        finally:
+            self.__pending_user_ids.discard(sync_request.user_id)
+            semaphore.release()
+
+    async def execute(self) -> None:
+        """Listens for sync requests until cancelled."""
+        event_bus = await self.__container.get(EventBus)
+        event_bus_settings = await self.__container.get(EventBusSettings)
+        worker_settings = await self.__container.get(WorkerSettings)
+        semaphore = asyncio.Semaphore(event_bus_settings.max_concurrent_syncs)
+        while True:
+            try:
+                async for sync_request in event_bus.listen():
+                    user_id = sync_request.user_id
+                    if (
+                        user_id % worker_settings.shard_count
+                        != worker_settings.shard_index
+                    ):
+                        continue
+                    # repeated taps while a sync is queued or running
+                    if user_id in self.__pending_user_ids:
+                        continue
+                    self.__pending_user_ids.add(user_id)
+                    await semaphore.acquire()
+                    task = asyncio.create_task(
+                        self.__run_sync(sync_request, semaphore),
+                    )
+                    self.__sync_tasks.add(task)
+                    task.add_done_callback(self.__sync_tasks.discard)
+            except Exception as e:
+                logger.warning(
+                    "Event bus listener failed, reconnecting in %ss: %s",
+                    event_bus_settings.reconnect_delay,
+                    e,
+                )
+            await asyncio.sleep(event_bus_settings.reconnect_delay)
+
+    async def shutdown(self, timeout: float) -> None:
+        await drain_tasks(self.__sync_tasks, timeout)
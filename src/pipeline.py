@@ -0,0 +1,218 @@
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from typing import Final
+
+from dishka import AsyncContainer
+
+
+logger = logging.getLogger(__name__)
+
+# Tells a stage worker there are no more items.
+END_OF_ITEMS: Final = object()
+
+type StageHandler[T] = Callable[[T, AsyncContainer], Awaitable[bool]]
+type ErrorHandler[T] = Callable[[T, Exception, AsyncContainer], Awaitable[None]]
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class Stage[T]:
+    """One step of a pipeline.
+
+    ``handler`` returns whether the item goes on to the next stage.
+    """
+    name: str
+    handler: StageHandler[T]
+    concurrency: int = 1
+
+
+@dataclass(slots=True)
+class StageMetrics:
+    name: str
+    concurrency: int
+    processed_count: int = 0
+    failed_count: int = 0
+    # seconds, summed over the stage's workers
+    busy_time: float = 0.0
+    idle_time: float = 0.0
+    blocked_time: float = 0.0
+
+    def format(self, elapsed: float) -> str:
+        worker_time = elapsed * self.concurrency or 1.0
+        throughput = self.processed_count / elapsed if elapsed else 0.0
+        return (
+            f"{self.name}: {self.processed_count} items "
+            f"({self.failed_count} failed), {throughput:.1f}/s, "
+            f"busy {self.busy_time / worker_time:.0%}, "
+            f"idle {self.idle_time / worker_time:.0%}, "
+            f"blocked {self.blocked_time / worker_time:.0%}"
+        )
+
+
+class Pipeline[T]:
+    """Runs items through stages connected by bounded queues.
+
+    Every stage has its own workers, so a slow stage for one item overlaps
+    with the other stages for the next ones. A full queue blocks the
+    stage feeding it, which is reported as its blocked time.
+
+    Each worker resolves its dependencies from its own request container,
+    so workers never share a database session or an OBIS client.
+    ``on_error`` is called with the worker's container when a handler
+    raises, and ``on_exit`` once an item leaves the pipeline for any
+    reason, cancellation included.
+    """
+
+    def __init__(
+        self,
+        container: AsyncContainer,
+        stages: list[Stage[T]],
+        *,
+        queue_size: int,
+        on_error: ErrorHandler[T],
+        on_exit: Callable[[T], None],
+    ):
+        self.__container = container
+        self.__stages = stages
+        self.__queue_size = queue_size
+        self.__on_error = on_error
+        self.__on_exit = on_exit
+        self.__is_stopped = False
+
+    @property
+    def is_stopped(self) -> bool:
+        return self.__is_stopped
+
+    def stop(self) -> None:
+        """Items not yet taken by the first stage are dropped, the ones
+        already in it finish the pipeline."""
+        self.__is_stopped = True
+
+    async def run(self, items: Iterable[T]) -> list[StageMetrics]:
+        queues: list[asyncio.Queue] = [
+            asyncio.Queue(maxsize=self.__queue_size) for _ in self.__stages
+        ]
+        metrics = [
+            StageMetrics(name=stage.name, concurrency=stage.concurrency)
+            for stage in self.__stages
+        ]
+        try:
+            async with asyncio.TaskGroup() as task_group:
+                task_group.create_task(self.__feed(items, queues[0]))
+                for index, stage in enumerate(self.__stages):
+                    output = queues[index + 1] if index + 1 < len(queues) else None
+                    task_group.create_task(
+                        self.__run_stage(
+                            stage,
+                            is_first=index == 0,
+                            input_queue=queues[index],
+                            output_queue=output,
+                            metrics=metrics[index],
+                        ),
+                    )
+        finally:
+            for queue in queues:
+                while not queue.empty():
+                    item = queue.get_nowait()
+                    if item is not END_OF_ITEMS:
+                        self.__on_exit(item)
+        return metrics
+
+    async def __feed(self, items: Iterable[T], queue: asyncio.Queue) -> None:
+        for item in items:
+            if self.__is_stopped:
+                break
+            await queue.put(item)
+        await queue.put(END_OF_ITEMS)
+
+    async def __run_stage(
+        self,
+        stage: Stage[T],
+        *,
+        is_first: bool,
+        input_queue: asyncio.Queue,
+        output_queue: asyncio.Queue | None,
+        metrics: StageMetrics,
+    ) -> None:
+        async with asyncio.TaskGroup() as task_group:
+            for _ in range(stage.concurrency):
+                task_group.create_task(
+                    self.__run_worker(
+                        stage,
+                        is_first=is_first,
+                        input_queue=input_queue,
+                        output_queue=output_queue,
+                        metrics=metrics,
+                    ),
+                )
+        if output_queue is not None:
+            await output_queue.put(END_OF_ITEMS)
+
+    async def __run_worker(
+        self,
+        stage: Stage[T],
+        *,
+        is_first: bool,
+        input_queue: asyncio.Queue,
+        output_queue: asyncio.Queue | None,
+        metrics: StageMetrics,
+    ) -> None:
+        async with self.__container() as container:
+            while True:
+                waiting_since = time.perf_counter()
+                item = await input_queue.get()
+                metrics.idle_time += time.perf_counter() - waiting_since
+                if item is END_OF_ITEMS:
+                    # the other workers of the stage stop on it as well
+                    input_queue.put_nowait(END_OF_ITEMS)
+                    return
+                is_passed_on = False
+                try:
+                    if is_first and self.__is_stopped:
+                        continue
+                    should_continue = await self.__handle(
+                        stage,
+                        item,
+                        container,
+                        metrics,
+                    )
+                    if should_continue and output_queue is not None:
+                        waiting_since = time.perf_counter()
+                        await output_queue.put(item)
+                        metrics.blocked_time += (
+                            time.perf_counter() - waiting_since
+                        )
+                        is_passed_on = True
+                finally:
+                    if not is_passed_on:
+                        self.__on_exit(item)
+
+    async def __handle(
+        self,
+        stage: Stage[T],
+        item: T,
+        container: AsyncContainer,
+        metrics: StageMetrics,
+    ) -> bool:
+        started_at = time.perf_counter()
+        try:
+            return await stage.handler(item, container)
+        except Exception as e:
+            metrics.failed_count += 1
+            try:
+                await self.__on_error(item, e, container)
+            except Exception:
+                logger.exception("Error handling failure in %s", stage.name)
+            return False
+        finally:
+            metrics.processed_count += 1
+            metrics.busy_time += time.perf_counter() - started_at
+
+
+def format_stage_metrics(
+    metrics: list[StageMetrics],
+    elapsed: float,
+) -> str:
+    return "; ".join(stage_metrics.format(elapsed) for stage_metrics in metrics)
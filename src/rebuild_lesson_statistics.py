@@ -0,0 +1,65 @@
+"""Recounts the per-lesson statistics from the attendance and grade history.
+
+With ``--dry-run`` only reports how many histogram buckets drifted from
+the history, e.g. as a periodic consistency check::
+
+    python src/rebuild_lesson_statistics.py --dry-run
+"""
+import argparse
+import asyncio
+import sys
+
+from dishka import make_async_container
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.engine import pin_to_primary
+from logger import setup_logging
+from services.lesson_statistics import LessonStatisticsService
+from setup.ioc.registry import get_providers
+from setup.settings.app import AppSettings
+
+
+async def main(arguments: argparse.Namespace) -> None:
+    setup_logging()
+    settings = AppSettings.from_settings_toml_file()
+    container = make_async_container(
+        *get_providers(), context={
+            AppSettings: settings,
+        },
+    )
+    try:
+        async with container() as request_container:
+            # the history and the stored buckets have to be compared as of
+            # one moment, which a lagging replica can't guarantee
+            pin_to_primary(await request_container.get(AsyncSession))
+            lesson_statistics_service = await request_container.get(
+                LessonStatisticsService,
+            )
+            rebuild = await lesson_statistics_service.rebuild(
+                dry_run=arguments.dry_run,
+            )
+    finally:
+        await container.close()
+    print(
+        f"{rebuild.users_count} users recounted, "
+        f"{rebuild.stale_buckets_count} stale buckets"
+        f"{'' if arguments.dry_run else ' replaced'}",
+    )
+    if arguments.dry_run and rebuild.stale_buckets_count:
+        sys.exit(1)
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only compare, exit with status 1 when buckets are stale",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    if sys.platform == "win32":
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(main(parse_arguments()))
@@ -0,0 +1,289 @@
+import datetime
+from collections.abc import Iterable
+
+from sqlalchemy import (
+    ColumnElement,
+    Float,
+    FromClause,
+    Integer,
+    String,
+    case,
+    cast,
+    column,
+    func,
+    literal,
+    or_,
+    select,
+    union_all,
+    update,
+    values,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.dialect import get_dialect_name, upsert
+from db.models.attendance_alert import (
+    AttendanceAlert as DatabaseAttendanceAlert,
+)
+from db.models.lesson import Lesson
+from db.models.lesson_attendance import LatestLessonAttendance
+from db.models.user import User as DatabaseUser
+from models.attendance_alert import AttendanceAlert, AttendanceAlertKind
+from setup.settings.skip_budget import SkipBudgetSettings
+from setup.settings.storage import StorageSettings
+
+
+def compute_remaining_skips(
+    skips_percentage: ColumnElement[float],
+    threshold: ColumnElement[float],
+    skip_percentage_per_lesson: ColumnElement[float],
+) -> ColumnElement[int]:
+    """SQL counterpart of ``services.skip_budget.compute_remaining_skips``,
+    clamped at zero so that every skip past the limit dedupes into the
+    same "no skips left" alert."""
+    diff = threshold - skips_percentage
+    remaining = case(
+        (skips_percentage.is_(None), None),
+        (diff == skip_percentage_per_lesson, 0),
+        else_=cast(func.floor(diff / skip_percentage_per_lesson), Integer),
+    )
+    return case((remaining < 0, 0), else_=remaining)
+
+
+class AttendanceAlertRepository:
+    """Threshold-crossing alerts evaluated over the current attendance state
+    of all users in a single ``INSERT ... SELECT``.
+
+    The unique (user, lesson, kind, semester, remaining skips) key
+    deduplicates alerts that were already enqueued in the semester, so the
+    statement can be rerun on every pass.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        skip_budget_settings: SkipBudgetSettings,
+        storage_settings: StorageSettings,
+    ):
+        self.__session = session
+        self.__skip_budget_settings = skip_budget_settings
+        self.__storage_settings = storage_settings
+
+    @property
+    def is_supported(self) -> bool:
+        """Snapshot payloads can't be evaluated in SQL, alerts need the
+        row-per-change layout."""
+        return self.__storage_settings.attendance_mode == "rows"
+
+    def __get_courses(self) -> FromClause | None:
+        courses = self.__skip_budget_settings.courses
+        if not courses:
+            return None
+        if get_dialect_name(self.__session) == "sqlite":
+            # SQLite can't name the columns of a VALUES list
+            return union_all(
+                *(
+                    select(
+                        literal(lesson_code, String).label("lesson_code"),
+                        literal(course.theory_threshold, Float)
+                        .label("theory_threshold"),
+                        literal(course.practice_threshold, Float)
+                        .label("practice_threshold"),
+                        literal(course.skip_percentage_per_lesson, Float)
+                        .label("skip_percentage_per_lesson"),
+                    )
+                    for lesson_code, course in courses.items()
+                ),
+            ).subquery("courses")
+        return values(
+            column("lesson_code", String),
+            column("theory_threshold", Float),
+            column("practice_threshold", Float),
+            column("skip_percentage_per_lesson", Float),
+            name="courses",
+        ).data(
+            [
+                (
+                    lesson_code,
+                    course.theory_threshold,
+                    course.practice_threshold,
+                    course.skip_percentage_per_lesson,
+                )
+                for lesson_code, course in courses.items()
+            ],
+        )
+
+    async def enqueue_alerts(
+        self,
+        *,
+        semester: str,
+        since: datetime.datetime,
+        now: datetime.datetime,
+    ) -> int:
+        """Only attendance that changed since ``since`` is evaluated, and
+        quarantined users are skipped the same way the sync skips them."""
+        default = self.__skip_budget_settings.default
+        latest = LatestLessonAttendance.__table__.alias("latest")
+        current_state = latest.join(
+            DatabaseUser,
+            DatabaseUser.id == latest.c.user_id,
+        )
+        theory_threshold = literal(default.theory_threshold, Float)
+        practice_threshold = literal(default.practice_threshold, Float)
+        skip_percentage_per_lesson = literal(
+            default.skip_percentage_per_lesson,
+            Float,
+        )
+        courses = self.__get_courses()
+        if courses is not None:
+            current_state = current_state.outerjoin(
+                courses,
+                courses.c.lesson_code == latest.c.lesson_code,
+            )
+            theory_threshold = func.coalesce(
+                courses.c.theory_threshold,
+                theory_threshold,
+            )
+            practice_threshold = func.coalesce(
+                courses.c.practice_threshold,
+                practice_threshold,
+            )
+            skip_percentage_per_lesson = func.coalesce(
+                courses.c.skip_percentage_per_lesson,
+                skip_percentage_per_lesson,
+            )
+
+        state = (
+            select(
+                latest.c.user_id,
+                latest.c.lesson_code,
+                latest.c.theory_skips_percentage,
+                latest.c.practice_skips_percentage,
+                compute_remaining_skips(
+                    latest.c.theory_skips_percentage,
+                    theory_threshold,
+                    skip_percentage_per_lesson,
+                ).label("theory_remaining_skips"),
+                compute_remaining_skips(
+                    latest.c.practice_skips_percentage,
+                    practice_threshold,
+                    skip_percentage_per_lesson,
+                ).label("practice_remaining_skips"),
+            )
+            .select_from(current_state)
+            .where(
+                latest.c.created_at >= since,
+                DatabaseUser.has_accepted_terms.is_(True),
+                or_(
+                    DatabaseUser.quarantined_until.is_(None),
+                    DatabaseUser.quarantined_until <= now,
+                ),
+            )
+            .cte("state")
+        )
+        alert_threshold = self.__skip_budget_settings.alert_remaining_skips
+        candidates = [
+            select(
+                state.c.user_id,
+                state.c.lesson_code,
+                literal(kind.value, String),
+                literal(semester, String),
+                remaining_skips,
+                skips_percentage,
+            ).where(remaining_skips <= alert_threshold)
+            for kind, skips_percentage, remaining_skips in (
+                (
+                    AttendanceAlertKind.THEORY,
+                    state.c.theory_skips_percentage,
+                    state.c.theory_remaining_skips,
+                ),
+                (
+                    AttendanceAlertKind.PRACTICE,
+                    state.c.practice_skips_percentage,
+                    state.c.practice_remaining_skips,
+                ),
+            )
+        ]
+
+        statement = (
+            upsert(self.__session, DatabaseAttendanceAlert)
+            .from_select(
+                [
+                    DatabaseAttendanceAlert.user_id,
+                    DatabaseAttendanceAlert.lesson_code,
+                    DatabaseAttendanceAlert.kind,
+                    DatabaseAttendanceAlert.semester,
+                    DatabaseAttendanceAlert.remaining_skips,
+                    DatabaseAttendanceAlert.skips_percentage,
+                ],
+                union_all(*candidates),
+            )
+            .on_conflict_do_nothing(
+                index_elements=[
+                    DatabaseAttendanceAlert.user_id,
+                    DatabaseAttendanceAlert.lesson_code,
+                    DatabaseAttendanceAlert.kind,
+                    DatabaseAttendanceAlert.semester,
+                    DatabaseAttendanceAlert.remaining_skips,
+                ],
+            )
+            # SQLite has no rowcount for an INSERT that starts with WITH
+            .returning(DatabaseAttendanceAlert.id)
+        )
+        result = await self.__session.execute(statement)
+        enqueued_count = len(result.all())
+        await self.__session.commit()
+        return enqueued_count
+
+    async def get_pending_alerts(
+        self,
+        limit: int,
+        *,
+        shard_index: int = 0,
+        shard_count: int = 1,
+    ) -> list[AttendanceAlert]:
+        statement = (
+            select(
+                DatabaseAttendanceAlert,
+                Lesson.name,
+                DatabaseUser.language_code,
+            )
+            .join(Lesson, Lesson.code == DatabaseAttendanceAlert.lesson_code)
+            .join(DatabaseUser, DatabaseUser.id == DatabaseAttendanceAlert.user_id)
+            .where(DatabaseAttendanceAlert.sent_at.is_(None))
+            .order_by(DatabaseAttendanceAlert.id)
+            .limit(limit)
+        )
+        if shard_count > 1:
+            statement = statement.where(
+                DatabaseAttendanceAlert.user_id % shard_count == shard_index,
+            )
+        result = await self.__session.execute(statement)
+        return [
+            AttendanceAlert(
+                id=alert.id,
+                user_id=alert.user_id,
+                lesson_code=alert.lesson_code,
+                lesson_name=lesson_name,
+                kind=AttendanceAlertKind(alert.kind),
+                remaining_skips=alert.remaining_skips,
+                skips_percentage=alert.skips_percentage,
+                language_code=language_code,
+            )
+            for alert, lesson_name, language_code in result.tuples()
+        ]
+
+    async def mark_alerts_sent(
+        self,
+        alert_ids: Iterable[int],
+        sent_at: datetime.datetime,
+    ) -> None:
+        alert_ids = list(alert_ids)
+        if not alert_ids:
+            return
+        statement = (
+            update(DatabaseAttendanceAlert)
+            .where(DatabaseAttendanceAlert.id.in_(alert_ids))
+            .values(sent_at=sent_at)
+        )
+        await self.__session.execute(statement)
+        await self.__session.commit()
@@ -0,0 +1,38 @@
+from collections.abc import Iterable
+from typing import Protocol
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.obis import LessonAttendance, LessonAttendanceHistoryEntry
+from repositories.attendance_snapshot import AttendanceSnapshotRepository
+from repositories.lesson_attendance import LessonAttendanceRepository
+from setup.settings.storage import StorageSettings
+
+
+class AttendanceHistoryRepository(Protocol):
+
+    async def get_last_attendances(
+        self,
+        user_id: int,
+    ) -> dict[str, LessonAttendance]: ...
+
+    async def create_attendances(
+        self,
+        user_id: int,
+        attendances: Iterable[LessonAttendance],
+    ) -> None: ...
+
+    async def get_lesson_history(
+        self,
+        user_id: int,
+        lesson_code: str,
+    ) -> list[LessonAttendanceHistoryEntry]: ...
+
+
+def get_attendance_history_repository(
+    session: AsyncSession,
+    settings: StorageSettings,
+) -> AttendanceHistoryRepository:
+    if settings.attendance_mode == "snapshots":
+        return AttendanceSnapshotRepository(session, settings)
+    return LessonAttendanceRepository(session)
@@ -0,0 +1,168 @@
+from collections.abc import Iterable
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.engine import REPLICA_READ
+from db.models.attendance_snapshot import AttendanceSnapshot
+from db.models.lesson import Lesson
+from models.obis import LessonAttendance, LessonAttendanceHistoryEntry
+from services.attendance_snapshot import (
+    AttendanceState,
+    SnapshotKind,
+    compute_delta,
+    decode_snapshot,
+    encode_snapshot,
+    replay_snapshots,
+)
+from setup.settings.storage import StorageSettings
+
+
+class AttendanceSnapshotRepository:
+    """Attendance history stored as one encoded snapshot per user per sync.
+
+    Every ``snapshot_keyframe_interval``-th snapshot is a keyframe with the
+    full state, the rest are deltas against the previous snapshot, so the
+    current state is rebuilt from at most one keyframe and a bounded number
+    of deltas.
+    """
+
+    def __init__(self, session: AsyncSession, settings: StorageSettings):
+        self.__session = session
+        self.__settings = settings
+
+    async def __get_latest_chain(
+        self,
+        user_id: int,
+        *,
+        use_replica: bool,
+    ) -> list[bytes]:
+        last_keyframe_id = (
+            select(func.max(AttendanceSnapshot.id))
+            .where(
+                AttendanceSnapshot.user_id == user_id,
+                AttendanceSnapshot.is_keyframe.is_(True),
+            )
+            .scalar_subquery()
+        )
+        statement = (
+            select(AttendanceSnapshot.payload)
+            .where(
+                AttendanceSnapshot.user_id == user_id,
+                AttendanceSnapshot.id >= last_keyframe_id,
+            )
+            .order_by(AttendanceSnapshot.id)
+        )
+        result = await self.__session.scalars(
+            statement,
+            bind_arguments=REPLICA_READ if use_replica else None,
+        )
+        return list(result.all())
+
+    async def __get_latest_state(
+        self,
+        user_id: int,
+        *,
+        use_replica: bool = False,
+    ) -> tuple[AttendanceState, int]:
+        payloads = await self.__get_latest_chain(
+            user_id,
+            use_replica=use_replica,
+        )
+        return replay_snapshots(payloads), len(payloads)
+
+    async def get_last_attendances(
+        self,
+        user_id: int,
+    ) -> dict[str, LessonAttendance]:
+        state, _ = await self.__get_latest_state(user_id, use_replica=True)
+        if not state:
+            return {}
+        statement = select(Lesson.code, Lesson.name).where(
+            Lesson.code.in_(state.keys()),
+        )
+        result = await self.__session.execute(
+            statement,
+            bind_arguments=REPLICA_READ,
+        )
+        lesson_names = dict(result.tuples().all())
+        return {
+            lesson_code: LessonAttendance(
+                user_id=user_id,
+                lesson_name=lesson_names.get(lesson_code, lesson_code),
+                lesson_code=lesson_code,
+                theory_skips_percentage=theory_skips_percentage,
+                practice_skips_percentage=practice_skips_percentage,
+            )
+            for lesson_code, (
+                theory_skips_percentage,
+                practice_skips_percentage,
+            ) in state.items()
+        }
+
+    async def create_attendances(
+        self,
+        user_id: int,
+        attendances: Iterable[LessonAttendance],
+    ) -> None:
+        # the delta has to be against the latest snapshot, not the replica's
+        previous_state, chain_length = await self.__get_latest_state(user_id)
+        current_state = dict(previous_state)
+        for attendance in attendances:
+            current_state[attendance.lesson_code] = (
+                attendance.theory_skips_percentage,
+                attendance.practice_skips_percentage,
+            )
+
+        is_keyframe = (
+            chain_length == 0
+            or chain_length >= self.__settings.snapshot_keyframe_interval
+        )
+        if is_keyframe:
+            payload = encode_snapshot(SnapshotKind.KEYFRAME, current_state)
+        else:
+            delta = compute_delta(previous_state, current_state)
+            if not delta:
+                return
+            payload = encode_snapshot(SnapshotKind.DELTA, delta)
+
+        self.__session.add(
+            AttendanceSnapshot(
+                user_id=user_id,
+                is_keyframe=is_keyframe,
+                payload=payload,
+            ),
+        )
+        await self.__session.commit()
+
+    async def get_lesson_history(
+        self,
+        user_id: int,
+        lesson_code: str,
+    ) -> list[LessonAttendanceHistoryEntry]:
+        statement = (
+            select(AttendanceSnapshot.payload, AttendanceSnapshot.created_at)
+            .where(AttendanceSnapshot.user_id == user_id)
+            .order_by(AttendanceSnapshot.id)
+        )
+        result = await self.__session.execute(statement)
+
+        history: list[LessonAttendanceHistoryEntry] = []
+        previous_percentages = None
+        for payload, created_at in result:
+            _, entries = decode_snapshot(payload)
+            if lesson_code not in entries:
+                continue
+            percentages = entries[lesson_code]
+            if percentages is None or percentages == previous_percentages:
+                continue
+            previous_percentages = percentages
+            theory_skips_percentage, practice_skips_percentage = percentages
+            history.append(
+                LessonAttendanceHistoryEntry(
+                    theory_skips_percentage=theory_skips_percentage,
+                    practice_skips_percentage=practice_skips_percentage,
+                    created_at=created_at,
+                ),
+            )
+        return history
@@ -0,0 +1,32 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.dialect import upsert
+from db.models.exam import Exam
+
+
+class ExamRepository:
+
+    def __init__(self, session: AsyncSession):
+        self.__session = session
+
+    async def get_exam_id(self, lesson_code: str, name: str) -> int | None:
+        statement = select(Exam.id).where(
+            Exam.lesson_code == lesson_code,
+            Exam.name == name,
+        )
+        return await self.__session.scalar(statement)
+
+    async def create_exam(self, lesson_code: str, name: str) -> int:
+        statement = (
+            upsert(self.__session, Exam)
+            .values(lesson_code=lesson_code, name=name)
+            .on_conflict_do_nothing(index_elements=[Exam.lesson_code, Exam.name])
+            .returning(Exam.id)
+        )
+        exam_id = await self.__session.scalar(statement)
+        await self.__session.commit()
+        if exam_id is None:
+            # created concurrently, nothing is returned on conflict
+            exam_id = await self.get_exam_id(lesson_code, name)
+        return exam_id
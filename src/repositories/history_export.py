@@ -0,0 +1,92 @@
+from collections.abc import AsyncIterator, Sequence
+
+from sqlalchemy import Row, Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.engine import REPLICA_READ
+from db.models.exam import Exam
+from db.models.lesson_attendance import LessonAttendance
+from db.models.lesson_grade import LessonGrade
+from models.history_export import HistoryExportFilters, HistoryTable
+
+
+def build_attendance_statement(filters: HistoryExportFilters) -> Select:
+    statement = select(
+        LessonAttendance.id,
+        LessonAttendance.user_id,
+        LessonAttendance.lesson_code,
+        LessonAttendance.theory_skips_percentage,
+        LessonAttendance.practice_skips_percentage,
+        LessonAttendance.created_at,
+    )
+    if filters.lesson_code is not None:
+        statement = statement.where(
+            LessonAttendance.lesson_code == filters.lesson_code,
+        )
+    return apply_common_filters(statement, LessonAttendance, filters)
+
+
+def build_grades_statement(filters: HistoryExportFilters) -> Select:
+    statement = select(
+        LessonGrade.id,
+        LessonGrade.user_id,
+        LessonGrade.exam_id,
+        Exam.lesson_code,
+        Exam.name.label("exam_name"),
+        LessonGrade.score,
+        LessonGrade.score_status,
+        LessonGrade.score_value,
+        LessonGrade.created_at,
+    ).join(Exam, Exam.id == LessonGrade.exam_id)
+    if filters.lesson_code is not None:
+        statement = statement.where(Exam.lesson_code == filters.lesson_code)
+    return apply_common_filters(statement, LessonGrade, filters)
+
+
+def apply_common_filters(
+    statement: Select,
+    model: type[LessonAttendance] | type[LessonGrade],
+    filters: HistoryExportFilters,
+) -> Select:
+    if filters.since is not None:
+        statement = statement.where(model.created_at >= filters.since)
+    if filters.until is not None:
+        statement = statement.where(model.created_at < filters.until)
+    if filters.user_id is not None:
+        statement = statement.where(model.user_id == filters.user_id)
+    # created_at first, so a date range only touches its partitions
+    return statement.order_by(model.created_at, model.id)
+
+
+STATEMENT_BUILDERS = {
+    HistoryTable.ATTENDANCE: build_attendance_statement,
+    HistoryTable.GRADES: build_grades_statement,
+}
+
+
+class HistoryExportRepository:
+
+    def __init__(self, session: AsyncSession):
+        self.__session = session
+
+    async def stream_rows(
+        self,
+        table: HistoryTable,
+        filters: HistoryExportFilters,
+        *,
+        batch_size: int,
+    ) -> AsyncIterator[Sequence[Row]]:
+        """Rows in batches of ``batch_size``, read through a server-side
+        cursor so only one batch is held in memory at a time."""
+        statement = STATEMENT_BUILDERS[table](filters).execution_options(
+            yield_per=batch_size,
+        )
+        result = await self.__session.stream(
+            statement,
+            bind_arguments=REPLICA_READ,
+        )
+        try:
+            async for partition in result.partitions():
+                yield partition
+        finally:
+            await result.close()
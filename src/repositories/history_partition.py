@@ -0,0 +1,236 @@
+import datetime
+import re
+from typing import Final, Literal
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.dialect import get_dialect_name
+
+type HistoryTableName = Literal["lessons_attendance", "lesson_grades"]
+
+HISTORY_TABLE_NAMES: Final[tuple[HistoryTableName, ...]] = (
+    "lessons_attendance",
+    "lesson_grades",
+)
+PARTITION_NAME_PATTERN: Final = re.compile(r"_p(?P<year>\d{4})(?P<month>\d{2})$")
+
+ATTENDANCE_ROLLUP_STATEMENT: Final[str] = """
+INSERT INTO attendance_semester_summaries AS summary (
+    user_id,
+    lesson_code,
+    semester,
+    last_theory_skips_percentage,
+    last_practice_skips_percentage,
+    max_theory_skips_percentage,
+    max_practice_skips_percentage,
+    changes_count,
+    first_created_at,
+    last_created_at
+)
+SELECT
+    user_id,
+    lesson_code,
+    :semester,
+    (array_agg(theory_skips_percentage ORDER BY created_at DESC, id DESC))[1],
+    (array_agg(practice_skips_percentage ORDER BY created_at DESC, id DESC))[1],
+    max(theory_skips_percentage),
+    max(practice_skips_percentage),
+    count(*),
+    min(created_at),
+    max(created_at)
+FROM {partition_name}
+GROUP BY user_id, lesson_code
+ON CONFLICT (user_id, lesson_code, semester) DO UPDATE SET
+    last_theory_skips_percentage = CASE
+        WHEN excluded.last_created_at >= summary.last_created_at
+        THEN excluded.last_theory_skips_percentage
+        ELSE summary.last_theory_skips_percentage
+    END,
+    last_practice_skips_percentage = CASE
+        WHEN excluded.last_created_at >= summary.last_created_at
+        THEN excluded.last_practice_skips_percentage
+        ELSE summary.last_practice_skips_percentage
+    END,
+    max_theory_skips_percentage = greatest(
+        summary.max_theory_skips_percentage,
+        excluded.max_theory_skips_percentage
+    ),
+    max_practice_skips_percentage = greatest(
+        summary.max_practice_skips_percentage,
+        excluded.max_practice_skips_percentage
+    ),
+    changes_count = summary.changes_count + excluded.changes_count,
+    first_created_at = least(summary.first_created_at, excluded.first_created_at),
+    last_created_at = greatest(summary.last_created_at, excluded.last_created_at)
+"""
+
+GRADE_ROLLUP_STATEMENT: Final[str] = """
+INSERT INTO grade_semester_summaries AS summary (
+    user_id,
+    exam_id,
+    semester,
+    last_score,
+    last_score_status,
+    last_score_value,
+    changes_count,
+    last_created_at
+)
+SELECT
+    user_id,
+    exam_id,
+    :semester,
+    (array_agg(score ORDER BY created_at DESC, id DESC))[1],
+    (array_agg(score_status ORDER BY created_at DESC, id DESC))[1],
+    (array_agg(score_value ORDER BY created_at DESC, id DESC))[1],
+    count(*),
+    max(created_at)
+FROM {partition_name}
+GROUP BY user_id, exam_id
+ON CONFLICT (user_id, exam_id, semester) DO UPDATE SET
+    last_score = CASE
+        WHEN excluded.last_created_at >= summary.last_created_at
+        THEN excluded.last_score
+        ELSE summary.last_score
+    END,
+    last_score_status = CASE
+        WHEN excluded.last_created_at >= summary.last_created_at
+        THEN excluded.last_score_status
+        ELSE summary.last_score_status
+    END,
+    last_score_value = CASE
+        WHEN excluded.last_created_at >= summary.last_created_at
+        THEN excluded.last_score_value
+        ELSE summary.last_score_value
+    END,
+    changes_count = summary.changes_count + excluded.changes_count,
+    last_created_at = greatest(summary.last_created_at, excluded.last_created_at)
+"""
+
+ROLLUP_STATEMENTS: Final[dict[HistoryTableName, str]] = {
+    "lessons_attendance": ATTENDANCE_ROLLUP_STATEMENT,
+    "lesson_grades": GRADE_ROLLUP_STATEMENT,
+}
+
+
+def add_months(month_start: datetime.date, months: int) -> datetime.date:
+    month_index = month_start.year * 12 + month_start.month - 1 + months
+    return datetime.date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def get_partition_name(
+    table_name: HistoryTableName,
+    month_start: datetime.date,
+) -> str:
+    return f"{table_name}_p{month_start:%Y%m}"
+
+
+class HistoryPartitionRepository:
+    """Monthly range partitions of the append-only history tables.
+
+    Postgres only; ``is_supported`` is false on other dialects.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.__session = session
+
+    @property
+    def is_supported(self) -> bool:
+        return get_dialect_name(self.__session) == "postgresql"
+
+    async def get_partition_months(
+        self,
+        table_name: HistoryTableName,
+    ) -> list[datetime.date]:
+        statement = text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :table_name"
+        )
+        result = await self.__session.scalars(
+            statement,
+            {"table_name": table_name},
+        )
+        months: list[datetime.date] = []
+        for partition_name in result:
+            match = PARTITION_NAME_PATTERN.search(partition_name)
+            if match is not None:
+                months.append(
+                    datetime.date(
+                        int(match["year"]),
+                        int(match["month"]),
+                        1,
+                    ),
+                )
+        return sorted(months)
+
+    async def create_partition(
+        self,
+        table_name: HistoryTableName,
+        month_start: datetime.date,
+    ) -> None:
+        """Rows of the month that were saved to the default partition
+        before it existed are moved to it, Postgres refuses to create a
+        partition whose rows are in the default one."""
+        partition_name = get_partition_name(table_name, month_start)
+        next_month_start = add_months(month_start, 1)
+        is_existing = await self.__session.scalar(
+            text("SELECT to_regclass(:partition_name) IS NOT NULL"),
+            {"partition_name": partition_name},
+        )
+        if is_existing:
+            return
+        default_partition_name = f"{table_name}_default"
+        # new rows of the month would land in the default partition again
+        # until the new one is attached, reads go on
+        await self.__session.execute(
+            text(f"LOCK TABLE {default_partition_name} IN EXCLUSIVE MODE"),
+        )
+        await self.__session.execute(
+            text(
+                f"CREATE TABLE {partition_name} (LIKE {table_name} "
+                f"INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+            ),
+        )
+        await self.__session.execute(
+            text(
+                f"WITH moved AS ("
+                f"DELETE FROM {default_partition_name} "
+                f"WHERE created_at >= :month_start "
+                f"AND created_at < :next_month_start "
+                f"RETURNING *"
+                f") INSERT INTO {partition_name} SELECT * FROM moved"
+            ),
+            {
+                "month_start": month_start,
+                "next_month_start": next_month_start,
+            },
+        )
+        await self.__session.execute(
+            text(
+                f"ALTER TABLE {table_name} ATTACH PARTITION {partition_name} "
+                f"FOR VALUES FROM ('{month_start}') TO ('{next_month_start}')"
+            ),
+        )
+        await self.__session.commit()
+
+    async def roll_up_and_drop_partition(
+        self,
+        table_name: HistoryTableName,
+        month_start: datetime.date,
+        semester: str,
+    ) -> None:
+        partition_name = get_partition_name(table_name, month_start)
+        rollup_statement = ROLLUP_STATEMENTS[table_name].format(
+            partition_name=partition_name,
+        )
+        await self.__session.execute(
+            text(rollup_statement),
+            {"semester": semester},
+        )
+        await self.__session.execute(
+            text(f"ALTER TABLE {table_name} DETACH PARTITION {partition_name}"),
+        )
+        await self.__session.execute(text(f"DROP TABLE {partition_name}"))
+        await self.__session.commit()
@@ -1,6 +1,6 @@
-from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from db.dialect import upsert
 from db.models.lesson import Lesson
 
 
@@ -11,7 +11,7 @@ class LessonRepository:
 
     async def create_lesson(self, code: str, name: str) -> None:
         statement = (
-            insert(Lesson)
+            upsert(self.__session, Lesson)
             .values(code=code, name=name)
             .on_conflict_do_nothing()
         )
@@ -1,18 +1,44 @@
-from sqlalchemy import select
+from collections.abc import Iterable
+
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
 
+from db.dialect import upsert
+from db.engine import REPLICA_READ
+from db.models.lesson import Lesson
 from db.models.lesson_attendance import (
+    LatestLessonAttendance,
     LessonAttendance as DatabaseLessonAttendance,
 )
-from models.obis import LessonAttendance
+from models.obis import LessonAttendance, LessonAttendanceHistoryEntry
 
 
 class LessonAttendanceRepository:
+    """Attendance history, one row per lesson per change, and the latest
+    row of every lesson, which the last attendance is read from."""
 
     def __init__(self, session: AsyncSession):
         self.__session = session
 
+    async def __update_latest(self, values: list[dict]) -> None:
+        statement = upsert(self.__session, LatestLessonAttendance).values(
+            values,
+        )
+        await self.__session.execute(
+            statement.on_conflict_do_update(
+                index_elements=["user_id", "lesson_code"],
+                set_={
+                    "theory_skips_percentage": (
+                        statement.excluded.theory_skips_percentage
+                    ),
+                    "practice_skips_percentage": (
+                        statement.excluded.practice_skips_percentage
+                    ),
+                    "created_at": func.now(),
+                },
+            ),
+        )
+
     async def create_attendance(
         self,
         *,
@@ -21,13 +47,40 @@ class LessonAttendanceRepository:
         theory_skips_percentage: float,
         practice_skips_percentage: float,
     ) -> None:
-        attendance = DatabaseLessonAttendance(
-            lesson_code=lesson_code,
-            user_id=user_id,
-            theory_skips_percentage=theory_skips_percentage,
-            practice_skips_percentage=practice_skips_percentage,
+        values = {
+            "lesson_code": lesson_code,
+            "user_id": user_id,
+            "theory_skips_percentage": theory_skips_percentage,
+            "practice_skips_percentage": practice_skips_percentage,
+        }
+        self.__session.add(DatabaseLessonAttendance(**values))
+        await self.__update_latest([values])
+        await self.__session.commit()
+
+    async def create_attendances(
+        self,
+        user_id: int,
+        attendances: Iterable[LessonAttendance],
+    ) -> None:
+        # one value per lesson, a lesson can't be updated twice in one
+        # upsert
+        values = list({
+            attendance.lesson_code: {
+                "lesson_code": attendance.lesson_code,
+                "user_id": user_id,
+                "theory_skips_percentage": attendance.theory_skips_percentage,
+                "practice_skips_percentage": (
+                    attendance.practice_skips_percentage
+                ),
+            }
+            for attendance in attendances
+        }.values())
+        if not values:
+            return
+        self.__session.add_all(
+            DatabaseLessonAttendance(**value) for value in values
         )
-        self.__session.add(attendance)
+        await self.__update_latest(values)
         await self.__session.commit()
 
     async def get_last_attendance(
@@ -36,23 +89,87 @@ class LessonAttendanceRepository:
         user_id: int,
     ) -> LessonAttendance | None:
         statement = (
-            select(DatabaseLessonAttendance)
+            select(
+                LatestLessonAttendance.theory_skips_percentage,
+                LatestLessonAttendance.practice_skips_percentage,
+                Lesson.name,
+            )
+            .join(Lesson, Lesson.code == LatestLessonAttendance.lesson_code)
             .where(
-                DatabaseLessonAttendance.lesson_code == lesson_code,
-                DatabaseLessonAttendance.user_id == user_id,
+                LatestLessonAttendance.lesson_code == lesson_code,
+                LatestLessonAttendance.user_id == user_id,
             )
-            .options(joinedload(DatabaseLessonAttendance.lesson))
-            .order_by(DatabaseLessonAttendance.created_at.desc())
-            .limit(1)
         )
-        result = await self.__session.execute(statement)
-        attendance = result.scalar_one_or_none()
-        if attendance is None:
+        result = await self.__session.execute(
+            statement,
+            bind_arguments=REPLICA_READ,
+        )
+        row = result.one_or_none()
+        if row is None:
             return None
         return LessonAttendance(
-            user_id=attendance.user_id,
-            lesson_name=attendance.lesson.name,
-            lesson_code=attendance.lesson_code,
-            theory_skips_percentage=attendance.theory_skips_percentage,
-            practice_skips_percentage=attendance.practice_skips_percentage,
+            user_id=user_id,
+            lesson_name=row.name,
+            lesson_code=lesson_code,
+            theory_skips_percentage=row.theory_skips_percentage,
+            practice_skips_percentage=row.practice_skips_percentage,
+        )
+
+    async def get_last_attendances(
+        self,
+        user_id: int,
+    ) -> dict[str, LessonAttendance]:
+        statement = (
+            select(
+                LatestLessonAttendance.lesson_code,
+                Lesson.name,
+                LatestLessonAttendance.theory_skips_percentage,
+                LatestLessonAttendance.practice_skips_percentage,
+            )
+            .join(Lesson, Lesson.code == LatestLessonAttendance.lesson_code)
+            .where(LatestLessonAttendance.user_id == user_id)
+        )
+        result = await self.__session.execute(
+            statement,
+            bind_arguments=REPLICA_READ,
+        )
+        return {
+            row.lesson_code: LessonAttendance(
+                user_id=user_id,
+                lesson_name=row.name,
+                lesson_code=row.lesson_code,
+                theory_skips_percentage=row.theory_skips_percentage,
+                practice_skips_percentage=row.practice_skips_percentage,
+            )
+            for row in result
+        }
+
+    async def get_lesson_history(
+        self,
+        user_id: int,
+        lesson_code: str,
+    ) -> list[LessonAttendanceHistoryEntry]:
+        statement = (
+            select(
+                DatabaseLessonAttendance.theory_skips_percentage,
+                DatabaseLessonAttendance.practice_skips_percentage,
+                DatabaseLessonAttendance.created_at,
+            )
+            .where(
+                DatabaseLessonAttendance.user_id == user_id,
+                DatabaseLessonAttendance.lesson_code == lesson_code,
+            )
+            .order_by(
+                DatabaseLessonAttendance.created_at,
+                DatabaseLessonAttendance.id,
+            )
         )
+        result = await self.__session.execute(statement)
+        return [
+            LessonAttendanceHistoryEntry(
+                theory_skips_percentage=row.theory_skips_percentage,
+                practice_skips_percentage=row.practice_skips_percentage,
+                created_at=row.created_at,
+            )
+            for row in result
+        ]
@@ -1,11 +1,21 @@
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from db.models.lesson_grade import LessonGrade as DatabaseLessonGrade
-from models.lesson_grade import LessonGrade
+from db.dialect import upsert
+from db.engine import REPLICA_READ
+from db.models.exam import Exam
+from db.models.lesson import Lesson
+from db.models.lesson_grade import (
+    LatestLessonGrade,
+    LessonGrade as DatabaseLessonGrade,
+)
+from models.lesson_grade import ExamGrade, LessonGrade
+from models.score import parse_score
 
 
 class LessonGradeRepository:
+    """Grade history, one row per exam per change, and the latest row of
+    every exam, which the last grades are read from."""
 
     def __init__(self, session: AsyncSession):
         self.__session = session
@@ -13,43 +23,82 @@ class LessonGradeRepository:
     async def create_grade(
         self,
         user_id: int,
-        lesson_code: str,
-        exam_name: str,
+        exam_id: int,
         score: str | None,
     ) -> None:
-        grade = DatabaseLessonGrade(
-            user_id=user_id,
-            lesson_code=lesson_code,
-            exam_name=exam_name,
-            score=score,
+        parsed_score = parse_score(score)
+        values = {
+            "user_id": user_id,
+            "exam_id": exam_id,
+            "score": score,
+            "score_status": parsed_score.status,
+            "score_value": parsed_score.value,
+        }
+        self.__session.add(DatabaseLessonGrade(**values))
+        statement = upsert(self.__session, LatestLessonGrade).values(values)
+        await self.__session.execute(
+            statement.on_conflict_do_update(
+                index_elements=["user_id", "exam_id"],
+                set_={
+                    "score": statement.excluded.score,
+                    "score_status": statement.excluded.score_status,
+                    "score_value": statement.excluded.score_value,
+                    "created_at": func.now(),
+                },
+            ),
         )
-        self.__session.add(grade)
         await self.__session.commit()
 
     async def get_last_grade(
         self,
-        lesson_code: str,
         user_id: int,
-        exam_name: str,
+        exam_id: int,
     ) -> LessonGrade | None:
-        statement = (
-            select(DatabaseLessonGrade)
-            .where(
-                DatabaseLessonGrade.lesson_code == lesson_code,
-                DatabaseLessonGrade.user_id == user_id,
-                DatabaseLessonGrade.exam_name == exam_name,
-            )
-            .order_by(DatabaseLessonGrade.created_at.desc())
-            .limit(1)
+        statement = select(LatestLessonGrade).where(
+            LatestLessonGrade.user_id == user_id,
+            LatestLessonGrade.exam_id == exam_id,
+        )
+        result = await self.__session.scalar(
+            statement,
+            bind_arguments=REPLICA_READ,
         )
-        result = await self.__session.scalar(statement)
         if result is None:
             return None
         return LessonGrade(
-            id=result.id,
             user_id=result.user_id,
-            lesson_code=result.lesson_code,
-            exam_name=result.exam_name,
+            exam_id=result.exam_id,
             score=result.score,
             created_at=result.created_at,
         )
+
+    async def get_last_grades(self, user_id: int) -> list[ExamGrade]:
+        statement = (
+            select(
+                LatestLessonGrade.exam_id,
+                Exam.lesson_code,
+                Lesson.name,
+                Exam.name,
+                LatestLessonGrade.score,
+                LatestLessonGrade.score_value,
+            )
+            .join(Exam, Exam.id == LatestLessonGrade.exam_id)
+            .join(Lesson, Lesson.code == Exam.lesson_code)
+            .where(LatestLessonGrade.user_id == user_id)
+            .order_by(Exam.lesson_code, Exam.id)
+        )
+        result = await self.__session.execute(
+            statement,
+            bind_arguments=REPLICA_READ,
+        )
+        return [
+            ExamGrade(
+                exam_id=exam_id,
+                lesson_code=lesson_code,
+                lesson_name=lesson_name,
+                exam_name=exam_name,
+                score=score,
+                score_value=score_value,
+            )
+            for exam_id, lesson_code, lesson_name, exam_name, score, score_value
+            in result.tuples()
+        ]
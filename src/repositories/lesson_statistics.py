@@ -0,0 +1,230 @@
+from collections.abc import Iterable
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.dialect import upsert
+from db.engine import REPLICA_READ
+from db.models.lesson_statistics import (
+    AttendanceHistogramBucket,
+    ExamHistogramBucket,
+)
+from models.lesson_statistics import (
+    BUCKETS_COUNT,
+    AttendanceKind,
+    Histogram,
+    HistogramDeltas,
+)
+
+
+type AttendanceBucketKey = tuple[str, AttendanceKind, int]
+type ExamBucketKey = tuple[int, int]
+
+
+def build_histogram(buckets: Iterable[tuple[int, int, float]]) -> Histogram:
+    students_counts = [0] * BUCKETS_COUNT
+    values_sum = 0.0
+    for bucket, students_count, bucket_values_sum in buckets:
+        students_counts[bucket] = students_count
+        values_sum += bucket_values_sum
+    return Histogram(tuple(students_counts), values_sum)
+
+
+class LessonStatisticsRepository:
+    """Histogram buckets of the latest values per lesson and exam.
+
+    Buckets are changed by adding deltas in the database, so workers
+    syncing different users of the same lesson don't overwrite each
+    other. The deltas aren't committed here but together with the history
+    rows they describe.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.__session = session
+
+    async def add_attendance_deltas(
+        self,
+        deltas: HistogramDeltas[AttendanceBucketKey],
+    ) -> None:
+        if not deltas:
+            return
+        # sorted, so concurrent transactions lock the rows in one order
+        # and can't deadlock
+        values = [
+            {
+                "lesson_code": lesson_code,
+                "kind": kind,
+                "bucket": bucket,
+                "students_count": students_count,
+                "values_sum": values_sum,
+            }
+            for (lesson_code, kind, bucket), (students_count, values_sum)
+            in sorted(deltas.items())
+        ]
+        statement = upsert(self.__session, AttendanceHistogramBucket).values(
+            values,
+        )
+        await self.__session.execute(
+            statement.on_conflict_do_update(
+                index_elements=["lesson_code", "kind", "bucket"],
+                set_={
+                    "students_count": (
+                        AttendanceHistogramBucket.students_count
+                        + statement.excluded.students_count
+                    ),
+                    "values_sum": (
+                        AttendanceHistogramBucket.values_sum
+                        + statement.excluded.values_sum
+                    ),
+                },
+            ),
+        )
+
+    async def add_exam_deltas(
+        self,
+        deltas: HistogramDeltas[ExamBucketKey],
+    ) -> None:
+        if not deltas:
+            return
+        values = [
+            {
+                "exam_id": exam_id,
+                "bucket": bucket,
+                "students_count": students_count,
+                "values_sum": values_sum,
+            }
+            for (exam_id, bucket), (students_count, values_sum)
+            in sorted(deltas.items())
+        ]
+        statement = upsert(self.__session, ExamHistogramBucket).values(values)
+        await self.__session.execute(
+            statement.on_conflict_do_update(
+                index_elements=["exam_id", "bucket"],
+                set_={
+                    "students_count": (
+                        ExamHistogramBucket.students_count
+                        + statement.excluded.students_count
+                    ),
+                    "values_sum": (
+                        ExamHistogramBucket.values_sum
+                        + statement.excluded.values_sum
+                    ),
+                },
+            ),
+        )
+
+    async def get_attendance_histograms(
+        self,
+        lesson_codes: Iterable[str],
+    ) -> dict[tuple[str, AttendanceKind], Histogram]:
+        statement = select(
+            AttendanceHistogramBucket.lesson_code,
+            AttendanceHistogramBucket.kind,
+            AttendanceHistogramBucket.bucket,
+            AttendanceHistogramBucket.students_count,
+            AttendanceHistogramBucket.values_sum,
+        ).where(AttendanceHistogramBucket.lesson_code.in_(list(lesson_codes)))
+        result = await self.__session.execute(
+            statement,
+            bind_arguments=REPLICA_READ,
+        )
+        buckets: dict[tuple[str, AttendanceKind], list] = {}
+        for lesson_code, kind, *bucket in result.tuples():
+            buckets.setdefault((lesson_code, AttendanceKind(kind)), []).append(
+                bucket,
+            )
+        return {key: build_histogram(value) for key, value in buckets.items()}
+
+    async def get_exam_histograms(
+        self,
+        exam_ids: Iterable[int],
+    ) -> dict[int, Histogram]:
+        statement = select(
+            ExamHistogramBucket.exam_id,
+            ExamHistogramBucket.bucket,
+            ExamHistogramBucket.students_count,
+            ExamHistogramBucket.values_sum,
+        ).where(ExamHistogramBucket.exam_id.in_(list(exam_ids)))
+        result = await self.__session.execute(
+            statement,
+            bind_arguments=REPLICA_READ,
+        )
+        buckets: dict[int, list] = {}
+        for exam_id, *bucket in result.tuples():
+            buckets.setdefault(exam_id, []).append(bucket)
+        return {key: build_histogram(value) for key, value in buckets.items()}
+
+    async def get_all_attendance_buckets(
+        self,
+    ) -> HistogramDeltas[AttendanceBucketKey]:
+        result = await self.__session.execute(
+            select(
+                AttendanceHistogramBucket.lesson_code,
+                AttendanceHistogramBucket.kind,
+                AttendanceHistogramBucket.bucket,
+                AttendanceHistogramBucket.students_count,
+                AttendanceHistogramBucket.values_sum,
+            ),
+        )
+        return {
+            (lesson_code, AttendanceKind(kind), bucket): (
+                students_count,
+                values_sum,
+            )
+            for lesson_code, kind, bucket, students_count, values_sum
+            in result.tuples()
+        }
+
+    async def get_all_exam_buckets(self) -> HistogramDeltas[ExamBucketKey]:
+        result = await self.__session.execute(
+            select(
+                ExamHistogramBucket.exam_id,
+                ExamHistogramBucket.bucket,
+                ExamHistogramBucket.students_count,
+                ExamHistogramBucket.values_sum,
+            ),
+        )
+        return {
+            (exam_id, bucket): (students_count, values_sum)
+            for exam_id, bucket, students_count, values_sum in result.tuples()
+        }
+
+    async def replace_buckets(
+        self,
+        attendance_buckets: HistogramDeltas[AttendanceBucketKey],
+        exam_buckets: HistogramDeltas[ExamBucketKey],
+    ) -> None:
+        await self.__session.execute(delete(AttendanceHistogramBucket))
+        await self.__session.execute(delete(ExamHistogramBucket))
+        if attendance_buckets:
+            await self.__session.execute(
+                insert(AttendanceHistogramBucket),
+                [
+                    {
+                        "lesson_code": lesson_code,
+                        "kind": kind,
+                        "bucket": bucket,
+                        "students_count": students_count,
+                        "values_sum": values_sum,
+                    }
+                    for (lesson_code, kind, bucket), (
+                        students_count,
+                        values_sum,
+                    ) in attendance_buckets.items()
+                ],
+            )
+        if exam_buckets:
+            await self.__session.execute(
+                insert(ExamHistogramBucket),
+                [
+                    {
+                        "exam_id": exam_id,
+                        "bucket": bucket,
+                        "students_count": students_count,
+                        "values_sum": values_sum,
+                    }
+                    for (exam_id, bucket), (students_count, values_sum)
+                    in exam_buckets.items()
+                ],
+            )
+        await self.__session.commit()
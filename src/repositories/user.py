@@ -1,42 +1,88 @@
-from sqlalchemy import select
-from sqlalchemy.dialects.postgresql import insert
+import datetime
+
+from sqlalchemy import select, update, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from db.dialect import upsert
+from db.engine import REPLICA_READ
 from db.models.user import User as DatabaseUser
 from models.user import User
 
 
+def map_user(user: DatabaseUser) -> User:
+    return User(
+        id=user.id,
+        student_number=user.student_number,
+        encrypted_password=user.encrypted_password,
+        has_accepted_terms=user.has_accepted_terms,
+        auth_failures_count=user.auth_failures_count,
+        quarantined_until=user.quarantined_until,
+        is_quarantine_notified=user.is_quarantine_notified,
+        language_code=user.language_code,
+        is_dashboard_enabled=user.is_dashboard_enabled,
+        dashboard_message_id=user.dashboard_message_id,
+        dashboard_content_hash=user.dashboard_content_hash,
+        dashboard_updated_at=user.dashboard_updated_at,
+    )
+
+
 class UserRepository:
 
     def __init__(self, session: AsyncSession):
         self.__session = session
 
-    async def get_user_by_id(self, user_id: int) -> User | None:
-        user = await self.__session.get(DatabaseUser, user_id)
+    async def get_user_by_id(
+        self,
+        user_id: int,
+        *,
+        use_replica: bool = False,
+    ) -> User | None:
+        """``use_replica`` is for callers that can do with a lagging row,
+        never for one about to be updated."""
+        if use_replica:
+            user = await self.__session.scalar(
+                select(DatabaseUser).where(DatabaseUser.id == user_id),
+                bind_arguments=REPLICA_READ,
+            )
+        else:
+            user = await self.__session.get(DatabaseUser, user_id)
         if user is None:
             return None
-        return User(
-            id=user.id,
-            student_number=user.student_number,
-            encrypted_password=user.encrypted_password,
-            has_accepted_terms=user.has_accepted_terms,
-        )
+        return map_user(user)
 
     async def get_users(self) -> list[User]:
         statement = select(DatabaseUser)
-        result = await self.__session.scalars(statement)
-        return [
-            User(
-                id=user.id,
-                student_number=user.student_number,
-                encrypted_password=user.encrypted_password,
-                has_accepted_terms=user.has_accepted_terms,
+        result = await self.__session.scalars(
+            statement,
+            bind_arguments=REPLICA_READ,
+        )
+        return [map_user(user) for user in result.all()]
+
+    async def get_users_to_sync(
+        self,
+        now: datetime.datetime,
+        *,
+        shard_index: int = 0,
+        shard_count: int = 1,
+    ) -> list[User]:
+        statement = select(DatabaseUser).where(
+            or_(
+                DatabaseUser.quarantined_until.is_(None),
+                DatabaseUser.quarantined_until <= now,
+            ),
+        )
+        if shard_count > 1:
+            statement = statement.where(
+                DatabaseUser.id % shard_count == shard_index,
             )
-            for user in result.all()
-        ]
+        result = await self.__session.scalars(
+            statement,
+            bind_arguments=REPLICA_READ,
+        )
+        return [map_user(user) for user in result.all()]
 
     async def create_user(self, user_id: int) -> None:
-        statement = insert(DatabaseUser).values(
+        statement = upsert(self.__session, DatabaseUser).values(
             id=user_id,
             has_accepted_terms=True,
         ).on_conflict_do_nothing()
@@ -47,13 +93,19 @@ class UserRepository:
         user_id: int,
         student_number: str,
         encrypted_password: str,
+        language_code: str | None = None,
     ) -> None:
         user = DatabaseUser(
             id=user_id,
             student_number=student_number,
             encrypted_password=encrypted_password,
             has_accepted_terms=True,
+            auth_failures_count=0,
+            quarantined_until=None,
+            is_quarantine_notified=False,
         )
+        if language_code is not None:
+            user.language_code = language_code
         await self.__session.merge(user)
         await self.__session.commit()
 
@@ -65,3 +117,86 @@ class UserRepository:
         if user is not None:
             user.has_accepted_terms = True
             await self.__session.commit()
+
+    async def update_language_code(
+        self,
+        user_id: int,
+        language_code: str,
+    ) -> None:
+        statement = (
+            update(DatabaseUser)
+            .where(DatabaseUser.id == user_id)
+            .values(language_code=language_code)
+        )
+        await self.__session.execute(statement)
+        await self.__session.commit()
+
+    async def update_dashboard(
+        self,
+        user_id: int,
+        *,
+        is_enabled: bool,
+        message_id: int | None,
+        content_hash: str | None,
+        updated_at: datetime.datetime | None,
+    ) -> None:
+        statement = (
+            update(DatabaseUser)
+            .where(DatabaseUser.id == user_id)
+            .values(
+                is_dashboard_enabled=is_enabled,
+                dashboard_message_id=message_id,
+                dashboard_content_hash=content_hash,
+                dashboard_updated_at=updated_at,
+            )
+        )
+        await self.__session.execute(statement)
+        await self.__session.commit()
+
+    async def add_auth_failure(self, user_id: int) -> int:
+        """Counts one more failure on the primary, whatever the caller's
+        copy of the user says, and returns the new count."""
+        statement = (
+            update(DatabaseUser)
+            .where(DatabaseUser.id == user_id)
+            .values(auth_failures_count=DatabaseUser.auth_failures_count + 1)
+            .returning(DatabaseUser.auth_failures_count)
+        )
+        auth_failures_count = await self.__session.scalar(statement)
+        await self.__session.commit()
+        return auth_failures_count
+
+    async def quarantine(
+        self,
+        user_id: int,
+        quarantined_until: datetime.datetime,
+    ) -> None:
+        statement = (
+            update(DatabaseUser)
+            .where(DatabaseUser.id == user_id)
+            .values(quarantined_until=quarantined_until)
+        )
+        await self.__session.execute(statement)
+        await self.__session.commit()
+
+    async def reset_auth_failures(self, user_id: int) -> None:
+        statement = (
+            update(DatabaseUser)
+            .where(DatabaseUser.id == user_id)
+            .values(
+                auth_failures_count=0,
+                quarantined_until=None,
+                is_quarantine_notified=False,
+            )
+        )
+        await self.__session.execute(statement)
+        await self.__session.commit()
+
+    async def mark_quarantine_notified(self, user_id: int) -> None:
+        statement = (
+            update(DatabaseUser)
+            .where(DatabaseUser.id == user_id)
+            .values(is_quarantine_notified=True)
+        )
+        await self.__session.execute(statement)
+        await self.__session.commit()
@@ -0,0 +1,127 @@
+import asyncio
+import functools
+import logging
+import signal
+import time
+from collections.abc import Awaitable, Callable, Collection, Coroutine
+from contextlib import suppress
+from typing import Any
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+
+logger = logging.getLogger(__name__)
+
+
+async def drain_tasks(
+    tasks: Collection[asyncio.Task],
+    timeout: float,
+) -> None:
+    """Waits for ``tasks`` to finish and cancels the ones still running
+    after ``timeout`` seconds."""
+    tasks = set(tasks)
+    if not tasks:
+        return
+    logger.info("Waiting for %s running tasks to finish", len(tasks))
+    _, pending = await asyncio.wait(tasks, timeout=timeout)
+    if not pending:
+        return
+    logger.warning("Cancelling %s tasks still running", len(pending))
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+
+
+class JobTracker:
+    """Remembers which scheduler jobs are running.
+
+    ``AsyncIOScheduler.shutdown`` cancels running coroutine jobs outright,
+    which would interrupt a sync pass halfway through a user; tracked jobs
+    can be waited for instead.
+    """
+
+    def __init__(self):
+        self.__tasks: set[asyncio.Task] = set()
+
+    def track(
+        self,
+        job: Callable[[], Awaitable[None]],
+    ) -> Callable[[], Awaitable[None]]:
+
+        @functools.wraps(job)
+        async def tracked_job() -> None:
+            task = asyncio.current_task()
+            self.__tasks.add(task)
+            try:
+                await job()
+            finally:
+                self.__tasks.discard(task)
+
+        return tracked_job
+
+    async def shutdown(
+        self,
+        scheduler: AsyncIOScheduler,
+        timeout: float,
+    ) -> None:
+        scheduler.pause()
+        await drain_tasks(self.__tasks, timeout)
+        scheduler.shutdown(wait=False)
+
+
+async def wait_for_stop_signal() -> None:
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        # Signal handlers are not supported on Windows, Ctrl+C still
+        # interrupts the process there.
+        with suppress(NotImplementedError):
+            loop.add_signal_handler(signal_number, stop_event.set)
+    try:
+        await stop_event.wait()
+    finally:
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            with suppress(NotImplementedError):
+                loop.remove_signal_handler(signal_number)
+
+
+class BackgroundTasks:
+    """Startup work that must not hold up serving updates.
+
+    Failures are logged instead of raised, none of this work is required
+    for the bot to answer.
+    """
+
+    def __init__(self):
+        self.__tasks: set[asyncio.Task] = set()
+
+    def start(
+        self,
+        coroutine: Coroutine[Any, Any, None],
+        name: str,
+    ) -> None:
+        task = asyncio.create_task(self.__run(coroutine, name), name=name)
+        self.__tasks.add(task)
+        task.add_done_callback(self.__tasks.discard)
+
+    async def __run(
+        self,
+        coroutine: Coroutine[Any, Any, None],
+        name: str,
+    ) -> None:
+        started_at = time.perf_counter()
+        try:
+            await coroutine
+        except Exception:
+            logger.exception("Background task %s failed", name)
+        else:
+            logger.debug(
+                "Background task %s finished in %.3fs",
+                name,
+                time.perf_counter() - started_at,
+            )
+
+    async def cancel(self) -> None:
+        for task in self.__tasks:
+            task.cancel()
+        await asyncio.gather(*self.__tasks, return_exceptions=True)
@@ -0,0 +1,72 @@
+import datetime
+import logging
+from collections.abc import Iterable
+
+from models.attendance_alert import AttendanceAlert
+from repositories.attendance_alert import AttendanceAlertRepository
+from services.history_retention import get_semester, get_semester_start
+from services.user import get_utc_now
+from setup.settings.skip_budget import SkipBudgetSettings
+
+
+log = logging.getLogger(__name__)
+
+
+class AttendanceAlertService:
+
+    def __init__(
+        self,
+        attendance_alert_repository: AttendanceAlertRepository,
+        skip_budget_settings: SkipBudgetSettings,
+    ):
+        self.__attendance_alert_repository = attendance_alert_repository
+        self.__skip_budget_settings = skip_budget_settings
+
+    def __get_semester_start(self, today: datetime.date) -> datetime.date:
+        semester_start = get_semester_start(today)
+        configured_semester_start = self.__skip_budget_settings.semester_start
+        # a configured start of a past semester is stale
+        if (
+            configured_semester_start is not None
+            and semester_start <= configured_semester_start <= today
+        ):
+            return configured_semester_start
+        return semester_start
+
+    async def enqueue_alerts(self) -> int:
+        """Alerts are evaluated over the attendance that changed during the
+        current semester, and deduplicated within it."""
+        if not self.__attendance_alert_repository.is_supported:
+            log.debug("Attendance alerts: not supported for snapshot storage")
+            return 0
+        now = get_utc_now()
+        today = now.date()
+        enqueued_count = await self.__attendance_alert_repository.enqueue_alerts(
+            semester=get_semester(today.replace(day=1)),
+            since=datetime.datetime.combine(
+                self.__get_semester_start(today),
+                datetime.time.min,
+            ),
+            now=now,
+        )
+        log.info("Attendance alerts: enqueued %s alerts", enqueued_count)
+        return enqueued_count
+
+    async def get_pending_alerts(
+        self,
+        limit: int,
+        *,
+        shard_index: int = 0,
+        shard_count: int = 1,
+    ) -> list[AttendanceAlert]:
+        return await self.__attendance_alert_repository.get_pending_alerts(
+            limit,
+            shard_index=shard_index,
+            shard_count=shard_count,
+        )
+
+    async def mark_alerts_sent(self, alert_ids: Iterable[int]) -> None:
+        await self.__attendance_alert_repository.mark_alerts_sent(
+            alert_ids,
+            get_utc_now(),
+        )
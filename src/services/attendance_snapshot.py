@@ -0,0 +1,157 @@
+"""Compact binary encoding of per-user attendance snapshots.
+
+A snapshot is a mapping of lesson code to the pair of theory and practice
+skip percentages. Keyframes carry the full state; deltas carry only lessons
+that changed since the previous snapshot, with removed lessons marked by a
+sentinel. Layout (little-endian)::
+
+    kind: u8 | count: u16 | count x (code length: u8, code: utf-8)
+    | count x (theory: f64, practice: f64)
+
+Percentages are stored as OBIS reported them, NaN standing for no data,
+so a decoded snapshot compares equal to the attendance it was made from.
+Snapshots written before that have the ``EXACT_FLAG`` bit of the kind
+unset and hold u16 percentages in hundredths, so ``6.25`` as ``625``.
+"""
+import enum
+import math
+import struct
+import sys
+from array import array
+from collections.abc import Iterable, Mapping
+
+type SkipsPercentages = tuple[float | None, float | None]
+type AttendanceState = dict[str, SkipsPercentages]
+type AttendanceStateDelta = dict[str, SkipsPercentages | None]
+
+
+class SnapshotKind(enum.IntEnum):
+    KEYFRAME = 0
+    DELTA = 1
+
+
+HEADER = struct.Struct("<BH")
+EXACT_FLAG = 0x80
+NULL_PERCENTAGE = math.nan
+# percentages are never negative
+REMOVED_PERCENTAGE = -1.0
+HUNDREDTHS_NULL_PERCENTAGE = 0xFFFF
+HUNDREDTHS_REMOVED_PERCENTAGE = 0xFFFE
+
+
+def pack_percentage(value: float | None) -> float:
+    if value is None:
+        return NULL_PERCENTAGE
+    return value
+
+
+def unpack_percentage(value: float) -> float | None:
+    if math.isnan(value):
+        return None
+    return value
+
+
+def unpack_hundredths_percentage(value: int) -> float | None:
+    if value == HUNDREDTHS_NULL_PERCENTAGE:
+        return None
+    return value / 100
+
+
+def encode_snapshot(
+    kind: SnapshotKind,
+    entries: Mapping[str, SkipsPercentages | None],
+) -> bytes:
+    codes = bytearray()
+    values = array("d")
+    for lesson_code, percentages in entries.items():
+        encoded_code = lesson_code.encode("utf-8")
+        codes.append(len(encoded_code))
+        codes += encoded_code
+        if percentages is None:
+            values.extend((REMOVED_PERCENTAGE, REMOVED_PERCENTAGE))
+        else:
+            theory, practice = percentages
+            values.extend((pack_percentage(theory), pack_percentage(practice)))
+    if sys.byteorder == "big":
+        values.byteswap()
+    return (
+        HEADER.pack(kind | EXACT_FLAG, len(entries))
+        + bytes(codes)
+        + values.tobytes()
+    )
+
+
+def decode_snapshot(
+    payload: bytes,
+) -> tuple[SnapshotKind, AttendanceStateDelta]:
+    flagged_kind, count = HEADER.unpack_from(payload)
+    is_exact = bool(flagged_kind & EXACT_FLAG)
+    kind = flagged_kind & ~EXACT_FLAG
+    offset = HEADER.size
+    codes: list[str] = []
+    for _ in range(count):
+        length = payload[offset]
+        offset += 1
+        codes.append(payload[offset:offset + length].decode("utf-8"))
+        offset += length
+    if is_exact:
+        values = array("d")
+        removed, unpack = REMOVED_PERCENTAGE, unpack_percentage
+    else:
+        values = array("H")
+        removed = HUNDREDTHS_REMOVED_PERCENTAGE
+        unpack = unpack_hundredths_percentage
+    values.frombytes(payload[offset:offset + count * 2 * values.itemsize])
+    if sys.byteorder == "big":
+        values.byteswap()
+
+    entries: AttendanceStateDelta = {}
+    for index, lesson_code in enumerate(codes):
+        theory, practice = values[index * 2], values[index * 2 + 1]
+        if theory == removed:
+            entries[lesson_code] = None
+        else:
+            entries[lesson_code] = (unpack(theory), unpack(practice))
+    return SnapshotKind(kind), entries
+
+
+def apply_snapshot(
+    state: AttendanceState,
+    kind: SnapshotKind,
+    entries: AttendanceStateDelta,
+) -> AttendanceState:
+    if kind == SnapshotKind.KEYFRAME:
+        return {
+            lesson_code: percentages
+            for lesson_code, percentages in entries.items()
+            if percentages is not None
+        }
+    new_state = dict(state)
+    for lesson_code, percentages in entries.items():
+        if percentages is None:
+            new_state.pop(lesson_code, None)
+        else:
+            new_state[lesson_code] = percentages
+    return new_state
+
+
+def compute_delta(
+    previous: AttendanceState,
+    current: AttendanceState,
+) -> AttendanceStateDelta:
+    delta: AttendanceStateDelta = {
+        lesson_code: percentages
+        for lesson_code, percentages in current.items()
+        if previous.get(lesson_code) != percentages
+    }
+    for lesson_code in previous.keys() - current.keys():
+        delta[lesson_code] = None
+    return delta
+
+
+def replay_snapshots(payloads: Iterable[bytes]) -> AttendanceState:
+    state: AttendanceState = {}
+    for payload in payloads:
+        kind, entries = decode_snapshot(payload)
+        state = apply_snapshot(state, kind, entries)
+    return state
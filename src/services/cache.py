@@ -0,0 +1,207 @@
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import AsyncGenerator
+from typing import Any, Protocol
+
+from setup.settings.cache import CacheSettings
+
+
+log = logging.getLogger(__name__)
+
+
+class Serializer(Protocol):
+
+    def dumps(self, value: Any) -> bytes: ...
+
+    def loads(self, data: bytes) -> Any: ...
+
+
+class JsonSerializer:
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, separators=(",", ":")).encode()
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonSerializer:
+
+    def __init__(self):
+        import orjson
+
+        self.__orjson = orjson
+
+    def dumps(self, value: Any) -> bytes:
+        return self.__orjson.dumps(value)
+
+    def loads(self, data: bytes) -> Any:
+        return self.__orjson.loads(data)
+
+
+class MsgpackSerializer:
+
+    def __init__(self):
+        import msgpack
+
+        self.__msgpack = msgpack
+
+    def dumps(self, value: Any) -> bytes:
+        return self.__msgpack.packb(value)
+
+    def loads(self, data: bytes) -> Any:
+        return self.__msgpack.unpackb(data)
+
+
+SERIALIZERS: dict[str, type[Serializer]] = {
+    "json": JsonSerializer,
+    "orjson": OrjsonSerializer,
+    "msgpack": MsgpackSerializer,
+}
+
+
+class Cache(ABC):
+    """Best effort key-value store for state that can be rebuilt.
+
+    Values are what JSON can represent: the Redis backend serializes them
+    and gives back lists for tuples. A backend that fails is treated as a
+    miss, callers fall back to the source of the value.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Any | None:
+        pass
+
+    @abstractmethod
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        *,
+        ttl: float | None = None,
+    ) -> None:
+        """``ttl`` in seconds, the backend's default when omitted."""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        pass
+
+
+class InMemoryCache(Cache):
+    """Entries of this process only, the least recently used one is
+    evicted once ``max_entries`` are stored."""
+
+    def __init__(self, max_entries: int, default_ttl: float):
+        self.__max_entries = max_entries
+        self.__default_ttl = default_ttl
+        # key -> (expires at, value), least recently used first
+        self.__entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    async def get(self, key: str) -> Any | None:
+        entry = self.__entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self.__entries[key]
+            return None
+        self.__entries.move_to_end(key)
+        return value
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        *,
+        ttl: float | None = None,
+    ) -> None:
+        expires_at = time.monotonic() + (
+            self.__default_ttl if ttl is None else ttl
+        )
+        self.__entries[key] = (expires_at, value)
+        self.__entries.move_to_end(key)
+        while len(self.__entries) > self.__max_entries:
+            self.__entries.popitem(last=False)
+
+    async def delete(self, key: str) -> None:
+        self.__entries.pop(key, None)
+
+
+class RedisCache(Cache):
+    """Entries shared by every process using the same Redis, or any
+    server speaking its protocol."""
+
+    def __init__(
+        self,
+        client: Any,
+        serializer: Serializer,
+        *,
+        key_prefix: str,
+        default_ttl: float,
+    ):
+        from redis.exceptions import RedisError
+
+        self.__client = client
+        self.__serializer = serializer
+        self.__key_prefix = key_prefix
+        self.__default_ttl = default_ttl
+        self.__errors = (RedisError, OSError)
+
+    async def get(self, key: str) -> Any | None:
+        try:
+            data = await self.__client.get(self.__key_prefix + key)
+        except self.__errors:
+            log.warning("Redis cache: could not get %s", key, exc_info=True)
+            return None
+        if data is None:
+            return None
+        return self.__serializer.loads(data)
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        *,
+        ttl: float | None = None,
+    ) -> None:
+        ttl = self.__default_ttl if ttl is None else ttl
+        try:
+            await self.__client.set(
+                self.__key_prefix + key,
+                self.__serializer.dumps(value),
+                px=max(int(ttl * 1000), 1),
+            )
+        except self.__errors:
+            log.warning("Redis cache: could not set %s", key, exc_info=True)
+
+    async def delete(self, key: str) -> None:
+        try:
+            await self.__client.delete(self.__key_prefix + key)
+        except self.__errors:
+            log.warning("Redis cache: could not delete %s", key, exc_info=True)
+
+
+async def get_cache(settings: CacheSettings) -> AsyncGenerator[Cache, None]:
+    if settings.backend == "memory":
+        yield InMemoryCache(settings.max_entries, settings.default_ttl)
+        return
+
+    # redis is an optional dependency, only needed for this backend
+    from redis.asyncio import Redis
+
+    client = Redis.from_url(settings.redis_url)
+    try:
+        yield RedisCache(
+            client,
+            SERIALIZERS[settings.serializer](),
+            key_prefix=settings.key_prefix,
+            default_ttl=settings.default_ttl,
+        )
+    finally:
+        await client.aclose()
@@ -0,0 +1,104 @@
+import enum
+import logging
+import time
+from collections import deque
+
+from exceptions.obis import ObisCircuitOpenError
+from setup.settings.obis import CircuitBreakerSettings
+
+
+log = logging.getLogger(__name__)
+
+
+class CircuitState(enum.StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Fails fast while the upstream is unhealthy.
+
+    Outcomes of the last ``window_size`` requests are kept in a rolling
+    window. Errors and requests slower than ``slow_request_threshold`` count
+    as failures; once the failure rate reaches ``failure_rate_threshold``
+    the circuit opens and every request is rejected for ``open_duration``
+    seconds. After that a single probe request is let through: success
+    closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, settings: CircuitBreakerSettings):
+        self.__settings = settings
+        self.__outcomes: deque[bool] = deque(maxlen=settings.window_size)
+        self.__state = CircuitState.CLOSED
+        self.__opened_at = 0.0
+        self.__is_probe_in_flight = False
+
+    @property
+    def state(self) -> CircuitState:
+        if (
+            self.__state == CircuitState.OPEN
+            and self.__get_open_time_left() <= 0
+        ):
+            return CircuitState.HALF_OPEN
+        return self.__state
+
+    def __get_open_time_left(self) -> float:
+        return (
+            self.__opened_at
+            + self.__settings.open_duration
+            - time.monotonic()
+        )
+
+    def before_request(self) -> None:
+        state = self.state
+        if state == CircuitState.OPEN:
+            raise ObisCircuitOpenError(
+                retry_after=self.__get_open_time_left(),
+            )
+        if state == CircuitState.HALF_OPEN:
+            if self.__is_probe_in_flight:
+                raise ObisCircuitOpenError(retry_after=0)
+            self.__state = CircuitState.HALF_OPEN
+            self.__is_probe_in_flight = True
+
+    def record_success(self, latency: float) -> None:
+        if latency >= self.__settings.slow_request_threshold:
+            self.record_failure()
+            return
+        if self.__state == CircuitState.HALF_OPEN:
+            log.info("Circuit breaker: probe succeeded, closing circuit")
+            self.__state = CircuitState.CLOSED
+            self.__is_probe_in_flight = False
+            self.__outcomes.clear()
+        self.__outcomes.append(True)
+
+    def record_failure(self) -> None:
+        if self.__state == CircuitState.HALF_OPEN:
+            log.warning("Circuit breaker: probe failed, reopening circuit")
+            self.__open()
+            return
+        self.__outcomes.append(False)
+        if len(self.__outcomes) < self.__settings.minimum_requests:
+            return
+        failures_count = self.__outcomes.count(False)
+        failure_rate = failures_count / len(self.__outcomes)
+        if (
+            self.__state == CircuitState.CLOSED
+            and failure_rate >= self.__settings.failure_rate_threshold
+        ):
+            log.warning(
+                "Circuit breaker: failure rate %.2f, opening circuit",
+                failure_rate,
+            )
+            self.__open()
+
+    def record_cancellation(self) -> None:
+        if self.__state == CircuitState.HALF_OPEN:
+            self.__is_probe_in_flight = False
+
+    def __open(self) -> None:
+        self.__state = CircuitState.OPEN
+        self.__opened_at = time.monotonic()
+        self.__is_probe_in_flight = False
+        self.__outcomes.clear()
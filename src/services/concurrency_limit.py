@@ -0,0 +1,90 @@
+import asyncio
+import logging
+import math
+import time
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+
+from setup.settings.obis import ConcurrencyLimitSettings
+
+
+log = logging.getLogger(__name__)
+
+
+class ConcurrencyLimitToken:
+
+    def __init__(self) -> None:
+        self.is_dropped = False
+
+    def drop(self) -> None:
+        """Mark the request as failed or timed out."""
+        self.is_dropped = True
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD limit on the number of in-flight requests.
+
+    Every request that completes under ``latency_target`` grows the limit by
+    ``1 / limit``, i.e. by roughly one per fully used window. A slow or
+    dropped request multiplies the limit by ``backoff_ratio``. Requests
+    above the current limit wait until a slot is released.
+    """
+
+    def __init__(self, settings: ConcurrencyLimitSettings):
+        self.__settings = settings
+        self.__limit = float(settings.initial_limit)
+        self.__in_flight = 0
+        self.__condition = asyncio.Condition()
+
+    @property
+    def limit(self) -> int:
+        return max(self.__settings.min_limit, math.floor(self.__limit))
+
+    @property
+    def in_flight(self) -> int:
+        return self.__in_flight
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncGenerator[ConcurrencyLimitToken, None]:
+        async with self.__condition:
+            await self.__condition.wait_for(
+                lambda: self.__in_flight < self.limit,
+            )
+            self.__in_flight += 1
+
+        token = ConcurrencyLimitToken()
+        started_at = time.monotonic()
+        try:
+            yield token
+        except BaseException:
+            token.drop()
+            raise
+        finally:
+            self.__update_limit(
+                latency=time.monotonic() - started_at,
+                is_dropped=token.is_dropped,
+            )
+            async with self.__condition:
+                self.__in_flight -= 1
+                self.__condition.notify_all()
+
+    def __update_limit(self, latency: float, is_dropped: bool) -> None:
+        previous_limit = self.limit
+        if is_dropped or latency > self.__settings.latency_target:
+            self.__limit = max(
+                self.__settings.min_limit,
+                self.__limit * self.__settings.backoff_ratio,
+            )
+        elif self.__in_flight >= self.limit:
+            # Probe upward only when the current limit is actually in use,
+            # otherwise a mostly idle client would inflate it indefinitely.
+            self.__limit = min(
+                self.__settings.max_limit,
+                self.__limit + 1 / self.__limit,
+            )
+        if self.limit != previous_limit:
+            log.debug(
+                "Concurrency limiter: limit changed %d -> %d",
+                previous_limit,
+                self.limit,
+            )
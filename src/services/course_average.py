@@ -0,0 +1,184 @@
+import dataclasses
+from collections.abc import Iterable, Sequence
+from typing import Final
+
+from models.course_average import CourseAverage
+from models.obis import LessonExams
+from models.score import Score, ScoreStatus, parse_score
+from services.cache import Cache
+from services.sync_fingerprint import get_fingerprint
+from setup.settings.grading import CourseGradingSettings, GradingSettings
+
+
+# absent counts as a zero, anything else as not graded yet
+GRADED_STATUSES: Final[frozenset[ScoreStatus]] = frozenset({
+    ScoreStatus.NUMERIC,
+    ScoreStatus.ABSENT,
+})
+
+
+def get_points(score: Score) -> float:
+    return score.value if score.value is not None else 0.0
+
+
+def get_required_final_score(
+    course: CourseGradingSettings,
+    points_without_final: float,
+    total_weight: float,
+    final_weight: float,
+) -> float:
+    """Score the final exam, or the makeup exam in its place, needs for
+    the lesson to be passed."""
+    return max(
+        (course.passing_average * total_weight - points_without_final)
+        / final_weight,
+        course.minimum_final_score,
+        0.0,
+    )
+
+
+def compute_course_average(
+    lesson_exams: LessonExams,
+    course: CourseGradingSettings,
+) -> CourseAverage | None:
+    """None for lessons without any weighted exam on OBIS."""
+    scores = {exam.name: parse_score(exam.score) for exam in lesson_exams.exams}
+    makeup_score = (
+        None if course.makeup_exam_name is None
+        else scores.pop(course.makeup_exam_name, None)
+    )
+    is_makeup_pending = False
+    if makeup_score is not None and course.final_exam_name in scores:
+        if makeup_score.status in GRADED_STATUSES:
+            scores[course.final_exam_name] = makeup_score
+        else:
+            is_makeup_pending = True
+    weights = {
+        exam_name: weight
+        for exam_name, weight in course.weights.items()
+        if exam_name in scores
+    }
+    total_weight = sum(weights.values())
+    if total_weight <= 0:
+        return None
+
+    points = 0.0
+    graded_weight = 0.0
+    pending_exam_names: list[str] = []
+    for exam_name, weight in weights.items():
+        score = scores[exam_name]
+        if score.status in GRADED_STATUSES:
+            points += weight * get_points(score)
+            graded_weight += weight
+        else:
+            pending_exam_names.append(exam_name)
+    course_average = CourseAverage(
+        lesson_code=lesson_exams.lesson_code,
+        average=points / graded_weight if graded_weight > 0 else None,
+        graded_percentage=graded_weight / total_weight * 100,
+    )
+
+    final_weight = weights.get(course.final_exam_name, 0)
+    if not pending_exam_names:
+        final_points = (
+            get_points(scores[course.final_exam_name])
+            if final_weight > 0 else 0.0
+        )
+        passed = (
+            points / total_weight >= course.passing_average
+            and (
+                final_weight <= 0
+                or final_points >= course.minimum_final_score
+            )
+        )
+        if passed or not is_makeup_pending or final_weight <= 0:
+            return dataclasses.replace(course_average, passed=passed)
+        # failed on the final, the makeup exam can still make up for it
+        required_makeup_score = get_required_final_score(
+            course,
+            points - final_weight * final_points,
+            total_weight,
+            final_weight,
+        )
+        if required_makeup_score > course.max_score:
+            return dataclasses.replace(course_average, passed=False)
+        return dataclasses.replace(
+            course_average,
+            required_makeup_score=required_makeup_score,
+        )
+    if pending_exam_names != [course.final_exam_name] or final_weight <= 0:
+        return course_average
+    required_final_score = get_required_final_score(
+        course,
+        points,
+        total_weight,
+        final_weight,
+    )
+    if required_final_score > course.max_score:
+        return dataclasses.replace(course_average, passed=False)
+    return dataclasses.replace(
+        course_average,
+        required_final_score=required_final_score,
+    )
+
+
+class CourseAverageService:
+    """Weighted course averages of the exams a user has on OBIS, and the
+    final or makeup exam score each lesson still needs.
+
+    Weights are configured per course. Results are cached per user along
+    with the fingerprint of the exams they were computed from, so showing
+    the same exams again doesn't recompute them. Saving a new grade of the
+    user drops them.
+    """
+
+    def __init__(self, cache: Cache, settings: GradingSettings):
+        self.__cache = cache
+        self.__settings = settings
+
+    @staticmethod
+    def __get_key(user_id: int) -> str:
+        return f"course-averages:{user_id}"
+
+    def compute(
+        self,
+        lessons_exams: Iterable[LessonExams],
+    ) -> dict[str, CourseAverage]:
+        course_averages: dict[str, CourseAverage] = {}
+        for lesson_exams in lessons_exams:
+            course_average = compute_course_average(
+                lesson_exams,
+                self.__settings.get_course(lesson_exams.lesson_code),
+            )
+            if course_average is not None:
+                course_averages[lesson_exams.lesson_code] = course_average
+        return course_averages
+
+    async def get_course_averages(
+        self,
+        user_id: int,
+        lessons_exams: Sequence[LessonExams],
+    ) -> dict[str, CourseAverage]:
+        key = self.__get_key(user_id)
+        fingerprint = get_fingerprint(lessons_exams)
+        cached = await self.__cache.get(key)
+        if cached is not None and cached["fingerprint"] == fingerprint:
+            return {
+                course_average["lesson_code"]: CourseAverage(**course_average)
+                for course_average in cached["course_averages"]
+            }
+        course_averages = self.compute(lessons_exams)
+        await self.__cache.set(
+            key,
+            {
+                "fingerprint": fingerprint,
+                "course_averages": [
+                    dataclasses.asdict(course_average)
+                    for course_average in course_averages.values()
+                ],
+            },
+        )
+        return course_averages
+
+    async def forget(self, user_id: int) -> None:
+        await self.__cache.delete(self.__get_key(user_id))
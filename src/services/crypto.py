@@ -1,7 +1,6 @@
 from typing import NewType
 
 from pydantic import SecretStr
-from cryptography.fernet import Fernet
 
 
 CryptographySecretKey = NewType("CryptographySecretKey", SecretStr)
@@ -10,6 +9,9 @@ CryptographySecretKey = NewType("CryptographySecretKey", SecretStr)
 class PasswordCryptor:
 
     def __init__(self, secret_key: CryptographySecretKey):
+        # imported here to keep cryptography off the startup path
+        from cryptography.fernet import Fernet
+
         self.__fernet = Fernet(secret_key.get_secret_value())
 
     def encrypt(self, plain_text: str) -> str:
@@ -0,0 +1,165 @@
+import asyncio
+import json
+import logging
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from typing import Any
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from models.sync_request import SyncReason, SyncRequest
+from setup.settings.event_bus import EventBusSettings
+
+
+log = logging.getLogger(__name__)
+
+
+def encode_sync_request(sync_request: SyncRequest) -> str:
+    return json.dumps(
+        {"user_id": sync_request.user_id, "reason": sync_request.reason},
+        separators=(",", ":"),
+    )
+
+
+def decode_sync_request(payload: str) -> SyncRequest | None:
+    try:
+        data = json.loads(payload)
+        return SyncRequest(
+            user_id=int(data["user_id"]),
+            reason=SyncReason(data["reason"]),
+        )
+    except (ValueError, KeyError, TypeError):
+        log.warning("Event bus: ignoring malformed payload %r", payload)
+        return None
+
+
+class EventBus(ABC):
+    """Tells sync workers that a user should be synced right away.
+
+    Delivery is best effort: a request published while no worker listens
+    is lost, the periodic pass picks the user up later anyway.
+    """
+
+    @abstractmethod
+    async def publish(self, sync_request: SyncRequest) -> None:
+        pass
+
+    @abstractmethod
+    def listen(self) -> AsyncIterator[SyncRequest]:
+        pass
+
+
+class InProcessEventBus(EventBus):
+    """Delivers requests to listeners of the publishing process only, i.e.
+    when the bot and the worker run together."""
+
+    def __init__(self):
+        self.__queues: set[asyncio.Queue[SyncRequest]] = set()
+
+    async def publish(self, sync_request: SyncRequest) -> None:
+        for queue in self.__queues:
+            queue.put_nowait(sync_request)
+
+    async def listen(self) -> AsyncIterator[SyncRequest]:
+        queue: asyncio.Queue[SyncRequest] = asyncio.Queue()
+        self.__queues.add(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self.__queues.discard(queue)
+
+
+class PostgresEventBus(EventBus):
+    """Delivers requests to every process listening on the channel with
+    Postgres LISTEN/NOTIFY."""
+
+    def __init__(self, engine: AsyncEngine, channel: str):
+        self.__engine = engine
+        self.__channel = channel
+
+    async def publish(self, sync_request: SyncRequest) -> None:
+        statement = select(
+            func.pg_notify(self.__channel, encode_sync_request(sync_request)),
+        )
+        try:
+            async with self.__engine.begin() as connection:
+                await connection.execute(statement)
+        except SQLAlchemyError:
+            log.warning(
+                "Event bus: could not publish sync request of user %s",
+                sync_request.user_id,
+                exc_info=True,
+            )
+
+    async def listen(self) -> AsyncIterator[SyncRequest]:
+        async with self.__engine.connect() as connection:
+            await connection.execution_options(isolation_level="AUTOCOMMIT")
+            raw_connection = await connection.get_raw_connection()
+            try:
+                driver_connection = raw_connection.driver_connection
+                if self.__engine.dialect.driver == "asyncpg":
+                    payloads = self.__listen_asyncpg(driver_connection)
+                else:
+                    payloads = self.__listen_psycopg(driver_connection)
+                async for payload in payloads:
+                    sync_request = decode_sync_request(payload)
+                    if sync_request is not None:
+                        yield sync_request
+            finally:
+                # A connection still subscribed to the channel must not go
+                # back to the pool.
+                await connection.invalidate()
+
+    async def __listen_psycopg(
+        self,
+        driver_connection: Any,
+    ) -> AsyncIterator[str]:
+        from psycopg import sql
+
+        await driver_connection.execute(
+            sql.SQL("LISTEN {}").format(sql.Identifier(self.__channel)),
+        )
+        log.info("Event bus: listening on %s", self.__channel)
+        async for notify in driver_connection.notifies():
+            yield notify.payload
+
+    async def __listen_asyncpg(
+        self,
+        driver_connection: Any,
+    ) -> AsyncIterator[str]:
+        # asyncpg hands notifications to callbacks; None marks the
+        # connection as lost
+        payloads: asyncio.Queue[str | None] = asyncio.Queue()
+        driver_connection.add_termination_listener(
+            lambda connection: payloads.put_nowait(None),
+        )
+        await driver_connection.add_listener(
+            self.__channel,
+            lambda connection, pid, channel, payload: (
+                payloads.put_nowait(payload)
+            ),
+        )
+        log.info("Event bus: listening on %s", self.__channel)
+        while True:
+            payload = await payloads.get()
+            if payload is None:
+                raise ConnectionError("event bus connection was closed")
+            yield payload
+
+
+def get_event_bus(
+    settings: EventBusSettings,
+    engine: AsyncEngine,
+) -> EventBus:
+    if settings.backend == "memory":
+        return InProcessEventBus()
+    if engine.dialect.name != "postgresql":
+        log.warning(
+            "Event bus: LISTEN/NOTIFY needs Postgres, falling back to the "
+            "in-process bus; run the bot and the worker as one process",
+        )
+        return InProcessEventBus()
+    return PostgresEventBus(engine, settings.channel)
@@ -0,0 +1,55 @@
+from repositories.exam import ExamRepository
+from repositories.lesson import LessonRepository
+
+
+class ExamCatalog:
+    """Exam ids by lesson code and exam name, and the lessons known to
+    exist.
+
+    Lessons and exams only get added, so both are cached for the lifetime
+    of the process and a sync pass only asks the database about the ones
+    it hasn't seen yet. They are cheap to look up again, so unlike OBIS
+    sessions they aren't shared between processes.
+    """
+
+    def __init__(self):
+        self.__exam_ids: dict[tuple[str, str], int] = {}
+        self.__lesson_codes: set[str] = set()
+
+    async def create_lesson(
+        self,
+        lesson_repository: LessonRepository,
+        code: str,
+        name: str,
+    ) -> None:
+        """Creates the lesson unless this process already did."""
+        if code in self.__lesson_codes:
+            return
+        await lesson_repository.create_lesson(code=code, name=name)
+        self.__lesson_codes.add(code)
+
+    async def get_exam_id(
+        self,
+        exam_repository: ExamRepository,
+        lesson_code: str,
+        name: str,
+    ) -> int | None:
+        key = (lesson_code, name)
+        exam_id = self.__exam_ids.get(key)
+        if exam_id is None:
+            exam_id = await exam_repository.get_exam_id(lesson_code, name)
+            if exam_id is not None:
+                self.__exam_ids[key] = exam_id
+        return exam_id
+
+    async def get_or_create_exam_id(
+        self,
+        exam_repository: ExamRepository,
+        lesson_code: str,
+        name: str,
+    ) -> int:
+        exam_id = await self.get_exam_id(exam_repository, lesson_code, name)
+        if exam_id is None:
+            exam_id = await exam_repository.create_exam(lesson_code, name)
+            self.__exam_ids[(lesson_code, name)] = exam_id
+        return exam_id
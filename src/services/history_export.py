@@ -0,0 +1,191 @@
+import asyncio
+import csv
+import datetime
+import logging
+import pathlib
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+from typing import Any
+
+from models.history_export import (
+    ExportFormat,
+    HistoryExportFilters,
+    HistoryTable,
+)
+from repositories.history_export import HistoryExportRepository
+
+
+log = logging.getLogger(__name__)
+
+# column name -> Arrow type name, in the order the repository selects them
+COLUMNS: dict[HistoryTable, dict[str, str]] = {
+    HistoryTable.ATTENDANCE: {
+        "id": "int64",
+        "user_id": "int64",
+        "lesson_code": "string",
+        "theory_skips_percentage": "float64",
+        "practice_skips_percentage": "float64",
+        "created_at": "timestamp",
+    },
+    HistoryTable.GRADES: {
+        "id": "int64",
+        "user_id": "int64",
+        "exam_id": "int64",
+        "lesson_code": "string",
+        "exam_name": "string",
+        "score": "string",
+        "score_status": "string",
+        "score_value": "float64",
+        "created_at": "timestamp",
+    },
+}
+
+
+def parse_export_date(value: str) -> datetime.datetime:
+    """Start of the day of an ISO date, or an ISO date and time."""
+    return datetime.datetime.fromisoformat(value)
+
+
+class HistoryExportWriter(ABC):
+    """Appends batches of rows to a file. The methods block, the export
+    runs them in a thread."""
+
+    @abstractmethod
+    def write(self, rows: Sequence[Sequence[Any]]) -> None:
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        pass
+
+
+class CsvHistoryExportWriter(HistoryExportWriter):
+
+    def __init__(self, path: pathlib.Path, columns: dict[str, str]):
+        self.__file = path.open("w", newline="", encoding="utf-8")
+        self.__writer = csv.writer(self.__file)
+        self.__writer.writerow(columns)
+
+    def write(self, rows: Sequence[Sequence[Any]]) -> None:
+        self.__writer.writerows(rows)
+
+    def close(self) -> None:
+        self.__file.close()
+
+
+class ArrowHistoryExportWriter(HistoryExportWriter):
+    """Parquet, or the Arrow IPC file format with ``is_parquet`` unset.
+
+    Every batch becomes a Parquet row group or an Arrow record batch, so
+    readers can scan the file without loading it whole.
+    """
+
+    def __init__(
+        self,
+        path: pathlib.Path,
+        columns: dict[str, str],
+        *,
+        is_parquet: bool,
+    ):
+        # pyarrow is an optional dependency, only needed for these formats
+        import pyarrow
+        import pyarrow.parquet
+
+        types = {
+            "int64": pyarrow.int64(),
+            "float64": pyarrow.float64(),
+            "string": pyarrow.string(),
+            "timestamp": pyarrow.timestamp("us"),
+        }
+        self.__pyarrow = pyarrow
+        self.__schema = pyarrow.schema(
+            [(name, types[type_name]) for name, type_name in columns.items()],
+        )
+        if is_parquet:
+            self.__writer = pyarrow.parquet.ParquetWriter(
+                path,
+                self.__schema,
+                compression="zstd",
+            )
+        else:
+            self.__writer = pyarrow.ipc.new_file(path, self.__schema)
+
+    def write(self, rows: Sequence[Sequence[Any]]) -> None:
+        arrays = [
+            self.__pyarrow.array(
+                [row[index] for row in rows],
+                type=column.type,
+            )
+            for index, column in enumerate(self.__schema)
+        ]
+        self.__writer.write_batch(
+            self.__pyarrow.record_batch(arrays, schema=self.__schema),
+        )
+
+    def close(self) -> None:
+        self.__writer.close()
+
+
+def open_history_export_writer(
+    export_format: ExportFormat,
+    path: pathlib.Path,
+    columns: dict[str, str],
+) -> HistoryExportWriter:
+    if export_format == ExportFormat.CSV:
+        return CsvHistoryExportWriter(path, columns)
+    return ArrowHistoryExportWriter(
+        path,
+        columns,
+        is_parquet=export_format == ExportFormat.PARQUET,
+    )
+
+
+class HistoryExportService:
+
+    def __init__(self, history_export_repository: HistoryExportRepository):
+        self.__history_export_repository = history_export_repository
+
+    async def export(
+        self,
+        table: HistoryTable,
+        export_format: ExportFormat,
+        path: pathlib.Path,
+        filters: HistoryExportFilters,
+        *,
+        batch_size: int = 10_000,
+    ) -> int:
+        """Writes the history rows matching ``filters`` to ``path`` and
+        returns their count.
+
+        Memory stays bounded by ``batch_size``: rows are streamed from the
+        database and each batch is encoded and written in a thread, so
+        the event loop keeps serving updates. A failed export removes the
+        partial file.
+        """
+        writer = await asyncio.to_thread(
+            open_history_export_writer,
+            export_format,
+            path,
+            COLUMNS[table],
+        )
+        rows_count = 0
+        try:
+            async for rows in self.__history_export_repository.stream_rows(
+                table,
+                filters,
+                batch_size=batch_size,
+            ):
+                await asyncio.to_thread(writer.write, rows)
+                rows_count += len(rows)
+        except BaseException:
+            await asyncio.to_thread(writer.close)
+            path.unlink(missing_ok=True)
+            raise
+        await asyncio.to_thread(writer.close)
+        log.info(
+            "History export: %d %s rows written to %s",
+            rows_count,
+            table,
+            path,
+        )
+        return rows_count
@@ -0,0 +1,82 @@
+import datetime
+import logging
+
+from repositories.history_partition import (
+    HISTORY_TABLE_NAMES,
+    HistoryPartitionRepository,
+    add_months,
+)
+from setup.settings.storage import StorageSettings
+
+
+log = logging.getLogger(__name__)
+
+
+def get_semester(month_start: datetime.date) -> str:
+    """Academic semester of a month: August-January is fall,
+    February-July is spring."""
+    if month_start.month == 1:
+        return f"{month_start.year - 1}-fall"
+    if month_start.month >= 8:
+        return f"{month_start.year}-fall"
+    return f"{month_start.year}-spring"
+
+
+def get_semester_start(today: datetime.date) -> datetime.date:
+    """First day of the semester of ``get_semester``."""
+    if today.month == 1:
+        return datetime.date(today.year - 1, 8, 1)
+    if today.month >= 8:
+        return datetime.date(today.year, 8, 1)
+    return datetime.date(today.year, 2, 1)
+
+
+class HistoryRetentionService:
+
+    def __init__(
+        self,
+        history_partition_repository: HistoryPartitionRepository,
+        settings: StorageSettings,
+    ):
+        self.__history_partition_repository = history_partition_repository
+        self.__settings = settings
+
+    async def maintain(self, today: datetime.date) -> None:
+        if not self.__history_partition_repository.is_supported:
+            log.debug("History retention: partitioning is not supported")
+            return
+
+        current_month_start = today.replace(day=1)
+        for table_name in HISTORY_TABLE_NAMES:
+            for months in range(self.__settings.history_partitions_ahead + 1):
+                await self.__history_partition_repository.create_partition(
+                    table_name,
+                    add_months(current_month_start, months),
+                )
+
+        retention_months = self.__settings.history_retention_months
+        if retention_months is None:
+            return
+
+        cutoff_month_start = add_months(current_month_start, -retention_months)
+        for table_name in HISTORY_TABLE_NAMES:
+            partition_months = (
+                await self.__history_partition_repository.get_partition_months(
+                    table_name,
+                )
+            )
+            for month_start in partition_months:
+                if month_start >= cutoff_month_start:
+                    continue
+                semester = get_semester(month_start)
+                log.info(
+                    "History retention: rolling up %s %s into %s",
+                    table_name,
+                    month_start,
+                    semester,
+                )
+                await self.__history_partition_repository.roll_up_and_drop_partition(
+                    table_name,
+                    month_start,
+                    semester,
+                )
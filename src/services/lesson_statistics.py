@@ -0,0 +1,209 @@
+import logging
+from collections.abc import Callable
+
+from models.lesson_statistics import (
+    AttendanceKind,
+    HistogramDeltas,
+    LessonStatisticsRebuild,
+    UserLessonStatistics,
+    get_bucket,
+    get_skips_percentage,
+)
+from models.obis import LessonAttendanceChange
+from models.score import parse_score
+from repositories.attendance_history import AttendanceHistoryRepository
+from repositories.lesson_grade import LessonGradeRepository
+from repositories.lesson_statistics import (
+    AttendanceBucketKey,
+    ExamBucketKey,
+    LessonStatisticsRepository,
+)
+from repositories.user import UserRepository
+
+
+log = logging.getLogger(__name__)
+
+# a bucket whose values sum drifted by less than this isn't stale
+VALUES_SUM_TOLERANCE = 1e-6
+
+
+def add_delta[K](
+    deltas: HistogramDeltas[K],
+    key: K,
+    students_count: int,
+    value: float,
+) -> None:
+    previous_count, previous_sum = deltas.get(key, (0, 0.0))
+    deltas[key] = (previous_count + students_count, previous_sum + value)
+
+
+def add_value_change[K](
+    deltas: HistogramDeltas[K],
+    get_key: Callable[[int], K],
+    previous: float | None,
+    current: float | None,
+) -> None:
+    if previous == current:
+        return
+    if previous is not None:
+        add_delta(deltas, get_key(get_bucket(previous)), -1, -previous)
+    if current is not None:
+        add_delta(deltas, get_key(get_bucket(current)), 1, current)
+
+
+def count_stale_buckets[K](
+    stored: HistogramDeltas[K],
+    rebuilt: HistogramDeltas[K],
+) -> int:
+    stale_buckets_count = 0
+    for key in stored.keys() | rebuilt.keys():
+        stored_count, stored_sum = stored.get(key, (0, 0.0))
+        rebuilt_count, rebuilt_sum = rebuilt.get(key, (0, 0.0))
+        if (
+            stored_count != rebuilt_count
+            or abs(stored_sum - rebuilt_sum) > VALUES_SUM_TOLERANCE
+        ):
+            stale_buckets_count += 1
+    return stale_buckets_count
+
+
+class LessonStatisticsService:
+    """How a user's attendance and grades compare to the other students of
+    the same lesson.
+
+    Every student counts once per lesson and exam, with their latest
+    value. The histograms are updated as history is saved, so reading
+    them costs the same however long the history is. Updates computed
+    from a lagging replica can make them drift, ``rebuild`` recounts them
+    from the latest history rows.
+    """
+
+    def __init__(
+        self,
+        lesson_statistics_repository: LessonStatisticsRepository,
+        user_repository: UserRepository,
+        attendance_history_repository: AttendanceHistoryRepository,
+        lesson_grade_repository: LessonGradeRepository,
+    ):
+        self.__lesson_statistics_repository = lesson_statistics_repository
+        self.__user_repository = user_repository
+        self.__attendance_history_repository = attendance_history_repository
+        self.__lesson_grade_repository = lesson_grade_repository
+
+    async def record_attendance_changes(
+        self,
+        attendance_changes: list[LessonAttendanceChange],
+    ) -> None:
+        deltas: HistogramDeltas[AttendanceBucketKey] = {}
+        for attendance_change in attendance_changes:
+            lesson_code = attendance_change.current.lesson_code
+            for kind in AttendanceKind:
+                add_value_change(
+                    deltas,
+                    lambda bucket: (lesson_code, kind, bucket),
+                    (
+                        None
+                        if attendance_change.previous is None
+                        else get_skips_percentage(
+                            attendance_change.previous,
+                            kind,
+                        )
+                    ),
+                    get_skips_percentage(attendance_change.current, kind),
+                )
+        await self.__lesson_statistics_repository.add_attendance_deltas(deltas)
+
+    async def record_grade_change(
+        self,
+        exam_id: int,
+        previous_score: str | None,
+        current_score: str | None,
+    ) -> None:
+        deltas: HistogramDeltas[ExamBucketKey] = {}
+        add_value_change(
+            deltas,
+            lambda bucket: (exam_id, bucket),
+            parse_score(previous_score).value,
+            parse_score(current_score).value,
+        )
+        await self.__lesson_statistics_repository.add_exam_deltas(deltas)
+
+    async def get_user_statistics(self, user_id: int) -> UserLessonStatistics:
+        """The user's latest saved values and the histograms of their
+        lessons and exams, without asking OBIS."""
+        last_attendances = (
+            await self.__attendance_history_repository.get_last_attendances(
+                user_id,
+            )
+        )
+        exam_grades = await self.__lesson_grade_repository.get_last_grades(
+            user_id,
+        )
+        repository = self.__lesson_statistics_repository
+        return UserLessonStatistics(
+            lessons_attendance=list(last_attendances.values()),
+            attendance_histograms=await repository.get_attendance_histograms(
+                last_attendances.keys(),
+            ),
+            exam_grades=exam_grades,
+            exam_histograms=await repository.get_exam_histograms(
+                {exam_grade.exam_id for exam_grade in exam_grades},
+            ),
+        )
+
+    async def rebuild(self, *, dry_run: bool) -> LessonStatisticsRebuild:
+        """Recounts the histograms from every user's latest history and
+        replaces them unless ``dry_run`` is set.
+
+        Changes saved while it runs are lost on replacement, run it
+        between sync passes.
+        """
+        attendance_buckets: HistogramDeltas[AttendanceBucketKey] = {}
+        exam_buckets: HistogramDeltas[ExamBucketKey] = {}
+        users = await self.__user_repository.get_users()
+        for user in users:
+            last_attendances = (
+                await self.__attendance_history_repository.get_last_attendances(
+                    user.id,
+                )
+            )
+            for attendance in last_attendances.values():
+                for kind in AttendanceKind:
+                    add_value_change(
+                        attendance_buckets,
+                        lambda bucket: (attendance.lesson_code, kind, bucket),
+                        None,
+                        get_skips_percentage(attendance, kind),
+                    )
+            for exam_grade in await self.__lesson_grade_repository.get_last_grades(
+                user.id,
+            ):
+                add_value_change(
+                    exam_buckets,
+                    lambda bucket: (exam_grade.exam_id, bucket),
+                    None,
+                    exam_grade.score_value,
+                )
+
+        stale_buckets_count = count_stale_buckets(
+            await self.__lesson_statistics_repository.get_all_attendance_buckets(),
+            attendance_buckets,
+        ) + count_stale_buckets(
+            await self.__lesson_statistics_repository.get_all_exam_buckets(),
+            exam_buckets,
+        )
+        if not dry_run:
+            await self.__lesson_statistics_repository.replace_buckets(
+                attendance_buckets,
+                exam_buckets,
+            )
+        log.info(
+            "Lesson statistics: %d users recounted, %d stale buckets%s",
+            len(users),
+            stale_buckets_count,
+            "" if dry_run else " replaced",
+        )
+        return LessonStatisticsRebuild(
+            users_count=len(users),
+            stale_buckets_count=stale_buckets_count,
+        )
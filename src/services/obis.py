@@ -1,18 +1,28 @@
 import logging
-from collections.abc import AsyncGenerator
-from contextlib import asynccontextmanager
-from typing import NewType, Final
+import sys
+import time
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from typing import TYPE_CHECKING, Any, NewType
 
 import httpx
-from bs4 import BeautifulSoup
 
-from exceptions.obis import ObisClientNotLoggedInError
+from exceptions.obis import (
+    ObisCircuitOpenError,
+    ObisClientNotLoggedInError,
+    ObisSessionExpiredError,
+    ObisServiceUnavailableError,
+)
 from models.obis import (
-    LessonAttendance,
-    LessonSkipOpportunity,
     Exam,
-    LessonExams, LessonAttendanceParseResult,
+    LessonExams, LessonAttendance,
 )
+from services.circuit_breaker import CircuitBreaker
+from services.concurrency_limit import AdaptiveConcurrencyLimiter
+from services.retry import retry_with_backoff
+from setup.settings.obis import ObisSettings
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
 
 
 log = logging.getLogger(__name__)
@@ -20,54 +30,98 @@ log = logging.getLogger(__name__)
 ObisHttpClient = NewType("ObisHttpClient", httpx.AsyncClient)
 
 
-async def get_obis_http_client() -> AsyncGenerator[ObisHttpClient, None]:
+class ObisTransport(httpx.AsyncBaseTransport):
+    """Guards every OBIS request with the shared circuit breaker and
+    adaptive concurrency limiter.
+
+    Transport errors and 5xx responses count as failures; authentication
+    problems are answered with 200 by OBIS and are not seen here.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        circuit_breaker: CircuitBreaker,
+        concurrency_limiter: AdaptiveConcurrencyLimiter,
+    ):
+        self.__transport = transport
+        self.__circuit_breaker = circuit_breaker
+        self.__concurrency_limiter = concurrency_limiter
+
+    async def handle_async_request(
+        self,
+        request: httpx.Request,
+    ) -> httpx.Response:
+        self.__circuit_breaker.before_request()
+        async with self.__concurrency_limiter.acquire() as token:
+            started_at = time.monotonic()
+            try:
+                response = await self.__transport.handle_async_request(
+                    request,
+                )
+            except httpx.TransportError:
+                token.drop()
+                self.__circuit_breaker.record_failure()
+                raise
+            except BaseException:
+                self.__circuit_breaker.record_cancellation()
+                raise
+            if response.status_code >= 500:
+                token.drop()
+                self.__circuit_breaker.record_failure()
+            else:
+                self.__circuit_breaker.record_success(
+                    latency=time.monotonic() - started_at,
+                )
+            return response
+
+    async def aclose(self) -> None:
+        await self.__transport.aclose()
+
+
+def get_obis_circuit_breaker(settings: ObisSettings) -> CircuitBreaker:
+    return CircuitBreaker(settings.circuit_breaker)
+
+
+def get_obis_concurrency_limiter(
+    settings: ObisSettings,
+) -> AdaptiveConcurrencyLimiter:
+    return AdaptiveConcurrencyLimiter(settings.concurrency_limit)
+
+
+async def get_obis_http_client(
+    settings: ObisSettings,
+    circuit_breaker: CircuitBreaker,
+    concurrency_limiter: AdaptiveConcurrencyLimiter,
+) -> AsyncGenerator[ObisHttpClient, None]:
+    transport = ObisTransport(
+        transport=httpx.AsyncHTTPTransport(),
+        circuit_breaker=circuit_breaker,
+        concurrency_limiter=concurrency_limiter,
+    )
     async with httpx.AsyncClient(
-        base_url="https://obistest.manas.edu.kg/",
+        base_url=str(settings.base_url),
         headers={"User-Agent": "Yoklama parser"},
-        timeout=30,
+        timeout=settings.timeout,
         follow_redirects=True,
+        transport=transport,
     ) as http_client:
         yield ObisHttpClient(http_client)
 
 
-THEORY_SKIPS_THRESHOLD: Final[int] = 30
-PRACTICE_SKIPS_THRESHOLD: Final[int] = 20
-SKIP_PERCENTAGE_PER_LESSON: Final[float] = 6.25
+def parse_html(text: str) -> "BeautifulSoup":
+    # bs4 and lxml are imported on the first OBIS page rather than at
+    # startup, they are a sizeable part of the bot's import time.
+    from bs4 import BeautifulSoup
 
+    return BeautifulSoup(text, "lxml")
 
-def compute_lesson_skip_opportunities(
-    lesson: LessonAttendance,
-) -> LessonSkipOpportunity:
-    if lesson.theory_skips_percentage is not None:
-        diff = (
-            THEORY_SKIPS_THRESHOLD - lesson.theory_skips_percentage
-        )
-        if diff == SKIP_PERCENTAGE_PER_LESSON:
-            theory_skippable_lessons_count = 0
-        else:
-            theory_skippable_lessons_count = int(
-                diff // SKIP_PERCENTAGE_PER_LESSON,
-            )
-    else:
-        theory_skippable_lessons_count = None
-    if lesson.practice_skips_percentage is not None:
-        diff = (
-            PRACTICE_SKIPS_THRESHOLD
-            - lesson.practice_skips_percentage
-        )
-        if diff == SKIP_PERCENTAGE_PER_LESSON:
-            practice_skippable_lessons_count = 0
-        else:
-            practice_skippable_lessons_count = int(
-                diff // SKIP_PERCENTAGE_PER_LESSON,
-            )
-    else:
-        practice_skippable_lessons_count = None
 
-    return LessonSkipOpportunity(
-        theory=theory_skippable_lessons_count,
-        practice=practice_skippable_lessons_count,
-    )
+def get_cell_name(cell: Any) -> str:
+    """Cell text, interned: every student's pages repeat the same lesson
+    codes, lesson names and exam names, a sync pass keeps one copy of
+    each."""
+    return sys.intern(cell.get_text(strip=True))
 
 
 def try_parse_float(value: str) -> float | None:
@@ -78,7 +132,7 @@ def try_parse_float(value: str) -> float | None:
 
 
 def parse_taken_grades_page(text: str) -> list[LessonExams]:
-    soup = BeautifulSoup(text, "lxml")
+    soup = parse_html(text)
     table_bodies = soup.find_all("tbody")
     if not table_bodies:
         return []
@@ -95,19 +149,26 @@ def parse_taken_grades_page(text: str) -> list[LessonExams]:
 
         if len(tds) == 5:
             # This is a new lesson row
-            lesson_code = tds[1].get_text(strip=True) or None
-            lesson_name = tds[2].get_text(strip=True) or None
+            lesson_code = get_cell_name(tds[1])
+            lesson_name = get_cell_name(tds[2])
 
             # Get rowspan from first column to determine how many rows belong to this lesson
             rowspan = int(tds[0].get('rowspan', 1))
 
+            # The models trust the parser, a lesson without a code or a
+            # name is skipped with its exams
+            if not lesson_code or not lesson_name:
+                i += rowspan
+                continue
+
             # Collect all exams for this lesson
             exams: list[Exam] = []
 
             # First exam from the current row
-            exam_name = tds[3].get_text(strip=True) or None
+            exam_name = get_cell_name(tds[3])
             score = tds[4].get_text(strip=True) or None
-            exams.append(Exam(name=exam_name, score=score))
+            if exam_name:
+                exams.append(Exam(name=exam_name, score=score))
 
             # Process additional rows if rowspan > 1
             for j in range(1, rowspan):
@@ -116,9 +177,10 @@ def parse_taken_grades_page(text: str) -> list[LessonExams]:
                     next_tds = next_row.find_all("td", recursive=False)
 
                     if len(next_tds) == 2:
-                        exam_name = next_tds[0].get_text(strip=True) or None
+                        exam_name = get_cell_name(next_tds[0])
                         score = next_tds[1].get_text(strip=True) or None
-                        exams.append(Exam(name=exam_name, score=score))
+                        if exam_name:
+                            exams.append(Exam(name=exam_name, score=score))
 
             # Add the lesson with all its exams
             lessons.append(
@@ -139,26 +201,30 @@ def parse_taken_grades_page(text: str) -> list[LessonExams]:
 
 def parse_lessons_attendance_page(
     html: str,
-) -> list[LessonAttendanceParseResult]:
-    soup = BeautifulSoup(html, "lxml")
+    user_id: int,
+) -> list[LessonAttendance]:
+    soup = parse_html(html)
     table = soup.find("table")
     if table is None:
         log.warning("No attendance table found in the HTML page")
         return []
     table_rows = table.find_all("tr")[1:]
-    lessons: list[LessonAttendanceParseResult] = []
+    lessons: list[LessonAttendance] = []
     for table_row in table_rows:
         tds = table_row.find_all("td")
         if len(tds) != 9:
             continue
-        lesson_name = tds[2].get_text(strip=True)
-        lesson_code = tds[1].get_text(strip=True)
+        lesson_name = get_cell_name(tds[2])
+        lesson_code = get_cell_name(tds[1])
+        if not lesson_code or not lesson_name:
+            continue
         theory_skips_percentage = tds[4].text.strip("% ")
         practice_skips_percentage = tds[6].text.strip(
             "% ",
         )
 
-        lesson = LessonAttendanceParseResult(
+        lesson = LessonAttendance(
+            user_id=user_id,
             lesson_name=lesson_name,
             lesson_code=lesson_code,
             theory_skips_percentage=try_parse_float(
@@ -174,28 +240,73 @@ def parse_lessons_attendance_page(
 
 class ObisService:
 
-    def __init__(self, http_client: ObisHttpClient):
+    def __init__(self, http_client: ObisHttpClient, settings: ObisSettings):
         self.__http_client = http_client
+        self.__settings = settings
+
+    async def __retry[T](self, operation: Callable[[], Awaitable[T]]) -> T:
+        return await retry_with_backoff(
+            operation,
+            settings=self.__settings.retry,
+            retry_on=(httpx.TransportError, ObisServiceUnavailableError),
+            give_up_on=(ObisCircuitOpenError,),
+        )
+
+    async def __send(
+        self,
+        method: str,
+        url: str,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        response = await self.__http_client.request(method, url, **kwargs)
+        if response.is_server_error:
+            log.warning(
+                "ObisClient: %s %s responded with %d",
+                method,
+                url,
+                response.status_code,
+            )
+            raise ObisServiceUnavailableError
+        return response
+
+    async def __request(
+        self,
+        method: str,
+        url: str,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        return await self.__retry(
+            lambda: self.__send(method, url, **kwargs),
+        )
 
     async def login(
         self,
         student_number: str,
         password: str,
+    ) -> None:
+        # a CSRF token is only good for one login attempt, every retry
+        # starts over with a fresh login page
+        await self.__retry(lambda: self.__login_once(student_number, password))
+
+    async def __login_once(
+        self,
+        student_number: str,
+        password: str,
     ) -> None:
         url = "/site/login"
-        response = await self.__http_client.get(url)
+        response = await self.__send("GET", url)
 
-        soup = BeautifulSoup(response.text, "lxml")
+        soup = parse_html(response.text)
 
         csrf_input = soup.find("input", {"name": "_csrf"})
         if csrf_input is None:
             log.error("ObisClient login: CSRF token not found")
-            raise ObisClientNotLoggedInError
+            raise ObisServiceUnavailableError
 
         csrf_token = csrf_input.get("value")
         if csrf_token is None:
             log.error("ObisClient login: CSRF token value not found")
-            raise ObisClientNotLoggedInError
+            raise ObisServiceUnavailableError
 
         request_data = {
             "_csrf": csrf_token,
@@ -203,23 +314,51 @@ class ObisService:
             "LoginForm[password_hash]": password,
         }
 
-        response = await self.__http_client.post(url, data=request_data)
+        response = await self.__send("POST", url, data=request_data)
 
         if '/site/login' in response.text or response.is_error:
-            log.error(
+            log.info(
                 "ObisClient login: login failed for student number %s",
                 student_number,
             )
             raise ObisClientNotLoggedInError
 
+    def get_session_cookies(self) -> list[list[str]]:
+        """The cookies of the logged in session, for ``resume_session``."""
+        return [
+            [cookie.name, cookie.value, cookie.domain, cookie.path]
+            for cookie in self.__http_client.cookies.jar
+        ]
+
+    def resume_session(self, cookies: list[list[str]]) -> None:
+        self.__http_client.cookies.clear()
+        for name, value, domain, path in cookies:
+            self.__http_client.cookies.set(
+                name,
+                value,
+                domain=domain,
+                path=path,
+            )
+
+    async def __get_page(self, url: str) -> str:
+        response = await self.__request("GET", url)
+        if response.url.path == "/site/login":
+            raise ObisSessionExpiredError
+        return response.text
+
+    async def get_lessons_attendance_page(self) -> str:
+        return await self.__get_page("/vs-ders/taken-lessons")
+
     async def get_lessons_attendance(
         self,
-    ) -> list[LessonAttendanceParseResult]:
-        url = "/vs-ders/taken-lessons"
-        response = await self.__http_client.get(url)
-        return parse_lessons_attendance_page(response.text)
+        user_id: int,
+    ) -> list[LessonAttendance]:
+        page = await self.get_lessons_attendance_page()
+        return parse_lessons_attendance_page(page, user_id)
+
+    async def get_taken_grades_page(self) -> str:
+        return await self.__get_page("/vs-ders/taken-grades")
 
     async def get_lesson_exams(self) -> list[LessonExams]:
-        url = "/vs-ders/taken-grades"
-        response = await self.__http_client.get(url)
-        return parse_taken_grades_page(response.text)
+        page = await self.get_taken_grades_page()
+        return parse_taken_grades_page(page)
@@ -0,0 +1,54 @@
+import json
+
+from services.cache import Cache
+from services.crypto import PasswordCryptor
+from setup.settings.cache import CacheSettings
+
+
+class ObisSessionStore:
+    """OBIS session cookies by student number.
+
+    A sync resumes the student's last session instead of logging in, which
+    takes two OBIS requests. Cookies are encrypted like passwords, since
+    they grant the same access while the session lasts.
+    """
+
+    def __init__(
+        self,
+        cache: Cache,
+        password_cryptor: PasswordCryptor,
+        settings: CacheSettings,
+    ):
+        self.__cache = cache
+        self.__password_cryptor = password_cryptor
+        self.__ttl = settings.obis_session_ttl
+
+    @staticmethod
+    def __get_key(student_number: str) -> str:
+        return f"obis-session:{student_number}"
+
+    async def get(self, student_number: str) -> list[list[str]] | None:
+        if not self.__ttl:
+            return None
+        encrypted_cookies = await self.__cache.get(
+            self.__get_key(student_number),
+        )
+        if encrypted_cookies is None:
+            return None
+        return json.loads(self.__password_cryptor.decrypt(encrypted_cookies))
+
+    async def save(
+        self,
+        student_number: str,
+        cookies: list[list[str]],
+    ) -> None:
+        if not self.__ttl or not cookies:
+            return
+        await self.__cache.set(
+            self.__get_key(student_number),
+            self.__password_cryptor.encrypt(json.dumps(cookies)),
+            ttl=self.__ttl,
+        )
+
+    async def forget(self, student_number: str) -> None:
+        await self.__cache.delete(self.__get_key(student_number))
@@ -0,0 +1,41 @@
+import asyncio
+import logging
+import random
+from collections.abc import Awaitable, Callable
+
+from setup.settings.obis import RetrySettings
+
+
+log = logging.getLogger(__name__)
+
+
+def compute_backoff_delay(settings: RetrySettings, attempt: int) -> float:
+    """Full jitter: uniform between zero and the capped exponential delay."""
+    ceiling = min(settings.max_delay, settings.base_delay * 2 ** attempt)
+    return random.uniform(0, ceiling)
+
+
+async def retry_with_backoff[T](
+    operation: Callable[[], Awaitable[T]],
+    *,
+    settings: RetrySettings,
+    retry_on: tuple[type[BaseException], ...],
+    give_up_on: tuple[type[BaseException], ...] = (),
+) -> T:
+    for attempt in range(settings.attempts):
+        try:
+            return await operation()
+        except give_up_on:
+            raise
+        except retry_on as error:
+            if attempt + 1 >= settings.attempts:
+                raise
+            delay = compute_backoff_delay(settings, attempt)
+            log.info(
+                "Retry: attempt %d failed with %r, retrying in %.2fs",
+                attempt + 1,
+                error,
+                delay,
+            )
+            await asyncio.sleep(delay)
+    raise RuntimeError("Retry attempts must be positive")
@@ -0,0 +1,119 @@
+import datetime
+from collections.abc import Sequence
+
+from models.obis import LessonAttendance, LessonSkipOpportunity
+from setup.settings.skip_budget import (
+    CourseSkipBudgetSettings,
+    SkipBudgetSettings,
+)
+
+
+def compute_remaining_skips(
+    skips_percentage: float | None,
+    threshold: float,
+    skip_percentage_per_lesson: float,
+) -> int | None:
+    """Whole lessons that can still be skipped; None where OBIS has no data.
+
+    Landing exactly one lesson below the threshold leaves no skips, since
+    the next skip would reach the threshold itself.
+    """
+    if skips_percentage is None:
+        return None
+    diff = threshold - skips_percentage
+    if diff == skip_percentage_per_lesson:
+        return 0
+    return int(diff // skip_percentage_per_lesson)
+
+
+class SkipBudgetEngine:
+    """Remaining skips and projected at-risk dates of the lessons of a user.
+
+    Thresholds and the number of lessons per semester are configured per
+    course.
+    """
+
+    def __init__(self, settings: SkipBudgetSettings):
+        self.__settings = settings
+
+    def __compute_at_risk_days(
+        self,
+        today: datetime.date,
+        skips_percentage: float | None,
+        remaining_skips: int | None,
+        course: CourseSkipBudgetSettings,
+    ) -> float | None:
+        """Days until the remaining skips run out at the current skip rate,
+        None if that happens after the semester ends or never."""
+        semester_start = self.__settings.semester_start
+        if (
+            semester_start is None
+            or today <= semester_start
+            or skips_percentage is None
+            or remaining_skips is None
+        ):
+            return None
+        elapsed_days = (today - semester_start).days
+        skipped_lessons = skips_percentage / course.skip_percentage_per_lesson
+        skips_per_day = skipped_lessons / elapsed_days
+        if skips_per_day <= 0:
+            return None
+        days = max(remaining_skips, 0) / skips_per_day
+        if days > course.weeks * 7 - elapsed_days:
+            return None
+        return days
+
+    def compute_one(
+        self,
+        lesson_attendance: LessonAttendance,
+        today: datetime.date | None = None,
+    ) -> LessonSkipOpportunity:
+        today = today or datetime.date.today()
+        course = self.__settings.get_course(lesson_attendance.lesson_code)
+        theory = compute_remaining_skips(
+            lesson_attendance.theory_skips_percentage,
+            course.theory_threshold,
+            course.skip_percentage_per_lesson,
+        )
+        practice = compute_remaining_skips(
+            lesson_attendance.practice_skips_percentage,
+            course.practice_threshold,
+            course.skip_percentage_per_lesson,
+        )
+        at_risk_days = [
+            days
+            for days in (
+                self.__compute_at_risk_days(
+                    today,
+                    lesson_attendance.theory_skips_percentage,
+                    theory,
+                    course,
+                ),
+                self.__compute_at_risk_days(
+                    today,
+                    lesson_attendance.practice_skips_percentage,
+                    practice,
+                    course,
+                ),
+            )
+            if days is not None
+        ]
+        return LessonSkipOpportunity(
+            theory=theory,
+            practice=practice,
+            at_risk_date=(
+                today + datetime.timedelta(days=int(min(at_risk_days)))
+                if at_risk_days else None
+            ),
+        )
+
+    def compute(
+        self,
+        lessons_attendance: Sequence[LessonAttendance],
+        today: datetime.date | None = None,
+    ) -> list[LessonSkipOpportunity]:
+        today = today or datetime.date.today()
+        return [
+            self.compute_one(lesson_attendance, today)
+            for lesson_attendance in lessons_attendance
+        ]
@@ -0,0 +1,44 @@
+import hashlib
+
+from services.cache import Cache
+
+
+def get_fingerprint(content: object) -> str:
+    """Stable across processes, unlike ``hash``."""
+    return hashlib.blake2b(repr(content).encode(), digest_size=16).hexdigest()
+
+
+class SyncFingerprints:
+    """What the last complete sync of a user found on OBIS.
+
+    A pass whose parsed page has the same fingerprint can skip the diff
+    against the database, nothing can have changed. Only syncs whose
+    changes were all persisted are remembered, so a change that failed to
+    send is still found by the next pass.
+    """
+
+    def __init__(self, cache: Cache):
+        self.__cache = cache
+
+    @staticmethod
+    def __get_key(subject: str, user_id: int) -> str:
+        return f"sync-fingerprint:{subject}:{user_id}"
+
+    async def is_unchanged(
+        self,
+        subject: str,
+        user_id: int,
+        fingerprint: str,
+    ) -> bool:
+        return (
+            await self.__cache.get(self.__get_key(subject, user_id))
+            == fingerprint
+        )
+
+    async def remember(
+        self,
+        subject: str,
+        user_id: int,
+        fingerprint: str,
+    ) -> None:
+        await self.__cache.set(self.__get_key(subject, user_id), fingerprint)
@@ -1,18 +1,52 @@
+import datetime
+import logging
+from collections.abc import Awaitable, Callable, Iterable
+
+from exceptions.obis import (
+    ObisClientNotLoggedInError,
+    ObisSessionExpiredError,
+)
 from exceptions.user import (
     UserHasNoCredentialsError,
     UserNotAcceptedTermsError,
+    UserQuarantinedError,
 )
 from models.lesson_grade import LessonGradeChange
 from models.obis import (
     LessonExams, LessonAttendance, LessonAttendanceChange,
 )
+from models.score import parse_score
 from models.user import User
+from repositories.attendance_history import AttendanceHistoryRepository
+from repositories.exam import ExamRepository
 from repositories.lesson import LessonRepository
-from repositories.lesson_attendance import LessonAttendanceRepository
 from repositories.lesson_grade import LessonGradeRepository
 from repositories.user import UserRepository
+from services.course_average import CourseAverageService
 from services.crypto import PasswordCryptor
+from services.exam_catalog import ExamCatalog
+from services.lesson_statistics import LessonStatisticsService
 from services.obis import ObisService
+from services.obis_session import ObisSessionStore
+from setup.settings.obis import QuarantineSettings
+
+
+log = logging.getLogger(__name__)
+
+
+def get_utc_now() -> datetime.datetime:
+    return datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+
+
+def compute_quarantine_interval(
+    settings: QuarantineSettings,
+    auth_failures_count: int,
+) -> datetime.timedelta:
+    exponent = auth_failures_count - settings.failures_threshold
+    interval = datetime.timedelta(
+        minutes=settings.base_interval_minutes * 2 ** exponent,
+    )
+    return min(interval, datetime.timedelta(hours=settings.max_interval_hours))
 
 
 class UserService:
@@ -22,16 +56,28 @@ class UserService:
         user_repository: UserRepository,
         password_cryptor: PasswordCryptor,
         obis_service: ObisService,
-        lesson_attendance_repository: LessonAttendanceRepository,
+        attendance_history_repository: AttendanceHistoryRepository,
         lesson_repository: LessonRepository,
         lesson_grade_repository: LessonGradeRepository,
+        exam_repository: ExamRepository,
+        exam_catalog: ExamCatalog,
+        obis_session_store: ObisSessionStore,
+        lesson_statistics_service: LessonStatisticsService,
+        course_average_service: CourseAverageService,
+        quarantine_settings: QuarantineSettings,
     ):
         self.__user_repository = user_repository
         self.__password_cryptor = password_cryptor
         self.__obis_service = obis_service
-        self.__lesson_attendance_repository = lesson_attendance_repository
+        self.__attendance_history_repository = attendance_history_repository
         self.__lesson_repository = lesson_repository
         self.__lesson_grade_repository = lesson_grade_repository
+        self.__exam_repository = exam_repository
+        self.__exam_catalog = exam_catalog
+        self.__obis_session_store = obis_session_store
+        self.__lesson_statistics_service = lesson_statistics_service
+        self.__course_average_service = course_average_service
+        self.__quarantine_settings = quarantine_settings
 
     async def save_user(
         self,
@@ -39,69 +85,220 @@ class UserService:
         user_id: int,
         student_number: str,
         password: str,
+        language_code: str | None = None,
     ) -> None:
         encrypted_password = self.__password_cryptor.encrypt(password)
         await self.__user_repository.save_user(
             user_id=user_id,
             student_number=student_number,
             encrypted_password=encrypted_password,
+            language_code=language_code,
         )
+        # the next sync checks the new credentials
+        await self.__obis_session_store.forget(student_number)
 
-    async def get_exams(self, user_id: int) -> list[LessonExams]:
+    async def __login(self, user: User) -> None:
+        plain_password = self.__password_cryptor.decrypt(
+            user.encrypted_password,
+        )
+        try:
+            await self.__obis_service.login(
+                user.student_number,
+                plain_password,
+            )
+        except ObisClientNotLoggedInError:
+            await self.__register_auth_failure(user)
+            raise
+
+    async def __register_auth_failure(self, user: User) -> None:
+        # the user may have been read from a lagging replica, the count
+        # is taken from the primary
+        auth_failures_count = await self.__user_repository.add_auth_failure(
+            user.id,
+        )
+        if auth_failures_count < self.__quarantine_settings.failures_threshold:
+            return
+
+        interval = compute_quarantine_interval(
+            self.__quarantine_settings,
+            auth_failures_count,
+        )
+        await self.__user_repository.quarantine(
+            user.id,
+            get_utc_now() + interval,
+        )
+        log.warning(
+            "User %s quarantined for %s after %d failures",
+            user.id,
+            interval,
+            auth_failures_count,
+        )
+        raise UserQuarantinedError(
+            user_id=user.id,
+            # the notification asks for new credentials
+            should_notify=(
+                self.__quarantine_settings.notify_user
+                and not user.is_quarantine_notified
+            ),
+        )
+
+    async def __fetch_from_obis[T](
+        self,
+        user: User,
+        fetch: Callable[[], Awaitable[T]],
+    ) -> T:
+        """Runs ``fetch`` in the user's last OBIS session if it is still
+        valid, and logs in otherwise.
+
+        Only rejected credentials count towards the user's quarantine.
+        OBIS errors are retried by ``ObisService`` and otherwise just fail
+        this sync, the next pass tries again.
+        """
+        if not user.has_accepted_terms:
+            raise UserNotAcceptedTermsError
+        result = await self.__fetch_in_session(user, fetch)
+        if user.auth_failures_count > 0:
+            await self.__user_repository.reset_auth_failures(user.id)
+        return result
+
+    async def __fetch_in_session[T](
+        self,
+        user: User,
+        fetch: Callable[[], Awaitable[T]],
+    ) -> T:
+        cookies = await self.__obis_session_store.get(user.student_number)
+        if cookies is not None:
+            self.__obis_service.resume_session(cookies)
+            try:
+                return await fetch()
+            except ObisSessionExpiredError:
+                log.debug("OBIS session of user %s expired", user.id)
+        await self.__login(user)
+        result = await fetch()
+        await self.__obis_session_store.save(
+            user.student_number,
+            self.__obis_service.get_session_cookies(),
+        )
+        return result
+
+    async def __get_user_with_credentials(self, user_id: int) -> User:
         user = await self.__user_repository.get_user_by_id(
             user_id=user_id,
         )
         if user is None:
             raise UserHasNoCredentialsError
-        if not user.has_accepted_terms:
-            raise UserNotAcceptedTermsError
-        plain_password = self.__password_cryptor.decrypt(
-            user.encrypted_password,
+        return user
+
+    async def get_exams(self, user_id: int) -> list[LessonExams]:
+        user = await self.__get_user_with_credentials(user_id)
+        return await self.__fetch_from_obis(
+            user,
+            self.__obis_service.get_lesson_exams,
+        )
+
+    async def get_exams_page(self, user: User) -> str:
+        """The raw taken grades page, for callers that parse it apart."""
+        return await self.__fetch_from_obis(
+            user,
+            self.__obis_service.get_taken_grades_page,
         )
-        await self.__obis_service.login(user.student_number, plain_password)
-        return await self.__obis_service.get_lesson_exams()
 
     async def get_attendance(
         self,
         user_id: int,
     ) -> list[LessonAttendance]:
-        user = await self.__user_repository.get_user_by_id(
-            user_id=user_id,
+        user = await self.__get_user_with_credentials(user_id)
+        return await self.__fetch_from_obis(
+            user,
+            lambda: self.__obis_service.get_lessons_attendance(user_id),
         )
-        if user is None:
-            raise UserHasNoCredentialsError
-        if not user.has_accepted_terms:
-            raise UserNotAcceptedTermsError
-        plain_password = self.__password_cryptor.decrypt(
-            user.encrypted_password,
+
+    async def get_attendance_page(self, user: User) -> str:
+        """The raw taken lessons page, for callers that parse it apart."""
+        return await self.__fetch_from_obis(
+            user,
+            self.__obis_service.get_lessons_attendance_page,
         )
-        await self.__obis_service.login(user.student_number, plain_password)
-        lessons_attendance_parse_result = await self.__obis_service.get_lessons_attendance()
-        return [
-            LessonAttendance(
-                user_id=user_id,
-                lesson_name=lesson.lesson_name,
-                lesson_code=lesson.lesson_code,
-                theory_skips_percentage=lesson.theory_skips_percentage,
-                practice_skips_percentage=lesson.practice_skips_percentage,
-            )
-            for lesson in lessons_attendance_parse_result
-        ]
 
     async def get_users(self) -> list[User]:
         return await self.__user_repository.get_users()
 
+    async def get_users_to_sync(
+        self,
+        *,
+        shard_index: int = 0,
+        shard_count: int = 1,
+    ) -> list[User]:
+        return await self.__user_repository.get_users_to_sync(
+            get_utc_now(),
+            shard_index=shard_index,
+            shard_count=shard_count,
+        )
+
+    async def get_user_to_sync(self, user_id: int) -> User | None:
+        """The user unless they are unknown or quarantined."""
+        user = await self.__user_repository.get_user_by_id(user_id)
+        if user is None:
+            return None
+        if (
+            user.quarantined_until is not None
+            and user.quarantined_until > get_utc_now()
+        ):
+            return None
+        return user
+
+    async def mark_quarantine_notified(self, user_id: int) -> None:
+        await self.__user_repository.mark_quarantine_notified(user_id)
+
+    async def save_dashboard(
+        self,
+        user_id: int,
+        *,
+        message_id: int,
+        content_hash: str,
+    ) -> None:
+        await self.__user_repository.update_dashboard(
+            user_id,
+            is_enabled=True,
+            message_id=message_id,
+            content_hash=content_hash,
+            updated_at=get_utc_now(),
+        )
+
+    async def disable_dashboard(self, user_id: int) -> None:
+        await self.__user_repository.update_dashboard(
+            user_id,
+            is_enabled=False,
+            message_id=None,
+            content_hash=None,
+            updated_at=None,
+        )
+
     async def get_attendance_changes(
         self,
         *,
         user_id: int,
     ) -> list[LessonAttendanceChange]:
         lessons_attendance = await self.get_attendance(user_id)
+        return await self.compute_attendance_changes(
+            user_id,
+            lessons_attendance,
+        )
+
+    async def compute_attendance_changes(
+        self,
+        user_id: int,
+        lessons_attendance: Iterable[LessonAttendance],
+    ) -> list[LessonAttendanceChange]:
+        last_attendances = (
+            await self.__attendance_history_repository.get_last_attendances(
+                user_id,
+            )
+        )
         changed_attendances: list[LessonAttendanceChange] = []
         for lesson_attendance in lessons_attendance:
-            last_attendance = await self.__lesson_attendance_repository.get_last_attendance(
-                user_id=user_id,
-                lesson_code=lesson_attendance.lesson_code,
+            last_attendance = last_attendances.get(
+                lesson_attendance.lesson_code,
             )
             no_history = last_attendance is None
             attendance_changed = last_attendance != lesson_attendance
@@ -118,16 +315,36 @@ class UserService:
         self,
         attendance_change: LessonAttendanceChange,
     ) -> None:
-        current_attendance = attendance_change.current
-        await self.__lesson_repository.create_lesson(
-            code=current_attendance.lesson_code,
-            name=current_attendance.lesson_name,
+        await self.save_attendance_changes(
+            attendance_change.current.user_id,
+            [attendance_change],
         )
-        await self.__lesson_attendance_repository.create_attendance(
-            user_id=current_attendance.user_id,
-            lesson_code=current_attendance.lesson_code,
-            theory_skips_percentage=current_attendance.theory_skips_percentage,
-            practice_skips_percentage=current_attendance.practice_skips_percentage,
+
+    async def save_attendance_changes(
+        self,
+        user_id: int,
+        attendance_changes: Iterable[LessonAttendanceChange],
+    ) -> None:
+        attendance_changes = list(attendance_changes)
+        current_attendances = [
+            attendance_change.current
+            for attendance_change in attendance_changes
+        ]
+        if not current_attendances:
+            return
+        for current_attendance in current_attendances:
+            await self.__exam_catalog.create_lesson(
+                self.__lesson_repository,
+                code=current_attendance.lesson_code,
+                name=current_attendance.lesson_name,
+            )
+        # committed along with the history rows
+        await self.__lesson_statistics_service.record_attendance_changes(
+            attendance_changes,
+        )
+        await self.__attendance_history_repository.create_attendances(
+            user_id,
+            current_attendances,
         )
 
     async def accept_terms(self, user_id: int) -> None:
@@ -139,16 +356,34 @@ class UserService:
         user_id: int,
     ) -> list[LessonGradeChange]:
         lessons_exams = await self.get_exams(user_id)
+        return await self.compute_lesson_grade_changes(user_id, lessons_exams)
+
+    async def compute_lesson_grade_changes(
+        self,
+        user_id: int,
+        lessons_exams: Iterable[LessonExams],
+    ) -> list[LessonGradeChange]:
         changes: list[LessonGradeChange] = []
         for lesson_exams in lessons_exams:
             for exam in lesson_exams.exams:
-                last_grade = await self.__lesson_grade_repository.get_last_grade(
-                    lesson_code=lesson_exams.lesson_code,
-                    user_id=user_id,
-                    exam_name=exam.name,
+                exam_id = await self.__exam_catalog.get_exam_id(
+                    self.__exam_repository,
+                    lesson_exams.lesson_code,
+                    exam.name,
                 )
+                # an exam missing from the catalog was never graded
+                last_grade = None
+                if exam_id is not None:
+                    last_grade = await self.__lesson_grade_repository.get_last_grade(
+                        user_id=user_id,
+                        exam_id=exam_id,
+                    )
                 is_first_grade = last_grade is None
-                score_changed = last_grade is not None and last_grade.score != exam.score
+                # "85" and "85.0" are the same grade, don't notify about it
+                score_changed = (
+                    last_grade is not None
+                    and parse_score(last_grade.score) != parse_score(exam.score)
+                )
                 if is_first_grade or score_changed:
                     change = LessonGradeChange(
                         user_id=user_id,
@@ -163,13 +398,24 @@ class UserService:
         return changes
 
     async def save_grade_change(self, grade_change: LessonGradeChange) -> None:
-        await self.__lesson_repository.create_lesson(
+        await self.__exam_catalog.create_lesson(
+            self.__lesson_repository,
             code=grade_change.lesson_code,
             name=grade_change.lesson_name,
         )
+        exam_id = await self.__exam_catalog.get_or_create_exam_id(
+            self.__exam_repository,
+            grade_change.lesson_code,
+            grade_change.exam_name,
+        )
+        await self.__lesson_statistics_service.record_grade_change(
+            exam_id,
+            grade_change.previous_score,
+            grade_change.current_score,
+        )
         await self.__lesson_grade_repository.create_grade(
             user_id=grade_change.user_id,
-            lesson_code=grade_change.lesson_code,
-            exam_name=grade_change.exam_name,
+            exam_id=exam_id,
             score=grade_change.current_score,
         )
+        await self.__course_average_service.forget(grade_change.user_id)
@@ -0,0 +1,23 @@
+import asyncio
+import weakref
+
+
+class UserSyncLocks:
+    """One lock per user being synced.
+
+    Keeps the periodic pass and an immediate sync from processing the same
+    user at the same time, which would announce a change twice. Locks
+    nobody holds are garbage collected.
+    """
+
+    def __init__(self):
+        self.__locks: weakref.WeakValueDictionary[int, asyncio.Lock] = (
+            weakref.WeakValueDictionary()
+        )
+
+    def get(self, user_id: int) -> asyncio.Lock:
+        lock = self.__locks.get(user_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self.__locks[user_id] = lock
+        return lock
@@ -1,8 +1,17 @@
 from dishka import Provider, Scope
 
+from repositories.attendance_alert import AttendanceAlertRepository
+from repositories.attendance_history import (
+    AttendanceHistoryRepository,
+    get_attendance_history_repository,
+)
+from repositories.exam import ExamRepository
+from repositories.history_export import HistoryExportRepository
+from repositories.history_partition import HistoryPartitionRepository
 from repositories.lesson import LessonRepository
 from repositories.lesson_attendance import LessonAttendanceRepository
 from repositories.lesson_grade import LessonGradeRepository
+from repositories.lesson_statistics import LessonStatisticsRepository
 from repositories.user import UserRepository
 
 
@@ -24,4 +33,29 @@ def repository_provider() -> Provider:
         scope=Scope.REQUEST,
         source=LessonGradeRepository,
     )
+    provider.provide(
+        scope=Scope.REQUEST,
+        source=ExamRepository,
+    )
+    provider.provide(
+        scope=Scope.REQUEST,
+        source=HistoryPartitionRepository,
+    )
+    provider.provide(
+        scope=Scope.REQUEST,
+        source=AttendanceAlertRepository,
+    )
+    provider.provide(
+        scope=Scope.REQUEST,
+        source=HistoryExportRepository,
+    )
+    provider.provide(
+        scope=Scope.REQUEST,
+        source=LessonStatisticsRepository,
+    )
+    provider.provide(
+        scope=Scope.REQUEST,
+        source=get_attendance_history_repository,
+        provides=AttendanceHistoryRepository,
+    )
     return provider
@@ -1,8 +1,28 @@
 from dishka import Provider, Scope
 
+from services.attendance_alert import AttendanceAlertService
+from services.cache import Cache, get_cache
+from services.circuit_breaker import CircuitBreaker
+from services.concurrency_limit import AdaptiveConcurrencyLimiter
+from services.course_average import CourseAverageService
 from services.crypto import PasswordCryptor
-from services.obis import ObisService, ObisHttpClient, get_obis_http_client
+from services.event_bus import EventBus, get_event_bus
+from services.exam_catalog import ExamCatalog
+from services.history_export import HistoryExportService
+from services.history_retention import HistoryRetentionService
+from services.lesson_statistics import LessonStatisticsService
+from services.obis import (
+    ObisService,
+    ObisHttpClient,
+    get_obis_http_client,
+    get_obis_circuit_breaker,
+    get_obis_concurrency_limiter,
+)
+from services.obis_session import ObisSessionStore
+from services.skip_budget import SkipBudgetEngine
+from services.sync_fingerprint import SyncFingerprints
 from services.user import UserService
+from services.user_sync_lock import UserSyncLocks
 
 
 def service_provider() -> Provider:
@@ -17,11 +37,81 @@ def service_provider() -> Provider:
         provides=UserService,
         source=UserService,
     )
+    provider.provide(
+        scope=Scope.APP,
+        provides=SkipBudgetEngine,
+        source=SkipBudgetEngine,
+    )
+    provider.provide(
+        scope=Scope.APP,
+        provides=UserSyncLocks,
+        source=UserSyncLocks,
+    )
+    provider.provide(
+        scope=Scope.APP,
+        provides=ExamCatalog,
+        source=ExamCatalog,
+    )
+    provider.provide(
+        scope=Scope.APP,
+        provides=Cache,
+        source=get_cache,
+    )
+    provider.provide(
+        scope=Scope.APP,
+        provides=CourseAverageService,
+        source=CourseAverageService,
+    )
+    provider.provide(
+        scope=Scope.APP,
+        provides=ObisSessionStore,
+        source=ObisSessionStore,
+    )
+    provider.provide(
+        scope=Scope.APP,
+        provides=SyncFingerprints,
+        source=SyncFingerprints,
+    )
+    provider.provide(
+        scope=Scope.APP,
+        provides=EventBus,
+        source=get_event_bus,
+    )
+    provider.provide(
+        scope=Scope.REQUEST,
+        provides=AttendanceAlertService,
+        source=AttendanceAlertService,
+    )
+    provider.provide(
+        scope=Scope.REQUEST,
+        provides=HistoryRetentionService,
+        source=HistoryRetentionService,
+    )
+    provider.provide(
+        scope=Scope.REQUEST,
+        provides=HistoryExportService,
+        source=HistoryExportService,
+    )
+    provider.provide(
+        scope=Scope.REQUEST,
+        provides=LessonStatisticsService,
+        source=LessonStatisticsService,
+    )
     provider.provide(
         scope=Scope.REQUEST,
         provides=ObisService,
         source=ObisService,
     )
+    provider.provide(
+        scope=Scope.APP,
+        provides=CircuitBreaker,
+        source=get_obis_circuit_breaker,
+    )
+    provider.provide(
+        scope=Scope.APP,
+        provides=AdaptiveConcurrencyLimiter,
+        source=get_obis_concurrency_limiter,
+    )
     provider.provide(
         scope=Scope.REQUEST,
         provides=ObisHttpClient,
@@ -4,6 +4,17 @@ from pydantic import PostgresDsn
 from services.crypto import CryptographySecretKey
 from services.telegram_bot import TelegramBotToken
 from setup.settings.app import AppSettings
+from setup.settings.cache import CacheSettings
+from setup.settings.dashboard import DashboardSettings
+from setup.settings.database import DatabaseSettings
+from setup.settings.event_bus import EventBusSettings
+from setup.settings.grading import GradingSettings
+from setup.settings.obis import ObisSettings, QuarantineSettings
+from setup.settings.skip_budget import SkipBudgetSettings
+from setup.settings.storage import StorageSettings
+from setup.settings.sync_pipeline import SyncPipelineSettings
+from setup.settings.telegram_bot import TelegramBotSettings
+from setup.settings.worker import WorkerSettings
 
 
 class SettingsProvider(Provider):
@@ -18,6 +29,13 @@ class SettingsProvider(Provider):
     ) -> TelegramBotToken:
         return TelegramBotToken(settings.telegram_bot.token)
 
+    @provide
+    def provide_telegram_bot_settings(
+        self,
+        settings: AppSettings,
+    ) -> TelegramBotSettings:
+        return settings.telegram_bot
+
     @provide
     def provide_cryptography_secret_key(
         self,
@@ -30,4 +48,81 @@ class SettingsProvider(Provider):
         self,
         settings: AppSettings,
     ) -> PostgresDsn:
-        return settings.database.postgres_dsn
\ No newline at end of file
+        return settings.database.postgres_dsn
+
+    @provide
+    def provide_database_settings(
+        self,
+        settings: AppSettings,
+    ) -> DatabaseSettings:
+        return settings.database
+
+    @provide
+    def provide_obis_settings(
+        self,
+        settings: AppSettings,
+    ) -> ObisSettings:
+        return settings.obis
+
+    @provide
+    def provide_quarantine_settings(
+        self,
+        settings: AppSettings,
+    ) -> QuarantineSettings:
+        return settings.obis.quarantine
+
+    @provide
+    def provide_storage_settings(
+        self,
+        settings: AppSettings,
+    ) -> StorageSettings:
+        return settings.storage
+
+    @provide
+    def provide_skip_budget_settings(
+        self,
+        settings: AppSettings,
+    ) -> SkipBudgetSettings:
+        return settings.skip_budget
+
+    @provide
+    def provide_grading_settings(
+        self,
+        settings: AppSettings,
+    ) -> GradingSettings:
+        return settings.grading
+
+    @provide
+    def provide_dashboard_settings(
+        self,
+        settings: AppSettings,
+    ) -> DashboardSettings:
+        return settings.dashboard
+
+    @provide
+    def provide_worker_settings(
+        self,
+        settings: AppSettings,
+    ) -> WorkerSettings:
+        return settings.worker
+
+    @provide
+    def provide_event_bus_settings(
+        self,
+        settings: AppSettings,
+    ) -> EventBusSettings:
+        return settings.event_bus
+
+    @provide
+    def provide_sync_pipeline_settings(
+        self,
+        settings: AppSettings,
+    ) -> SyncPipelineSettings:
+        return settings.sync_pipeline
+
+    @provide
+    def provide_cache_settings(
+        self,
+        settings: AppSettings,
+    ) -> CacheSettings:
+        return settings.cache
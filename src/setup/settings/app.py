@@ -4,15 +4,33 @@ from typing import Self
 
 from pydantic import BaseModel
 
+from setup.settings.cache import CacheSettings
 from setup.settings.cryptography import CryptographySettings
+from setup.settings.dashboard import DashboardSettings
 from setup.settings.database import DatabaseSettings
+from setup.settings.event_bus import EventBusSettings
+from setup.settings.grading import GradingSettings
+from setup.settings.obis import ObisSettings
+from setup.settings.skip_budget import SkipBudgetSettings
+from setup.settings.storage import StorageSettings
+from setup.settings.sync_pipeline import SyncPipelineSettings
 from setup.settings.telegram_bot import TelegramBotSettings
+from setup.settings.worker import WorkerSettings
 
 
 class AppSettings(BaseModel):
     telegram_bot: TelegramBotSettings
     cryptography: CryptographySettings
     database: DatabaseSettings
+    obis: ObisSettings = ObisSettings()
+    storage: StorageSettings = StorageSettings()
+    skip_budget: SkipBudgetSettings = SkipBudgetSettings()
+    grading: GradingSettings = GradingSettings()
+    dashboard: DashboardSettings = DashboardSettings()
+    worker: WorkerSettings = WorkerSettings()
+    event_bus: EventBusSettings = EventBusSettings()
+    sync_pipeline: SyncPipelineSettings = SyncPipelineSettings()
+    cache: CacheSettings = CacheSettings()
 
     @classmethod
     def from_settings_toml_file(cls) -> Self:
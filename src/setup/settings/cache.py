@@ -0,0 +1,22 @@
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+
+class CacheSettings(BaseModel):
+    # "memory" is per process, "redis" shares entries between the bot and
+    # its workers and needs `uv sync --extra redis`
+    backend: Literal["memory", "redis"] = "memory"
+    # entries the in-memory backend keeps before evicting the least
+    # recently used one
+    max_entries: int = Field(default=100_000, ge=1)
+    # seconds an entry lives unless it is stored with its own
+    default_ttl: float = Field(default=6 * 60 * 60, gt=0)
+    redis_url: str = "redis://localhost:6379/0"
+    # prepended to every key, so several deployments can share a Redis
+    key_prefix: str = "yoklama:"
+    # how the Redis backend stores values; "orjson" and "msgpack" need
+    # the extra of the same name
+    serializer: Literal["json", "orjson", "msgpack"] = "json"
+    # seconds an OBIS login is reused before logging in again
+    obis_session_ttl: float = Field(default=15 * 60, ge=0)
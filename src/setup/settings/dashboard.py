@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+
+class DashboardSettings(BaseModel):
+    # changes arriving within this window after an edit are folded into
+    # the next edit instead of editing the pinned message again
+    coalesce_window_seconds: int = 600
@@ -1,20 +1,125 @@
-from pydantic import BaseModel, PostgresDsn
+import uuid
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field, PostgresDsn
+
+
+def get_unique_prepared_statement_name() -> str:
+    """PgBouncer in transaction mode can hand a connection's prepared
+    statements to another client, whose names must not collide with
+    them."""
+    return f"__asyncpg_{uuid.uuid4()}__"
+
+
+class SqliteSettings(BaseModel):
+    path: str = "yoklama.sqlite3"
+    # NORMAL only syncs the WAL at checkpoints: a power loss may drop the
+    # last commits but never corrupts the file
+    synchronous: Literal["OFF", "NORMAL", "FULL"] = "NORMAL"
+    # seconds a writer waits for another one to commit
+    busy_timeout: float = 5
+    # page cache per connection, in KiB
+    cache_size: int = Field(default=16_384, ge=0)
+    # bytes of the file read through mmap, 0 turns it off
+    mmap_size: int = Field(default=256 * 1024 * 1024, ge=0)
 
 
 class DatabaseSettings(BaseModel):
-    host: str
-    port: int
-    user: str
-    password: str
-    name: str
+    # "sqlite" is for single-process deployments and benchmarks: the
+    # schema is created from the models instead of the migrations, and
+    # history partitioning and the Postgres event bus are unavailable
+    backend: Literal["postgres", "sqlite"] = "postgres"
+    sqlite: SqliteSettings = SqliteSettings()
 
-    @property
-    def postgres_dsn(self) -> PostgresDsn:
+    host: str = "localhost"
+    port: int = 5432
+    user: str = "postgres"
+    password: str = ""
+    name: str = "yoklama"
+    # "asyncpg" needs the optional dependency: uv sync --extra asyncpg
+    driver: Literal["psycopg", "asyncpg"] = "psycopg"
+
+    # connections kept open, plus the ones opened on demand past them
+    pool_size: int = Field(default=5, ge=1)
+    max_overflow: int = Field(default=10, ge=0)
+    # seconds to wait for a free connection before failing
+    pool_timeout: float = 30
+    # seconds after which a connection is reopened, -1 keeps it forever
+    pool_recycle: int = -1
+    # test connections on checkout, costs a round trip each time
+    pool_pre_ping: bool = False
+    # compiled SQL kept per engine by SQLAlchemy
+    query_cache_size: int = Field(default=500, ge=0)
+
+    # Server-side prepared statements. psycopg prepares a query once it
+    # ran prepare_threshold times on a connection, asyncpg prepares all of
+    # them; either keeps prepared_statements_cache_size per connection.
+    # Set use_prepared_statements to false behind PgBouncer in transaction
+    # mode: asyncpg then caches no statements and names the ones it still
+    # prepares uniquely.
+    use_prepared_statements: bool = True
+    prepare_threshold: int = Field(default=1, ge=0)
+    prepared_statements_cache_size: int = Field(default=100, ge=1)
+
+    # Streaming replica for reads that tolerate lag, with the same user,
+    # password and database as the primary. Reads from a session that
+    # already wrote stay on the primary.
+    replica_host: str | None = None
+    # the primary's port when unset
+    replica_port: int | None = None
+
+    def __build_dsn(self, host: str, port: int) -> PostgresDsn:
         return PostgresDsn.build(
-            scheme="postgresql+psycopg",
+            scheme=f"postgresql+{self.driver}",
             password=self.password,
-            host=self.host,
-            port=self.port,
+            host=host,
+            port=port,
             path=self.name,
             username=self.user,
         )
+
+    @property
+    def postgres_dsn(self) -> PostgresDsn:
+        return self.__build_dsn(self.host, self.port)
+
+    @property
+    def url(self) -> str:
+        if self.backend == "sqlite":
+            return f"sqlite+aiosqlite:///{self.sqlite.path}"
+        return str(self.postgres_dsn)
+
+    @property
+    def replica_dsn(self) -> PostgresDsn | None:
+        if self.backend == "sqlite" or self.replica_host is None:
+            return None
+        return self.__build_dsn(
+            self.replica_host,
+            self.replica_port or self.port,
+        )
+
+    @property
+    def connect_args(self) -> dict[str, Any]:
+        """Driver specific prepared statement options."""
+        if self.backend == "sqlite":
+            return {}
+        if self.driver == "asyncpg":
+            if not self.use_prepared_statements:
+                return {
+                    "prepared_statement_cache_size": 0,
+                    "statement_cache_size": 0,
+                    "prepared_statement_name_func": (
+                        get_unique_prepared_statement_name
+                    ),
+                }
+            return {
+                "prepared_statement_cache_size": (
+                    self.prepared_statements_cache_size
+                ),
+            }
+        return {
+            "prepare_threshold": (
+                self.prepare_threshold
+                if self.use_prepared_statements
+                else None
+            ),
+        }
@@ -0,0 +1,14 @@
+from typing import Literal
+
+from pydantic import BaseModel
+
+
+class EventBusSettings(BaseModel):
+    # "postgres" delivers sync requests to workers in other processes over
+    # LISTEN/NOTIFY, "memory" only within the process that published them
+    backend: Literal["postgres", "memory"] = "postgres"
+    channel: str = "yoklama_sync_requests"
+    # immediate syncs run next to the periodic pass, at most this many
+    max_concurrent_syncs: int = 4
+    # delay before listening again after the connection was lost
+    reconnect_delay: float = 5
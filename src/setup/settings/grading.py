@@ -0,0 +1,22 @@
+from pydantic import BaseModel, Field
+
+
+class CourseGradingSettings(BaseModel):
+    # exam name as OBIS shows it -> share of the course grade in percent;
+    # exams left out don't count towards the average
+    weights: dict[str, float] = {"Ara Sınav": 40, "Final": 60}
+    final_exam_name: str = "Final"
+    # takes the place of the final exam once it is graded
+    makeup_exam_name: str | None = "Bütünleme"
+    passing_average: float = 50
+    # the final exam alone has to reach this too
+    minimum_final_score: float = 0
+    max_score: float = Field(default=100, gt=0)
+
+
+class GradingSettings(BaseModel):
+    default: CourseGradingSettings = CourseGradingSettings()
+    courses: dict[str, CourseGradingSettings] = {}
+
+    def get_course(self, lesson_code: str) -> CourseGradingSettings:
+        return self.courses.get(lesson_code, self.default)
@@ -0,0 +1,39 @@
+from pydantic import BaseModel, HttpUrl
+
+
+class CircuitBreakerSettings(BaseModel):
+    window_size: int = 20
+    minimum_requests: int = 10
+    failure_rate_threshold: float = 0.5
+    slow_request_threshold: float = 10
+    open_duration: float = 60
+
+
+class ConcurrencyLimitSettings(BaseModel):
+    initial_limit: int = 4
+    min_limit: int = 1
+    max_limit: int = 32
+    latency_target: float = 2
+    backoff_ratio: float = 0.7
+
+
+class RetrySettings(BaseModel):
+    attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 5
+
+
+class QuarantineSettings(BaseModel):
+    failures_threshold: int = 3
+    base_interval_minutes: int = 30
+    max_interval_hours: int = 24 * 7
+    notify_user: bool = True
+
+
+class ObisSettings(BaseModel):
+    base_url: HttpUrl = HttpUrl("https://obistest.manas.edu.kg/")
+    timeout: float = 30
+    circuit_breaker: CircuitBreakerSettings = CircuitBreakerSettings()
+    concurrency_limit: ConcurrencyLimitSettings = ConcurrencyLimitSettings()
+    retry: RetrySettings = RetrySettings()
+    quarantine: QuarantineSettings = QuarantineSettings()
@@ -0,0 +1,25 @@
+import datetime
+
+from pydantic import BaseModel
+
+
+class CourseSkipBudgetSettings(BaseModel):
+    theory_threshold: float = 30
+    practice_threshold: float = 20
+    weeks: int = 16
+    lessons_per_week: int = 1
+
+    @property
+    def skip_percentage_per_lesson(self) -> float:
+        return 100 / (self.weeks * self.lessons_per_week)
+
+
+class SkipBudgetSettings(BaseModel):
+    default: CourseSkipBudgetSettings = CourseSkipBudgetSettings()
+    courses: dict[str, CourseSkipBudgetSettings] = {}
+    semester_start: datetime.date | None = None
+    # users are warned once a lesson has this many skips left or fewer
+    alert_remaining_skips: int = 1
+
+    def get_course(self, lesson_code: str) -> CourseSkipBudgetSettings:
+        return self.courses.get(lesson_code, self.default)
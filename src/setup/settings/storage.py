@@ -0,0 +1,10 @@
+from typing import Literal
+
+from pydantic import BaseModel
+
+
+class StorageSettings(BaseModel):
+    attendance_mode: Literal["rows", "snapshots"] = "rows"
+    snapshot_keyframe_interval: int = 16
+    history_partitions_ahead: int = 3
+    history_retention_months: int | None = None
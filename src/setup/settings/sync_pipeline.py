@@ -0,0 +1,15 @@
+from pydantic import BaseModel, Field
+
+
+class SyncPipelineSettings(BaseModel):
+    # workers per stage of a periodic sync pass; every worker of the
+    # fetch, diff, notify and persist stages holds its own database
+    # session, keep their sum within the connection pool
+    fetch_concurrency: int = Field(default=4, ge=1)
+    # pages parsed at once, each in a worker thread off the event loop
+    parse_concurrency: int = Field(default=1, ge=1)
+    diff_concurrency: int = Field(default=1, ge=1)
+    notify_concurrency: int = Field(default=2, ge=1)
+    persist_concurrency: int = Field(default=1, ge=1)
+    # users waiting between two stages before the earlier one blocks
+    queue_size: int = Field(default=8, ge=1)
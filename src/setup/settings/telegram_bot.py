@@ -1,7 +1,43 @@
-from pydantic import BaseModel
+from typing import Self
+
+from pydantic import BaseModel, Field, HttpUrl, SecretStr, model_validator
 
 from services.telegram_bot import TelegramBotToken
 
 
+class WebhookSettings(BaseModel):
+    # public HTTPS address Telegram posts updates to, usually a reverse
+    # proxy forwarding to host:port and path
+    url: HttpUrl
+    host: str = "127.0.0.1"
+    port: int = 8080
+    path: str = "/telegram/webhook"
+    # sent back by Telegram in X-Telegram-Bot-Api-Secret-Token
+    secret_token: SecretStr = Field(min_length=1, max_length=256)
+    # simultaneous connections Telegram opens to the webhook
+    max_connections: int = 40
+    drop_pending_updates: bool = False
+
+    @model_validator(mode="after")
+    def check_secret_token(self) -> Self:
+        secret_token = self.secret_token.get_secret_value()
+        if not all(char.isascii() and (char.isalnum() or char in "_-")
+                   for char in secret_token):
+            raise ValueError(
+                "secret_token may only contain A-Z, a-z, 0-9, _ and -",
+            )
+        return self
+
+
 class TelegramBotSettings(BaseModel):
     token: TelegramBotToken
+    # updates handled at the same time, both when polling and behind the
+    # webhook; further updates wait for a free slot
+    max_concurrent_updates: int = 100
+    # time given to in-flight updates and scheduler jobs on shutdown
+    # before they are cancelled
+    shutdown_timeout: float = 30
+    # Telegram user ids allowed to run admin commands such as /export
+    admin_ids: list[int] = []
+    # long polling is used when this section is missing
+    webhook: WebhookSettings | None = None
@@ -0,0 +1,21 @@
+from typing import Self
+
+from pydantic import BaseModel, model_validator
+
+
+class WorkerSettings(BaseModel):
+    # users are split between sync workers by id modulo shard_count, each
+    # worker is started with its own shard_index
+    shard_index: int = 0
+    shard_count: int = 1
+
+    @model_validator(mode="after")
+    def check_shard_index(self) -> Self:
+        if not 0 <= self.shard_index < self.shard_count:
+            raise ValueError("shard_index must be in [0, shard_count)")
+        return self
+
+    @property
+    def is_primary(self) -> bool:
+        """Jobs over the whole database run on the first shard only."""
+        return self.shard_index == 0
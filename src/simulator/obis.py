@@ -0,0 +1,288 @@
+import asyncio
+import random
+import secrets
+from dataclasses import dataclass, field
+from http.cookies import SimpleCookie
+from urllib.parse import parse_qs
+
+import httpx
+
+
+OBIS_BASE_URL = "https://obistest.manas.edu.kg/"
+
+LESSON_NAMES = (
+    "Algoritmalar ve Programlama",
+    "Veri Tabanı Sistemleri",
+    "Bilgisayar Ağları",
+    "İşletim Sistemleri",
+    "Lineer Cebir",
+    "Diferansiyel Denklemler",
+    "Kırgız Dili",
+    "Türk Dili ve Edebiyatı",
+    "İngilizce",
+    "Fizik",
+)
+EXAM_NAMES = ("Ara Sınav", "Final", "Bütünleme")
+SKIP_PERCENTAGE_STEP = 6.25
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class FakeObisConfig:
+    students_count: int = 100
+    lessons_per_student: int = 6
+    latency: float = 0.05
+    latency_jitter: float = 0.02
+    error_rate: float = 0.0
+    change_rate: float = 0.05
+    seed: int = 0
+
+
+@dataclass(slots=True, kw_only=True)
+class SyntheticLesson:
+    code: str
+    name: str
+    theory_skips_percentage: float | None
+    practice_skips_percentage: float | None
+    exams: dict[str, str | None]
+
+
+@dataclass(slots=True, kw_only=True)
+class SyntheticStudent:
+    student_number: str
+    password: str
+    lessons: list[SyntheticLesson]
+
+
+@dataclass(slots=True)
+class FakeObisStats:
+    requests_count: int = 0
+    failed_requests_count: int = 0
+    logins_count: int = 0
+    changes_count: int = 0
+    requests_by_path: dict[str, int] = field(default_factory=dict)
+
+
+def get_session_id(request: httpx.Request) -> str:
+    cookie = SimpleCookie(request.headers.get("Cookie", ""))
+    morsel = cookie.get("PHPSESSID")
+    return morsel.value if morsel is not None else ""
+
+
+def get_synthetic_student_number(index: int) -> str:
+    return f"{2000000 + index:09d}"
+
+
+def get_synthetic_password(index: int) -> str:
+    return f"password-{index}"
+
+
+def render_login_page(csrf_token: str, error: bool = False) -> str:
+    error_block = (
+        '<div class="alert">Incorrect username or password.</div>'
+        if error else ""
+    )
+    return (
+        "<html><body>"
+        f"{error_block}"
+        '<form action="/site/login" method="post">'
+        f'<input type="hidden" name="_csrf" value="{csrf_token}">'
+        '<input name="LoginForm[username]">'
+        '<input name="LoginForm[password_hash]" type="password">'
+        "</form>"
+        "</body></html>"
+    )
+
+
+def format_percentage(value: float | None) -> str:
+    if value is None:
+        return "-"
+    return f"%{value:g}"
+
+
+def render_taken_lessons_page(student: SyntheticStudent) -> str:
+    rows = [
+        "<tr>"
+        "<th>#</th><th>Kod</th><th>Ders</th><th>Kredi</th>"
+        "<th>Teori</th><th>Teori saat</th><th>Pratik</th>"
+        "<th>Pratik saat</th><th>Durum</th>"
+        "</tr>"
+    ]
+    for number, lesson in enumerate(student.lessons, start=1):
+        rows.append(
+            "<tr>"
+            f"<td>{number}</td>"
+            f"<td>{lesson.code}</td>"
+            f"<td>{lesson.name}</td>"
+            "<td>4</td>"
+            f"<td>{format_percentage(lesson.theory_skips_percentage)}</td>"
+            "<td>2</td>"
+            f"<td>{format_percentage(lesson.practice_skips_percentage)}</td>"
+            "<td>2</td>"
+            "<td>Devam</td>"
+            "</tr>"
+        )
+    return f"<html><body><table>{''.join(rows)}</table></body></html>"
+
+
+def render_taken_grades_page(student: SyntheticStudent) -> str:
+    rows: list[str] = []
+    for number, lesson in enumerate(student.lessons, start=1):
+        exams = list(lesson.exams.items())
+        first_exam_name, first_score = exams[0]
+        rows.append(
+            "<tr>"
+            f'<td rowspan="{len(exams)}">{number}</td>'
+            f"<td>{lesson.code}</td>"
+            f"<td>{lesson.name}</td>"
+            f"<td>{first_exam_name}</td>"
+            f"<td>{first_score or ''}</td>"
+            "</tr>"
+        )
+        for exam_name, score in exams[1:]:
+            rows.append(f"<tr><td>{exam_name}</td><td>{score or ''}</td></tr>")
+    return (
+        "<html><body><table>"
+        "<thead><tr><th>#</th><th>Kod</th><th>Ders</th>"
+        "<th>Sınav</th><th>Not</th></tr></thead>"
+        f"<tbody>{''.join(rows)}</tbody>"
+        "</table></body></html>"
+    )
+
+
+class FakeObis:
+    """In-process stand-in for OBIS served through ``httpx.MockTransport``.
+
+    Serves the login form with a CSRF token, the taken lessons page and the
+    taken grades page for synthetic students. Every request is delayed by the
+    configured latency, fails with HTTP 500 at the configured error rate, and
+    every data page view mutates the student's data at the configured change
+    rate.
+    """
+
+    def __init__(self, config: FakeObisConfig):
+        self.config = config
+        self.stats = FakeObisStats()
+        self.__random = random.Random(config.seed)
+        self.__csrf_tokens: set[str] = set()
+        self.__sessions: dict[str, SyntheticStudent] = {}
+        self.__students: dict[str, SyntheticStudent] = {}
+        for index in range(config.students_count):
+            student = self.__create_student(index)
+            self.__students[student.student_number] = student
+
+    @property
+    def students(self) -> list[SyntheticStudent]:
+        return list(self.__students.values())
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    def __create_student(self, index: int) -> SyntheticStudent:
+        lesson_indexes = self.__random.sample(
+            range(len(LESSON_NAMES)),
+            k=min(self.config.lessons_per_student, len(LESSON_NAMES)),
+        )
+        lessons = [
+            SyntheticLesson(
+                code=f"MNS-{101 + i}",
+                name=LESSON_NAMES[i],
+                theory_skips_percentage=(
+                    self.__random.randint(0, 4) * SKIP_PERCENTAGE_STEP
+                ),
+                practice_skips_percentage=(
+                    self.__random.choice((None, 0.0, SKIP_PERCENTAGE_STEP))
+                ),
+                exams={exam_name: None for exam_name in EXAM_NAMES},
+            )
+            for i in lesson_indexes
+        ]
+        return SyntheticStudent(
+            student_number=get_synthetic_student_number(index),
+            password=get_synthetic_password(index),
+            lessons=lessons,
+        )
+
+    def __mutate(self, student: SyntheticStudent) -> None:
+        if self.__random.random() >= self.config.change_rate:
+            return
+        self.stats.changes_count += 1
+        lesson = self.__random.choice(student.lessons)
+        if self.__random.random() < 0.5:
+            exam_name = self.__random.choice(EXAM_NAMES)
+            lesson.exams[exam_name] = str(self.__random.randint(0, 100))
+        elif lesson.theory_skips_percentage is not None:
+            lesson.theory_skips_percentage = min(
+                100.0,
+                lesson.theory_skips_percentage + SKIP_PERCENTAGE_STEP,
+            )
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        self.stats.requests_count += 1
+        self.stats.requests_by_path[path] = (
+            self.stats.requests_by_path.get(path, 0) + 1
+        )
+
+        latency = self.config.latency + self.__random.uniform(
+            0, self.config.latency_jitter,
+        )
+        if latency > 0:
+            await asyncio.sleep(latency)
+
+        if self.__random.random() < self.config.error_rate:
+            self.stats.failed_requests_count += 1
+            return httpx.Response(500, text="Internal Server Error")
+
+        if path == "/site/login":
+            if request.method == "POST":
+                return self.__handle_login(request)
+            return self.__login_page()
+
+        student = self.__sessions.get(get_session_id(request))
+        if student is None:
+            return httpx.Response(302, headers={"Location": "/site/login"})
+
+        if path == "/vs-ders/taken-lessons":
+            self.__mutate(student)
+            return httpx.Response(200, text=render_taken_lessons_page(student))
+        if path == "/vs-ders/taken-grades":
+            self.__mutate(student)
+            return httpx.Response(200, text=render_taken_grades_page(student))
+        if path == "/":
+            return httpx.Response(200, text="<html><body>OBIS</body></html>")
+        return httpx.Response(404, text="Not Found")
+
+    def __login_page(self, error: bool = False) -> httpx.Response:
+        csrf_token = secrets.token_urlsafe(16)
+        self.__csrf_tokens.add(csrf_token)
+        return httpx.Response(
+            200,
+            text=render_login_page(csrf_token, error=error),
+        )
+
+    def __handle_login(self, request: httpx.Request) -> httpx.Response:
+        self.stats.logins_count += 1
+        form = {
+            key: values[0]
+            for key, values in parse_qs(request.content.decode()).items()
+        }
+        csrf_token = form.get("_csrf")
+        if csrf_token not in self.__csrf_tokens:
+            return httpx.Response(400, text="Bad Request")
+        self.__csrf_tokens.discard(csrf_token)
+
+        student = self.__students.get(form.get("LoginForm[username]", ""))
+        if student is None or student.password != form.get(
+            "LoginForm[password_hash]",
+        ):
+            return self.__login_page(error=True)
+
+        session_id = secrets.token_hex(16)
+        self.__sessions[session_id] = student
+        return httpx.Response(
+            302,
+            headers={
+                "Location": "/",
+                "Set-Cookie": f"PHPSESSID={session_id}; Path=/",
+            },
+        )
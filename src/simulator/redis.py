@@ -0,0 +1,192 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+
+
+@dataclass(slots=True)
+class FakeRedisStats:
+    connections_count: int = 0
+    commands_count: int = 0
+    commands_by_name: dict[str, int] = field(default_factory=dict)
+
+
+class RespError(Exception):
+    pass
+
+
+def encode_reply(reply: object, *, protocol: int = 2) -> bytes:
+    """RESP encoding of ``reply``; dicts become maps with ``protocol`` 3
+    and flat arrays of keys and values with 2."""
+    if reply is None:
+        return b"$-1\r\n" if protocol == 2 else b"_\r\n"
+    if isinstance(reply, RespError):
+        return b"-" + str(reply).encode() + b"\r\n"
+    if isinstance(reply, int):
+        return b":%d\r\n" % reply
+    if isinstance(reply, str):
+        return b"+" + reply.encode() + b"\r\n"
+    if isinstance(reply, bytes):
+        return b"$%d\r\n%s\r\n" % (len(reply), reply)
+    if isinstance(reply, list):
+        return b"*%d\r\n" % len(reply) + b"".join(
+            encode_reply(item, protocol=protocol) for item in reply
+        )
+    if isinstance(reply, dict):
+        items = [item for pair in reply.items() for item in pair]
+        if protocol == 2:
+            return encode_reply(items)
+        return b"%%%d\r\n" % len(reply) + b"".join(
+            encode_reply(item, protocol=protocol) for item in items
+        )
+    raise TypeError(f"no RESP encoding for {reply!r}")
+
+
+async def read_command(reader: asyncio.StreamReader) -> list[bytes] | None:
+    """A command sent as a RESP array of bulk strings, None once the
+    client is gone."""
+    line = await reader.readline()
+    if not line:
+        return None
+    if not line.startswith(b"*"):
+        # inline command, as typed into telnet
+        return line.split()
+    arguments = []
+    for _ in range(int(line[1:])):
+        length_line = await reader.readline()
+        length = int(length_line[1:])
+        data = await reader.readexactly(length + 2)
+        arguments.append(data[:-2])
+    return arguments
+
+
+class FakeRedisServer:
+    """In-process server for the subset of the Redis protocol the cache
+    uses: GET, SET with EX/PX/NX/XX, DEL, EXISTS, PING, SELECT, FLUSHDB
+    and the HELLO and CLIENT handshake of redis-py, in RESP2 and RESP3.
+
+    Start it with ``async with FakeRedisServer() as server`` and connect
+    to ``server.url``.
+    """
+
+    def __init__(self, *, latency: float = 0.0):
+        self.latency = latency
+        self.stats = FakeRedisStats()
+        # key -> (value, expires at or None)
+        self.__values: dict[bytes, tuple[bytes, float | None]] = {}
+        self.__server: asyncio.Server | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.__server.sockets[0].getsockname()[:2]
+        return f"redis://{host}:{port}/0"
+
+    async def __aenter__(self) -> "FakeRedisServer":
+        self.__server = await asyncio.start_server(
+            self.__handle_connection,
+            host="127.0.0.1",
+            port=0,
+        )
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.__server.close()
+        await self.__server.wait_closed()
+
+    async def __handle_connection(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        self.stats.connections_count += 1
+        protocol = 2
+        try:
+            while (command := await read_command(reader)) is not None:
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                reply = self.__execute(command)
+                if command[0].upper() == b"HELLO" and isinstance(reply, dict):
+                    protocol = reply["proto"]
+                writer.write(encode_reply(reply, protocol=protocol))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def __get(self, key: bytes) -> bytes | None:
+        entry = self.__values.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.__values[key]
+            return None
+        return value
+
+    def __execute(self, command: list[bytes]) -> object:
+        if not command:
+            return RespError("ERR empty command")
+        name = command[0].decode().upper()
+        arguments = command[1:]
+        self.stats.commands_count += 1
+        self.stats.commands_by_name[name] = (
+            self.stats.commands_by_name.get(name, 0) + 1
+        )
+        match name:
+            case "PING":
+                return arguments[0] if arguments else "PONG"
+            case "GET":
+                return self.__get(arguments[0])
+            case "SET":
+                return self.__set(arguments)
+            case "DEL":
+                return sum(
+                    self.__values.pop(key, None) is not None
+                    for key in arguments
+                )
+            case "EXISTS":
+                return sum(self.__get(key) is not None for key in arguments)
+            case "HELLO":
+                protocol = int(arguments[0]) if arguments else 2
+                if protocol not in (2, 3):
+                    return RespError("NOPROTO unsupported protocol version")
+                return {
+                    "server": "redis",
+                    "version": "7.2.0",
+                    "proto": protocol,
+                    "mode": "standalone",
+                    "role": "master",
+                }
+            case "FLUSHDB":
+                self.__values.clear()
+                return "OK"
+            case "SELECT" | "CLIENT":
+                return "OK"
+        return RespError(f"ERR unknown command '{name}'")
+
+    def __set(self, arguments: list[bytes]) -> object:
+        key, value, *options = arguments
+        expires_at = None
+        only_if_missing = only_if_present = False
+        options_iterator = iter(options)
+        for option in options_iterator:
+            match option.upper():
+                case b"EX":
+                    expires_at = time.monotonic() + int(next(options_iterator))
+                case b"PX":
+                    expires_at = (
+                        time.monotonic() + int(next(options_iterator)) / 1000
+                    )
+                case b"NX":
+                    only_if_missing = True
+                case b"XX":
+                    only_if_present = True
+                case _:
+                    return RespError("ERR syntax error")
+        is_present = self.__get(key) is not None
+        if (only_if_missing and is_present) or (
+            only_if_present and not is_present
+        ):
+            return None
+        self.__values[key] = (value, expires_at)
+        return "OK"
@@ -0,0 +1,151 @@
+import asyncio
+import json
+import random
+import time
+from collections.abc import AsyncGenerator
+from contextlib import suppress
+from dataclasses import dataclass, field
+from typing import Any
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import TelegramMethod
+from aiogram.methods.base import TelegramType
+
+
+FAKE_TELEGRAM_BOT_TOKEN = "123456789:AAFakeTokenForTheTelegramSimulator00"
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class FakeTelegramConfig:
+    latency: float = 0.01
+    error_rate: float = 0.0
+    seed: int = 0
+
+
+@dataclass(slots=True)
+class FakeTelegramStats:
+    requests_count: int = 0
+    failed_requests_count: int = 0
+    requests_by_method: dict[str, int] = field(default_factory=dict)
+
+
+class FakeTelegramSession(BaseSession):
+    """Bot API session that answers requests in-process.
+
+    Replies are validated by aiogram exactly like real Bot API responses,
+    so the bot code under test cannot tell the difference.
+    """
+
+    def __init__(self, config: FakeTelegramConfig | None = None):
+        super().__init__()
+        self.config = config or FakeTelegramConfig()
+        self.stats = FakeTelegramStats()
+        self.__random = random.Random(self.config.seed)
+        self.__message_id = 0
+        self.__update_id = 0
+        self.__pending_updates: list[dict[str, Any]] = []
+        self.__updates_available = asyncio.Event()
+
+    def push_update(self, update: dict[str, Any]) -> None:
+        """Queues an update for the next ``getUpdates`` call, as if a user
+        had written to the bot."""
+        self.__update_id += 1
+        self.__pending_updates.append({"update_id": self.__update_id, **update})
+        self.__updates_available.set()
+
+    async def close(self) -> None:
+        pass
+
+    async def stream_content(
+        self,
+        url: str,
+        headers: dict[str, Any] | None = None,
+        timeout: int = 30,
+        chunk_size: int = 65536,
+        raise_for_status: bool = True,
+    ) -> AsyncGenerator[bytes, None]:
+        yield b""
+
+    async def make_request(
+        self,
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+        timeout: int | None = None,
+    ) -> TelegramType:
+        api_method = method.__api_method__
+        self.stats.requests_count += 1
+        self.stats.requests_by_method[api_method] = (
+            self.stats.requests_by_method.get(api_method, 0) + 1
+        )
+
+        if self.config.latency > 0:
+            await asyncio.sleep(self.config.latency)
+
+        if self.__random.random() < self.config.error_rate:
+            self.stats.failed_requests_count += 1
+            status_code = 500
+            content = {
+                "ok": False,
+                "error_code": 500,
+                "description": "Internal Server Error",
+            }
+        else:
+            status_code = 200
+            content = {
+                "ok": True,
+                "result": await self.get_result(bot, api_method, method),
+            }
+
+        response = self.check_response(
+            bot=bot,
+            method=method,
+            status_code=status_code,
+            content=json.dumps(content),
+        )
+        return response.result
+
+    async def get_result(
+        self,
+        bot: Bot,
+        api_method: str,
+        method: TelegramMethod[Any],
+    ) -> Any:
+        if api_method in ("sendMessage", "editMessageText"):
+            return self.__build_message(method)
+        if api_method == "getMe":
+            return {
+                "id": bot.id,
+                "is_bot": True,
+                "first_name": "Yoklama",
+                "username": "yoklama_simulator_bot",
+            }
+        if api_method == "getUpdates":
+            return await self.__get_updates(method)
+        return True
+
+    async def __get_updates(self, method: Any) -> list[dict[str, Any]]:
+        if not self.__pending_updates and method.timeout:
+            # long polling, capped so that stopping the bot stays quick
+            with suppress(TimeoutError):
+                await asyncio.wait_for(
+                    self.__updates_available.wait(),
+                    timeout=min(method.timeout, 1),
+                )
+        updates = self.__pending_updates[:method.limit or 100]
+        del self.__pending_updates[:len(updates)]
+        if not self.__pending_updates:
+            self.__updates_available.clear()
+        return updates
+
+    def __build_message(self, method: Any) -> dict[str, Any]:
+        message_id = getattr(method, "message_id", None)
+        if message_id is None:
+            self.__message_id += 1
+            message_id = self.__message_id
+        return {
+            "message_id": message_id,
+            "date": int(time.time()),
+            "chat": {"id": method.chat_id, "type": "private"},
+            "text": method.text,
+        }
@@ -0,0 +1,184 @@
+import html
+import pathlib
+import tomllib
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Final
+
+
+DEFAULT_LOCALE: Final[str] = "ru"
+SUPPORTED_LOCALES: Final[tuple[str, ...]] = ("ru", "ky", "tr", "en")
+# Native names for the language picker, kept here so that showing it
+# doesn't load every catalog.
+LANGUAGE_NAMES: Final[dict[str, str]] = {
+    "ru": "🇷🇺 Русский",
+    "ky": "🇰🇬 Кыргызча",
+    "tr": "🇹🇷 Türkçe",
+    "en": "🇬🇧 English",
+}
+LOCALES_DIRECTORY: Final = pathlib.Path(__file__).parent / "locales"
+
+type PluralRule = Callable[[int], int]
+
+
+def get_russian_plural_form(count: int) -> int:
+    """Index into (one, few, many) word forms, e.g. пропуск/пропуска/пропусков."""
+    if count % 10 == 1 and count % 100 != 11:
+        return 0
+    if count % 10 in (2, 3, 4) and count % 100 not in (12, 13, 14):
+        return 1
+    return 2
+
+
+def get_english_plural_form(count: int) -> int:
+    """Index into (one, other) word forms."""
+    return 0 if count == 1 else 1
+
+
+def get_invariable_plural_form(count: int) -> int:
+    """Turkish and Kyrgyz nouns stay singular after numerals."""
+    return 0
+
+
+PLURAL_RULES: Final[dict[str, PluralRule]] = {
+    "russian": get_russian_plural_form,
+    "english": get_english_plural_form,
+    "invariable": get_invariable_plural_form,
+}
+PLURAL_TABLE_SIZE: Final[int] = 100
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class MessageTemplates:
+    """Message layouts of one locale as ``str.format`` templates.
+
+    Values substituted into the templates are expected to be escaped
+    already, the templates themselves are trusted HTML.
+    """
+    locale: str
+    plural_rule: PluralRule
+    # plural form indexes of 0..99, evaluated once when the locale is loaded
+    plural_table: tuple[int, ...]
+    skips_word_forms: tuple[str, ...]
+    empty_value: str
+    no_data: str
+    attendance_change: str
+    attendance_list_lesson: str
+    attendance_list_remaining: str
+    attendance_list_at_risk: str
+    attendance_list_empty: str
+    attendance_warning_marker: str
+    attendance_exhausted_marker: str
+    exams_list_lesson: str
+    exams_list_exam: str
+    exams_list_empty: str
+    exams_list_average: str
+    exams_list_required_final: str
+    exams_list_required_makeup: str
+    exams_list_passed: str
+    exams_list_failed: str
+    grade_first: str
+    grade_change: str
+    alert: str
+    alert_remaining: str
+    alert_exhausted: str
+    alert_kind_theory: str
+    alert_kind_practice: str
+    students_word_forms: tuple[str, ...]
+    statistics_title: str
+    statistics_lesson: str
+    statistics_attendance: str
+    statistics_exam: str
+    statistics_kind_theory: str
+    statistics_kind_practice: str
+    statistics_empty: str
+    button_attendance: str
+    button_exams: str
+    button_enter_credentials: str
+    button_accept_terms: str
+    main_menu: str
+    terms_prompt: str
+    terms_accepted: str
+    enter_credentials_prompt: str
+    credentials_saved: str
+    obis_unavailable: str
+    quarantine_notification: str
+    loading_exams: str
+    loading_attendance: str
+    choose_language: str
+    language_changed: str
+    dashboard: str
+    dashboard_enabled: str
+    dashboard_disabled: str
+    button_refresh: str
+    refresh_requested: str
+
+    def inflect(self, count: int, word_forms: tuple[str, ...]) -> str:
+        count = abs(count)
+        if count < PLURAL_TABLE_SIZE:
+            form = self.plural_table[count]
+        else:
+            form = self.plural_rule(count)
+        return word_forms[min(form, len(word_forms) - 1)]
+
+    def inflect_skips(self, count: int) -> str:
+        return self.inflect(count, self.skips_word_forms)
+
+
+def compile_templates(locale: str, catalog: dict) -> MessageTemplates:
+    """Turn a parsed ``locales/<locale>.toml`` catalog into lookup tables."""
+    catalog = dict(catalog)
+    plural_rule = PLURAL_RULES[catalog.pop("plural_rule")]
+    return MessageTemplates(
+        locale=locale,
+        plural_rule=plural_rule,
+        plural_table=tuple(
+            plural_rule(count) for count in range(PLURAL_TABLE_SIZE)
+        ),
+        skips_word_forms=tuple(catalog.pop("skips_word_forms")),
+        students_word_forms=tuple(catalog.pop("students_word_forms")),
+        **catalog,
+    )
+
+
+@lru_cache(maxsize=None)
+def load_templates(locale: str) -> MessageTemplates:
+    with open(LOCALES_DIRECTORY / f"{locale}.toml", "rb") as file:
+        return compile_templates(locale, tomllib.load(file))
+
+
+def resolve_locale(language_code: str | None) -> str:
+    """Supported locale for a stored preference or a Telegram language code
+    such as ``en-US``."""
+    if language_code is None:
+        return DEFAULT_LOCALE
+    language = language_code.split("-", 1)[0].lower()
+    if language in SUPPORTED_LOCALES:
+        return language
+    return DEFAULT_LOCALE
+
+
+def get_templates(locale: str = DEFAULT_LOCALE) -> MessageTemplates:
+    """Catalogs are loaded on first use, so locales nobody uses are never
+    parsed."""
+    if locale not in SUPPORTED_LOCALES:
+        locale = DEFAULT_LOCALE
+    return load_templates(locale)
+
+
+@lru_cache(maxsize=None)
+def get_template_texts(template_name: str) -> frozenset[str]:
+    """A template in every supported locale, for matching the buttons of
+    keyboards sent in a locale the user no longer has."""
+    return frozenset(
+        getattr(load_templates(locale), template_name)
+        for locale in SUPPORTED_LOCALES
+    )
+
+
+@lru_cache(maxsize=4096)
+def escape_html(value: str) -> str:
+    """Lesson and exam names repeat across every user's messages, so their
+    escaped form is memoized."""
+    return html.escape(value, quote=False)
@@ -0,0 +1,140 @@
+import asyncio
+import logging
+from typing import Any
+
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import (
+    SimpleRequestHandler,
+    setup_application,
+)
+from aiohttp import web
+
+from runtime import drain_tasks, wait_for_stop_signal
+from setup.settings.telegram_bot import TelegramBotSettings
+
+
+logger = logging.getLogger(__name__)
+
+
+class BoundedRequestHandler(SimpleRequestHandler):
+    """Acknowledges updates right away and handles them in the background,
+    at most ``max_concurrent_updates`` at a time.
+
+    When every slot is taken the request is held until one frees up, so
+    Telegram stops sending more instead of updates piling up in memory.
+    The bot session is left open on close, scheduler jobs still use it.
+    """
+
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        bot: Bot,
+        *,
+        secret_token: str,
+        max_concurrent_updates: int,
+        shutdown_timeout: float,
+        **data: Any,
+    ):
+        super().__init__(
+            dispatcher=dispatcher,
+            bot=bot,
+            handle_in_background=True,
+            secret_token=secret_token,
+            **data,
+        )
+        self.__semaphore = asyncio.Semaphore(max_concurrent_updates)
+        self.__shutdown_timeout = shutdown_timeout
+
+    async def _handle_request_background(
+        self,
+        bot: Bot,
+        request: web.Request,
+    ) -> web.Response:
+        await self.__semaphore.acquire()
+        try:
+            return await super()._handle_request_background(bot, request)
+        except BaseException:
+            # the update was not scheduled, nothing else will free the slot
+            self.__semaphore.release()
+            raise
+
+    async def _background_feed_update(
+        self,
+        bot: Bot,
+        update: dict[str, Any],
+    ) -> None:
+        try:
+            await super()._background_feed_update(bot, update)
+        finally:
+            self.__semaphore.release()
+
+    async def close(self) -> None:
+        await drain_tasks(
+            self._background_feed_update_tasks,
+            self.__shutdown_timeout,
+        )
+
+
+async def start_webhook(
+    dispatcher: Dispatcher,
+    bot: Bot,
+    settings: TelegramBotSettings,
+) -> web.AppRunner:
+    """Starts serving updates and points Telegram at the webhook.
+
+    Cleaning up the returned runner stops accepting updates, drains the
+    ones in flight and emits the dispatcher shutdown.
+    """
+    webhook_settings = settings.webhook
+    secret_token = webhook_settings.secret_token.get_secret_value()
+    request_handler = BoundedRequestHandler(
+        dispatcher,
+        bot,
+        secret_token=secret_token,
+        max_concurrent_updates=settings.max_concurrent_updates,
+        shutdown_timeout=settings.shutdown_timeout,
+    )
+    application = web.Application()
+    request_handler.register(application, path=webhook_settings.path)
+    setup_application(application, dispatcher, bot=bot)
+
+    runner = web.AppRunner(application)
+    await runner.setup()
+    site = web.TCPSite(
+        runner,
+        host=webhook_settings.host,
+        port=webhook_settings.port,
+    )
+    await site.start()
+    logger.info(
+        "Serving webhook on %s:%s%s",
+        webhook_settings.host,
+        webhook_settings.port,
+        webhook_settings.path,
+    )
+
+    await bot.set_webhook(
+        url=str(webhook_settings.url),
+        secret_token=secret_token,
+        max_connections=webhook_settings.max_connections,
+        allowed_updates=dispatcher.resolve_used_update_types(),
+        drop_pending_updates=webhook_settings.drop_pending_updates,
+    )
+    return runner
+
+
+async def run_webhook(
+    dispatcher: Dispatcher,
+    bot: Bot,
+    settings: TelegramBotSettings,
+) -> None:
+    """Serves updates until SIGINT or SIGTERM.
+
+    The webhook stays registered on shutdown so Telegram keeps updates
+    queued while the bot restarts.
+    """
+    runner = await start_webhook(dispatcher, bot, settings)
+    try:
+        await wait_for_stop_signal()
+    finally:
+        await runner.cleanup()